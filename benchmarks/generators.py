@@ -0,0 +1,95 @@
+import json
+import random
+from pathlib import Path
+
+# Slovník pro syntetické věty - klíče odpovídají mapám klasifikace v core.py
+SEGMENTY = ["b2c", "b2b"]
+KANALY = ["shop", "il"]
+TECHNOLOGIE = ["dsl", "vdsl", "fwa", "fwa indoor", "fiber", "optika", "cable", "hlas", "mobil", "next tarif"]
+SLOVESA = ["aktivuj", "zmen", "terminuj", "dokup", "odeber", "migruj", "prevezmi"]
+DOPLNKY = ["security", "tv", "router", "pevnou ip", "balicek", "slevu", "hw"]
+
+PRIORITIES = ["1-High", "2-Medium", "3-Low"]
+COMPLEXITIES = ["1-Giant", "2-Huge", "3-Big", "4-Medium", "5-Low"]
+
+
+def _step(rng, action_no, step_no):
+    words = " ".join(rng.choice(DOPLNKY) for _ in range(rng.randint(3, 8)))
+    return {
+        "description": f"Krok {step_no + 1} akce {action_no}: otevri detail zakaznika a proved {words}",
+        "expected": f"Objednavka je v kosiku, {words} je potvrzeno",
+    }
+
+
+def synthetic_kroky(actions=30, steps=8, legacy_share=0.25, seed=0):
+    """Knihovna akcí v novém formátu {description, steps}; podíl `legacy_share` ve starém formátu (jen seznam kroků)"""
+    rng = random.Random(seed)
+    kroky_data = {}
+    for i in range(actions):
+        name = f"Akce {i:03d} + {rng.choice(DOPLNKY)} - {rng.choice(['FIX', 'HLAS', 'FWA'])}"
+        action_steps = [_step(rng, i, s) for s in range(max(1, steps + rng.randint(-2, 2)))]
+        if rng.random() < legacy_share:
+            kroky_data[name] = action_steps
+        else:
+            kroky_data[name] = {"description": f"Syntetická akce {i}", "steps": action_steps}
+    return kroky_data
+
+
+def synthetic_sentence(rng):
+    return " ".join([
+        rng.choice(SLOVESA), rng.choice(TECHNOLOGIE), "+", rng.choice(DOPLNKY),
+        "na", rng.choice(SEGMENTY), "pres", rng.choice(KANALY),
+    ])
+
+
+def synthetic_projects(kroky_data, projects=3, scenarios=200, legacy_share=0.25, seed=0, step_ref=None):
+    """Projekty se scénáři ve tvaru, jaký ukládá generate_testcases.
+
+    Podíl `legacy_share` scénářů nese starší kopii kroků v "kroky"; ostatní
+    dostanou odkaz z `step_ref(kroky)` (bez něj také kopii).
+    """
+    rng = random.Random(seed)
+    names = list(kroky_data)
+    refs = {}
+    projects_data = {}
+    for p in range(projects):
+        scenario_list = []
+        for order_no in range(1, scenarios + 1):
+            akce = rng.choice(names)
+            obsah = kroky_data[akce]
+            kroky = obsah["steps"] if isinstance(obsah, dict) else obsah
+            veta = synthetic_sentence(rng)
+            segment, kanal = rng.choice(SEGMENTY).upper(), rng.choice(KANALY).upper()
+            tc = {
+                "uid": f"bench{p:03d}{order_no:06d}",
+                "order_no": order_no,
+                "test_name": f"{order_no:03d}_{kanal}_{segment}_X_{veta}",
+                "akce": akce,
+                "segment": segment,
+                "kanal": kanal,
+                "priority": rng.choice(PRIORITIES),
+                "complexity": rng.choice(COMPLEXITIES),
+                "veta": veta,
+            }
+            if step_ref is None or rng.random() < legacy_share:
+                tc["kroky"] = [dict(k) for k in kroky]
+            else:
+                if akce not in refs:
+                    refs[akce] = step_ref(kroky)
+                tc["kroky_ref"] = refs[akce]
+            scenario_list.append(tc)
+        projects_data[f"BENCH-{p:03d}"] = {
+            "next_id": scenarios + 1,
+            "subject": "UAT2\\Bench\\",
+            "scenarios": scenario_list,
+        }
+    return projects_data
+
+
+def write_dataset(directory: Path, projects_data, kroky_data):
+    """Zapíše projects.json, projekty.json (main.py) a kroky.json do adresáře"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, data in [("projects.json", projects_data), ("projekty.json", projects_data), ("kroky.json", kroky_data)]:
+        with open(directory / name, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.generators import synthetic_kroky, synthetic_projects, synthetic_sentence, write_dataset
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_REPORT_PATH = Path(__file__).resolve().parent / "report.json"
+
+# Regrese = medián horší o víc než `tolerance` (poměr) A zároveň o víc než MIN_DELTA_MS
+DEFAULT_TOLERANCE = 0.5
+MIN_DELTA_MS = 2.0
+
+SCALE_KEYS = ["projects", "scenarios", "actions", "steps", "legacy_share", "seed"]
+
+
+# ---------- Měření ----------
+class Case:
+    """Jedno měření: `calls` volání `fn` za opakování, `setup` (neměřený) před každým opakováním"""
+
+    def __init__(self, name, fn, calls=1, setup=None):
+        self.name = name
+        self.fn = fn
+        self.calls = calls
+        self.setup = setup
+
+
+def time_case(case, repeat):
+    """Doby opakování v ms přepočtené na jedno volání; první (zahřívací) běh se nepočítá"""
+    samples = []
+    for run in range(repeat + 1):
+        if case.setup:
+            case.setup()
+        # Funkce z core/main hlásí výsledek přes print - do měření nepatří
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(case.calls):
+                case.fn()
+            elapsed = time.perf_counter() - start
+        if run:
+            samples.append(elapsed * 1000 / case.calls)
+    return {
+        "calls": case.calls,
+        "repeat": repeat,
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def _import_targets(data_dir: Path):
+    """core a main.py s datovými soubory přesměrovanými do `data_dir` (TESTCASE_DATA_DIR)"""
+    os.environ["TESTCASE_DATA_DIR"] = str(data_dir)
+    for path in (REPO_DIR / "gui_app", REPO_DIR):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+    import core
+    import main
+
+    if core.DATA_DIR != data_dir or main.DATA_DIR != data_dir:
+        raise RuntimeError("core/main.py už byly načteny s jiným TESTCASE_DATA_DIR - spusť benchmark v samostatném procesu")
+    return core, main
+
+
+def build_cases(core, main, scale):
+    projects_data = core.load_json(core.PROJECTS_PATH)
+    kroky_data = core.load_json(core.KROKY_PATH)
+    project = max(projects_data, key=lambda name: len(projects_data[name]["scenarios"]))
+
+    rng = random.Random(scale["seed"])
+    sentences = [synthetic_sentence(rng) for _ in range(500)]
+    actions = list(kroky_data)
+
+    # generate_testcase přidává scénáře - pracuje na vlastní kopii, ať neovlivní ostatní měření
+    generated = core.load_json(core.PROJECTS_PATH)
+
+    def generate():
+        core.generate_testcase(project, rng.choice(sentences), rng.choice(actions), "2-Medium", "4-Medium",
+                               kroky_data, generated)
+
+    def parse_all():
+        for veta in sentences:
+            core.parse_veta(veta)
+
+    def steps_all():
+        for akce in actions:
+            core.get_steps_from_action(akce, kroky_data)
+
+    def main_export():
+        main.AKTUALNI_PROJEKT = project
+        main.projekty_data = projects_data
+        main.exportuj_excel()
+
+    return [
+        Case("load_json", lambda: core.load_json(core.PROJECTS_PATH)),
+        Case("load_json_kroky", lambda: core.load_json(core.KROKY_PATH)),
+        Case("save_json", lambda: core.save_json(core.PROJECTS_PATH, projects_data)),
+        Case("generate_testcase", generate),
+        # Klasifikace má LRU cache - měří se studená cesta
+        Case("parse_veta", parse_all, calls=1, setup=core._classify.cache_clear),
+        Case("get_steps_from_action", steps_all),
+        Case("make_df", lambda: core.make_df(projects_data, project)),
+        Case("export_to_excel", lambda: core.export_to_excel(project, projects_data)),
+        Case("main.exportuj_excel", main_export),
+    ]
+
+
+def run(scale, repeat=5, only=None):
+    """Vygeneruje data v dočasném adresáři, změří všechny případy a vrátí report"""
+    with tempfile.TemporaryDirectory(prefix="testcases-bench-") as tmp:
+        data_dir = Path(tmp).resolve()
+        previous_cwd = os.getcwd()
+        # main.exportuj_excel volá git - mimo repozitář jen neškodně selže
+        os.environ["GIT_CEILING_DIRECTORIES"] = str(data_dir.parent)
+        os.chdir(data_dir)
+        try:
+            core, main = _import_targets(data_dir)
+            kroky_data = synthetic_kroky(scale["actions"], scale["steps"], scale["legacy_share"], scale["seed"])
+            projects_data = synthetic_projects(
+                kroky_data, scale["projects"], scale["scenarios"], scale["legacy_share"], scale["seed"],
+                step_ref=core.store_step_set,
+            )
+            write_dataset(data_dir, projects_data, kroky_data)
+            core.invalidate_cache()
+
+            results = {}
+            for case in build_cases(core, main, scale):
+                if only and case.name not in only:
+                    continue
+                results[case.name] = time_case(case, repeat)
+                print(f"  {case.name:<24} {results[case.name]['median_ms']:>10.3f} ms")
+        finally:
+            os.chdir(previous_cwd)
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+# ---------- Porovnání s baseline ----------
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=MIN_DELTA_MS):
+    """Seznam regresí proti baseline (prázdný = v pořádku)"""
+    if report["scale"] != baseline["scale"]:
+        raise ValueError(f"Baseline je změřená pro jiný rozsah dat: {baseline['scale']}")
+
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        limit = base["median_ms"] * (1 + tolerance)
+        delta = result["median_ms"] - base["median_ms"]
+        if result["median_ms"] > limit and delta > min_delta_ms:
+            regressions.append({
+                "name": name,
+                "baseline_ms": base["median_ms"],
+                "median_ms": result["median_ms"],
+                "ratio": round(result["median_ms"] / base["median_ms"], 2) if base["median_ms"] else None,
+            })
+    return regressions
+
+
+def _write_json(path: Path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark nad syntetickými daty")
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--scenarios", type=int, default=200, help="scénářů na projekt")
+    parser.add_argument("--actions", type=int, default=30)
+    parser.add_argument("--steps", type=int, default=8, help="průměrný počet kroků akce")
+    parser.add_argument("--legacy-share", type=float, default=0.25,
+                        help="podíl akcí a scénářů ve starém formátu (seznam kroků / kopie kroků)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="změřit jen vybrané případy")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="povolené zhoršení mediánu (0.5 = o 50 %%)")
+    parser.add_argument("--update-baseline", action="store_true", help="uložit výsledek jako novou baseline")
+    parser.add_argument("--no-gate", action="store_true", help="jen změřit, neporovnávat s baseline")
+    args = parser.parse_args(argv)
+
+    scale = {key: getattr(args, key) for key in SCALE_KEYS}
+    print(f"⏱️ Benchmark: {scale}")
+    report = run(scale, args.repeat, args.only)
+    _write_json(args.report, report)
+    print(f"✅ Report uložen: {args.report}")
+
+    if args.update_baseline:
+        _write_json(args.baseline, report)
+        print(f"✅ Baseline aktualizována: {args.baseline}")
+        return 0
+    if args.no_gate:
+        return 0
+    if not args.baseline.exists():
+        print(f"ℹ️ Baseline {args.baseline} neexistuje - porovnání přeskočeno (vytvoř ji přes --update-baseline)")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    try:
+        regressions = compare(report, baseline, args.tolerance)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    report["regressions"] = regressions
+    _write_json(args.report, report)
+    for r in regressions:
+        print(f"❌ Regrese {r['name']}: {r['baseline_ms']:.3f} ms → {r['median_ms']:.3f} ms (×{r['ratio']})")
+    if regressions:
+        return 1
+    print("✅ Bez regresí proti baseline")
+    return 0
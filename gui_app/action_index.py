@@ -0,0 +1,176 @@
+import re
+import threading
+from collections import defaultdict
+
+from core import fold_text, parse_veta
+
+# Slova, která o akci nic neříkají
+STOPWORDS = {"a", "k", "na", "u", "s", "se", "v", "ve", "z", "za", "do", "od", "po", "pro", "pres", "pri", "zak"}
+
+# Doménová synonyma: slovo ve větě -> slovo v názvu akce
+SYNONYMS = {
+    "security": "vas",
+    "wfm": "vas",
+    "balicek": "vas",
+    "balicku": "vas",
+    "hromadna": "bulk",
+    "hromadne": "bulk",
+    "deaktivuj": "odebrat",
+    "odeber": "odebrat",
+    "zrus": "odebrat",
+    "ukonci": "terminace",
+    "ukonceni": "terminace",
+    "prenos": "portin",
+    "prenes": "portin",
+    "vymen": "vymena",
+    "dokoupit": "dokup",
+    "dostupnost": "overeni",
+    "zmen": "zmena",
+}
+
+# Technologie z parse_veta -> typ služby v názvu akce
+SERVICE_TOKENS = {
+    "DSL": "fix", "FIBER": "fix", "CABLE": "fix", "FWA": "fix", "FWA_BI": "fix", "FWA_BISI": "fix",
+    "HLAS": "hlas",
+}
+SERVICE_STEMS = set(SERVICE_TOKENS.values())
+
+STEM_LENGTH = 5
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.25
+TRIGRAM_WEIGHT = 0.3
+EXACT_NAME_BONUS = 2.0
+# Bez shody ve slovech mimo typ služby musí vítěz vést aspoň o tolik
+BEST_MARGIN = 0.1
+
+
+def tokenize(text):
+    """Slova bez diakritiky a výplňových slov"""
+    tokens = re.findall(r"[a-z0-9]+", fold_text(text))
+    return [t for t in tokens if t not in STOPWORDS and len(t) > 1]
+
+
+def stem(token):
+    # Hrubý český "stemmer" - aktivuj/aktivace/aktivaci -> aktiv
+    return SYNONYMS.get(token, token)[:STEM_LENGTH]
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ActionIndex:
+    """Index akcí z kroky.json pro rychlé a tolerantní přiřazení akce k větě.
+
+    Sestaví se jednou pro danou verzi kroky.json: kmeny slov z názvu a popisu
+    akce -> kandidátní akce, k tomu trigramy názvu. Dotaz sečte překryv kmenů
+    a trigramovou podobnost jen pro kandidáty, takže nezáleží na počtu akcí.
+    """
+
+    def __init__(self, kroky_data):
+        self.actions = list(kroky_data.keys())
+        self._position = {akce: i for i, akce in enumerate(self.actions)}
+        self._stems = defaultdict(dict)       # kmen -> {akce: váha}
+        self._trigrams = defaultdict(set)     # trigram -> {akce}
+        self._name_weight = {}
+        self._name_trigrams = {}
+        self._folded_names = {}
+
+        for akce in self.actions:
+            obsah = kroky_data[akce]
+            popis = obsah.get("description", "") if isinstance(obsah, dict) else ""
+            folded = " ".join(tokenize(akce))
+            self._folded_names[akce] = folded
+
+            name_stems = {stem(t) for t in tokenize(akce)}
+            for s in {stem(t) for t in tokenize(popis)} - name_stems:
+                self._stems[s][akce] = DESCRIPTION_WEIGHT
+            for s in name_stems:
+                self._stems[s][akce] = NAME_WEIGHT
+            self._name_weight[akce] = len(name_stems) * NAME_WEIGHT or 1.0
+
+            self._name_trigrams[akce] = trigrams(folded)
+            for trigram in self._name_trigrams[akce]:
+                self._trigrams[trigram].add(akce)
+
+        self.size = len(self.actions)
+
+    def _query_stems(self, text):
+        stems = {stem(t) for t in tokenize(text)}
+        service = SERVICE_TOKENS.get(parse_veta(text)[2])
+        if service:
+            stems.add(service)
+        return stems
+
+    def rank(self, text, limit=5):
+        """Seřazené dvojice (akce, skóre) pro větu; nejlepší první"""
+        return [(akce, score) for akce, score, _ in self._rank(text)[:limit]]
+
+    def _rank(self, text):
+        """Trojice (akce, skóre, shoda ve slovech mimo typ služby) seřazené od nejlepší"""
+        if not text or not text.strip():
+            return []
+
+        stems = self._query_stems(text)
+        folded_text = " ".join(tokenize(text))
+        text_trigrams = trigrams(folded_text)
+
+        scores = defaultdict(float)
+        content = set()
+        for s in stems:
+            for akce, weight in self._stems.get(s, {}).items():
+                scores[akce] += weight
+                if s not in SERVICE_STEMS:
+                    content.add(akce)
+
+        candidates = set(scores)
+        for trigram in text_trigrams:
+            candidates |= self._trigrams.get(trigram, set())
+
+        ranked = []
+        for akce in candidates:
+            # Dice překryv kmenů - penalizuje akce, které pokrývají jen část věty
+            score = 2 * scores.get(akce, 0.0) / (self._name_weight[akce] + len(stems))
+            name_trigrams = self._name_trigrams[akce]
+            if name_trigrams:
+                score += TRIGRAM_WEIGHT * len(name_trigrams & text_trigrams) / len(name_trigrams)
+            if self._folded_names[akce] and f" {self._folded_names[akce]} " in f" {folded_text} ":
+                score += EXACT_NAME_BONUS
+            ranked.append((akce, round(score, 3), akce in content))
+
+        ranked.sort(key=lambda item: (-item[1], self._position[item[0]]))
+        return ranked
+
+    def best(self, text, min_score=0.3):
+        """Nejlépe odpovídající akce, nebo None, když výběr není jednoznačný.
+
+        Samotný typ služby (fix/hlas) odpovídá všem akcím dané služby, takže
+        vítěz bez další shody ve slovech se bere jen s jasným náskokem.
+        """
+        ranked = self._rank(text)
+        if not ranked or ranked[0][1] < min_score:
+            return None
+        akce, score, content = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if content or score - runner_up >= BEST_MARGIN:
+            return akce
+        return None
+
+
+# ---------- Index pro aktuální kroky.json ----------
+_index_lock = threading.Lock()
+_index_cache = {"source": None, "index": None}
+
+
+def get_action_index(kroky_data):
+    """Index pro danou verzi kroky.json.
+
+    Snapshot z `load_json_cached` je stejný objekt, dokud se soubor nezmění,
+    takže index se přestaví jen po změně kroky.json.
+    """
+    with _index_lock:
+        if _index_cache["source"] is not kroky_data:
+            _index_cache["index"] = ActionIndex(kroky_data)
+            _index_cache["source"] = kroky_data
+        return _index_cache["index"]
@@ -1,19 +1,43 @@
 import streamlit as st
 import pandas as pd
+import altair as alt
 from pathlib import Path
-import copy
 import json
+import uuid
 from datetime import datetime
 from core import (
-    load_json, save_json,
+    load_json_cached, save_projects, thaw, snapshot_version,
     PROJECTS_PATH, KROKY_PATH,
-    generate_testcase, export_to_excel,
-    PRIORITY_MAP, COMPLEXITY_MAP,
-    get_steps_from_action
+    generate_testcases, reset_next_id,
+    export_project, export_project_cached, export_cache_stats,
+    PRIORITY_MAP, COMPLEXITY_MAP, get_automatic_complexity,
+    get_steps_from_action, parse_veta,
+    store_step_set, make_df,
+    cache_stats, get_sync_worker, get_status_provider, search_all,
+    oprav_duplicitni_kroky, get_coverage, scenario_technologie
+)
+from git_sync import STATUS_LABELS as SYNC_STATUS_LABELS
+from export import EXPORT_FORMATS, safe_file_name
+from action_index import get_action_index
+from bulk_import import sentences_from_text, sentences_from_file, build_preview, validate_preview
+from matrix import DIMENSION_VALUES, parse_exclusions, expand, pairwise, count_full, build_items
+from optimizer import MODES as OPTIMIZER_MODES, optimize, reduced_project
+from search import KIND_LABELS as SEARCH_KIND_LABELS
+from similarity import STEP_THRESHOLD, find_duplicate_steps, find_duplicate_actions
+from coverage import split_cell
+from timing import tracer
+from memprofile import memory_profiler, process_rss
+from health import run_health_checks, STATUS_ICONS as HEALTH_ICONS
+from sessions import (
+    edit_buffer_key, new_overlay, overlay_entries, overlay_steps, overlay_set,
+    overlay_remove, overlay_is_stale, collect_stale_buffers, buffer_stats
 )
 
 # ---------- Konfigurace vzhledu ----------
 st.set_page_config(page_title="TestCase Builder", layout="wide", page_icon="🧪")
+tracer.begin_rerun()
+memory_profiler.begin_rerun()
+tracer.section("app.init")
 
 CUSTOM_CSS = """
 <style>
@@ -41,7 +65,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 def get_projects():
     """Bezpečně načte projekty - chrání před ztrátou dat"""
     try:
-        projects = load_json(PROJECTS_PATH)
+        projects = load_json_cached(PROJECTS_PATH)
         # Pokud soubor neexistuje nebo je prázdný, vrátíme základní strukturu
         if not projects:
             return {}
@@ -51,9 +75,12 @@ def get_projects():
         return {}
 
 def save_projects_safely(projects_data):
-    """Bezpečně uloží projekty s kontrolou"""
+    """Bezpečně uloží projekty s kontrolou - souběžné změny jiných uživatelů se sloučí"""
     try:
-        save_json(PROJECTS_PATH, projects_data)
+        _, conflicts = save_projects(base_projects, projects_data)
+        if conflicts:
+            # Většina volajících hned volá st.rerun() - upozornění se ukáže po něm
+            st.session_state["save_conflicts"] = conflicts
         return True
     except Exception as e:
         st.error(f"Chyba při ukládání projektů: {e}")
@@ -61,77 +88,58 @@ def save_projects_safely(projects_data):
 
 # ---------- Pomocné funkce ----------
 def get_steps():
-    return load_json(KROKY_PATH)
+    return load_json_cached(KROKY_PATH)
 
 def ensure_project(projects, name, subject=None):
     if name not in projects:
+        projects = thaw(projects)
         projects[name] = {"next_id": 1, "subject": subject or "UAT2\\Antosova\\", "scenarios": []}
         save_projects_safely(projects)
     return projects
 
-def make_df(projects, project_name):
-    sc = projects.get(project_name, {}).get("scenarios", [])
-    if not sc:
-        return pd.DataFrame()
-    rows = []
-    for tc in sc:
-        rows.append({
-            "Order": tc.get("order_no"),
-            "Test Name": tc.get("test_name"),
-            "Action": tc.get("akce"),
-            "Segment": tc.get("segment"),
-            "Channel": tc.get("kanal"),
-            "Priority": tc.get("priority"),
-            "Complexity": tc.get("complexity"),
-            "Kroky": len(tc.get("kroky", []))
-        })
-    return pd.DataFrame(rows).sort_values(by="Order", ascending=True)
-
-# ---------- Automatická komplexita ----------
-def get_automatic_complexity(pocet_kroku):
-    """Automaticky určí komplexitu podle počtu kroků"""
-    if pocet_kroku <= 5:
-        return "5-Low"
-    elif pocet_kroku <= 10:
-        return "4-Medium"
-    elif pocet_kroku <= 15:
-        return "3-Big"
-    elif pocet_kroku <= 20:
-        return "2-Huge"
-    else:
-        return "1-Giant"
-
-# ---------- Funkce pro správu akcí ----------
-def get_global_steps():
-    kroky_path = Path(__file__).resolve().parent.parent / "data" / "kroky.json"
-    return load_json(kroky_path)
-
-def save_global_steps(data):
-    kroky_path = Path(__file__).resolve().parent.parent / "data" / "kroky.json"
-    kroky_path.parent.mkdir(exist_ok=True)
-    save_json(kroky_path, data)
+def finish_rerun():
+    """Konec rerunu pro měření času a paměti - volá se i před st.stop()"""
+    if memory_profiler.enabled:
+        session_id = st.session_state.setdefault("memory_session_id", uuid.uuid4().hex[:8])
+        memory_profiler.end_rerun(session_id, st.session_state)
+    tracer.end_rerun()
 
 def refresh_all_data():
     """Obnoví všechna data v aplikaci po změně kroků"""
     st.rerun()
 
 def check_github_status():
-    """Zkontroluje stav GitHub synchronizace"""
-    try:
-        import subprocess
-        # Nejprve zkontrolujeme jestli jsme v git repozitáři
-        check_git = subprocess.run(["git", "status"], capture_output=True, text=True, cwd=BASE_DIR)
-        if "not a git repository" in check_git.stderr:
-            return "❌ Není Git repozitář"
-        
-        # Zkontrolujeme změny
-        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, cwd=BASE_DIR)
-        if result.stdout.strip():
-            return "⚠️ Čeká na synchronizaci s GitHub"
-        else:
-            return "✅ Synchronizováno s GitHub"
-    except Exception as e:
-        return f"❌ Nelze zkontrolovat: {str(e)}"
+    """Stav GitHub synchronizace z paměti - git běží jen ve vlákně na pozadí"""
+    status = get_status_provider().status()
+    state = status["state"]
+    if state == "unknown":
+        text = "⏳ Zjišťuji stav..."
+    elif state == "no_repo":
+        return "❌ Není Git repozitář"
+    elif state == "error":
+        return f"❌ Nelze zkontrolovat: {status['error']}"
+    elif state == "pending":
+        text = "⚠️ Čeká na synchronizaci s GitHub"
+    else:
+        text = "✅ Synchronizováno s GitHub"
+
+    if status["ahead"] or status["behind"]:
+        text += f" (↑{status['ahead']} ↓{status['behind']})"
+    if status["last_sync"]:
+        text += f" · poslední sync {status['last_sync']:%H:%M:%S}"
+    return text
+
+def show_sync_state(container):
+    """Zobrazí stav git workeru (sidebar, Diagnostika)"""
+    state = get_sync_worker().state()
+    label = SYNC_STATUS_LABELS.get(state["status"], state["status"])
+    if state["pending"]:
+        label += f" ({state['pending']} ve frontě)"
+    container.caption(f"**Git sync:** {label}")
+    if state["last_sync"]:
+        container.caption(f"Poslední synchronizace: {state['last_sync']:%H:%M:%S}")
+    if state["last_error"]:
+        container.caption(f"Poslední chyba: {state['last_error']}")
 
 def sprava_akci():
     """Jednoduchá a efektivní správa akcí s ukládáním do kroky.json"""
@@ -310,9 +318,14 @@ def sprava_akci():
         
         st.subheader(f"✏️ Editace akce: {akce}")
         
-        # Inicializace session state pro editované kroky
-        if f"edit_kroky_{akce}" not in st.session_state:
-            st.session_state[f"edit_kroky_{akce}"] = kroky.copy()
+        # Session drží jen overlay se změnami nad sdíleným snapshotem kroků
+        buffer_key = edit_buffer_key(akce)
+        overlay = st.session_state.get(buffer_key)
+        if overlay is not None and overlay_is_stale(kroky, overlay):
+            st.warning("⚠️ Akci mezitím uložil někdo jiný – rozpracované změny kroků byly zahozeny.")
+            overlay = None
+        if overlay is None:
+            overlay = st.session_state[buffer_key] = new_overlay(kroky)
         
         with st.form(f"edit_akce_{akce}"):
             novy_popis = st.text_input("Popis akce*", value=popis, key=f"desc_{akce}")
@@ -322,41 +335,42 @@ def sprava_akci():
             
             # Zobrazení kroků pro editaci
             kroky_k_smazani = []
-            for i, krok in enumerate(st.session_state[f"edit_kroky_{akce}"]):
+            for i, (ref, krok) in enumerate(overlay_entries(kroky, overlay)):
+                ref_key = f"{ref[0]}{ref[1]}"
                 col_krok, col_smazat = st.columns([4, 1])
                 
                 with col_krok:
                     if isinstance(krok, dict):
                         desc = st.text_area(f"Krok {i+1} - Description", 
                                           value=krok.get('description', ''),
-                                          key=f"desc_{akce}_{i}",
+                                          key=f"desc_{akce}_{ref_key}",
                                           height=60)
                         exp = st.text_area(f"Krok {i+1} - Expected", 
                                          value=krok.get('expected', ''),
-                                         key=f"exp_{akce}_{i}",
+                                         key=f"exp_{akce}_{ref_key}",
                                          height=60)
-                        # Aktualizace kroku v session state
-                        st.session_state[f"edit_kroky_{akce}"][i] = {"description": desc, "expected": exp}
+                        # Aktualizace kroku v overlayi
+                        overlay_set(kroky, overlay, ref, {"description": desc, "expected": exp})
                     else:
                         # Pro starý formát
                         text = st.text_area(f"Krok {i+1}", 
                                           value=krok,
-                                          key=f"text_{akce}_{i}",
+                                          key=f"text_{akce}_{ref_key}",
                                           height=60)
-                        st.session_state[f"edit_kroky_{akce}"][i] = text
+                        overlay_set(kroky, overlay, ref, text)
                 
                 with col_smazat:
                     st.write("")  # Prázdný řádek pro zarovnání
-                    if st.form_submit_button("🗑️", key=f"del_{akce}_{i}", use_container_width=True):
-                        kroky_k_smazani.append(i)
+                    if st.form_submit_button("🗑️", key=f"del_{akce}_{ref_key}", use_container_width=True):
+                        kroky_k_smazani.append(ref)
                 
                 st.markdown("---")
             
-            # Smazání označených kroků
-            for index in sorted(kroky_k_smazani, reverse=True):
-                if index < len(st.session_state[f"edit_kroky_{akce}"]):
-                    st.session_state[f"edit_kroky_{akce}"].pop(index)
-                    st.rerun()
+            # Smazání označených kroků (přidané od konce, aby seděly indexy)
+            if kroky_k_smazani:
+                for ref in sorted(kroky_k_smazani, reverse=True):
+                    overlay_remove(overlay, ref)
+                st.rerun()
             
             # Přidání nového kroku
             st.write("**Přidat nový krok:**")
@@ -365,7 +379,7 @@ def sprava_akci():
             
             if st.form_submit_button("➕ Přidat krok", key=f"add_{akce}"):
                 if new_desc.strip() and new_exp.strip():
-                    st.session_state[f"edit_kroky_{akce}"].append({
+                    overlay["added"].append({
                         "description": new_desc.strip(),
                         "expected": new_exp.strip()
                     })
@@ -381,21 +395,20 @@ def sprava_akci():
                 if st.form_submit_button("💾 Uložit změny", use_container_width=True, type="primary"):
                     if not novy_popis.strip():
                         st.error("Zadejte popis akce")
-                    elif not st.session_state[f"edit_kroky_{akce}"]:
+                    elif not overlay_steps(kroky, overlay):
                         st.error("Akce musí mít alespoň jeden krok")
                     else:
                         try:
                             success = update_action(
                                 akce,
                                 novy_popis.strip(),
-                                st.session_state[f"edit_kroky_{akce}"].copy()
+                                thaw(overlay_steps(kroky, overlay))
                             )
                             
                             if success:
                                 st.success(f"✅ Akce '{akce}' byla úspěšně upravena a uložena do kroky.json!")
                                 st.session_state["edit_akce"] = None
-                                if f"edit_kroky_{akce}" in st.session_state:
-                                    del st.session_state[f"edit_kroky_{akce}"]
+                                st.session_state.pop(buffer_key, None)
                                 refresh_all_data()
                             else:
                                 st.error("❌ Akce nebyla nalezena")
@@ -406,8 +419,7 @@ def sprava_akci():
             with col_zrusit:
                 if st.form_submit_button("❌ Zrušit", use_container_width=True):
                     st.session_state["edit_akce"] = None
-                    if f"edit_kroky_{akce}" in st.session_state:
-                        del st.session_state[f"edit_kroky_{akce}"]
+                    st.session_state.pop(buffer_key, None)
                     st.rerun()
     
     # Synchronizace s GitHub - PŘESUNUTO SEM
@@ -417,70 +429,23 @@ def sprava_akci():
     st.write(f"**Stav:** {check_github_status()}")
     
     if st.button("🔄 Synchronizovat změny akcí s GitHub", use_container_width=True):
-        try:
-            import subprocess
-            with st.spinner("Synchronizuji změny akcí s GitHub..."):
-                # Nastavení uživatele pokud není nastaven
-                try:
-                    subprocess.run(["git", "config", "user.email", "testcase-builder@example.com"], 
-                                 check=True, cwd=BASE_DIR)
-                    subprocess.run(["git", "config", "user.name", "TestCase Builder"], 
-                                 check=True, cwd=BASE_DIR)
-                except:
-                    st.warning("Nelze nastavit Git uživatele, pokračuji...")
-                
-                # Přidání změn v kroky.json
-                result_add = subprocess.run(["git", "add", "kroky.json"], 
-                                          capture_output=True, text=True, cwd=BASE_DIR)
-                if result_add.returncode != 0:
-                    st.error(f"Git add selhal: {result_add.stderr}")
-                    st.stop()
-                
-                # Kontrola zda jsou nějaké změny k commitování
-                result_status = subprocess.run(["git", "status", "--porcelain", "kroky.json"], 
-                                             capture_output=True, text=True, cwd=BASE_DIR)
-                if not result_status.stdout.strip():
-                    st.info("Žádné změny v akcích k synchronizaci")
-                    st.stop()
-                
-                # Commit
-                result_commit = subprocess.run(
-                    ["git", "commit", "-m", "Manuální synchronizace: změny v akcích"], 
-                    capture_output=True, text=True, cwd=BASE_DIR
-                )
-                if result_commit.returncode != 0:
-                    st.error(f"Git commit selhal: {result_commit.stderr}")
-                    st.stop()
-                
-                # Pull s rebase
-                try:
-                    result_pull = subprocess.run(["git", "pull", "--rebase", "--autostash"], 
-                                               capture_output=True, text=True, cwd=BASE_DIR)
-                    if result_pull.returncode != 0:
-                        st.warning(f"Git pull selhal: {result_pull.stderr}")
-                except Exception as pull_error:
-                    st.warning(f"Git pull selhal: {pull_error}")
-                
-                # Push
-                result_push = subprocess.run(["git", "push"], 
-                                           capture_output=True, text=True, cwd=BASE_DIR)
-                if result_push.returncode != 0:
-                    st.warning(f"Git push selhal: {result_push.stderr}")
-                    st.info("Změny byly uloženy lokálně, ale nelze je nahrát na GitHub.")
-                else:
-                    st.success("✅ Všechny změny akcí byly synchronizovány s GitHub!")
-                
-                refresh_all_data()
-                
-        except Exception as e:
-            st.error(f"❌ Synchronizace selhala: {e}")
-            st.info("Změny byly uloženy lokálně v kroky.json")
+        # Commit a push běží na pozadí, stav se ukazuje v postranním panelu
+        get_sync_worker().request_sync([KROKY_PATH], "Manuální synchronizace: změny v akcích", immediate=True)
+        st.info("Synchronizace zařazena - probíhá na pozadí.")
+    
+    show_sync_state(st)
 
 # ---------- Sidebar ----------
+tracer.section("app.sidebar")
 st.sidebar.title("📁 Projekt")
 projects = get_projects()
+# Stav, ze kterého tato session vychází - základ pro sloučení při uložení
+base_projects = projects
 project_names = list(projects.keys())
 
+# Úklid session - opuštěné editace a výsledky nad starší verzí dat
+collect_stale_buffers(st.session_state, get_steps(), {"kroky": snapshot_version(KROKY_PATH)})
+
 selected_project = st.sidebar.selectbox(
     "Vyber projekt",
     options=["— vyber —"] + project_names,
@@ -504,6 +469,7 @@ if selected_project != "— vyber —" and selected_project in projects:
         new_name = st.text_input("Nový název projektu", value=selected_project)
         if st.button("Uložit nový název"):
             if new_name.strip() and new_name != selected_project:
+                projects = thaw(projects)
                 projects[new_name] = projects.pop(selected_project)
                 selected_project = new_name
                 save_projects_safely(projects)
@@ -515,6 +481,7 @@ if selected_project != "— vyber —" and selected_project in projects:
         new_subject = st.text_input("Nový Subject", value=current_subject)
         if st.button("Uložit Subject"):
             if new_subject.strip():
+                projects = thaw(projects)
                 projects[selected_project]["subject"] = new_subject.strip()
                 save_projects_safely(projects)
                 st.success("✅ Subject změněn")
@@ -523,20 +490,62 @@ if selected_project != "— vyber —" and selected_project in projects:
     with st.sidebar.expander("🗑️ Smazat projekt"):
         st.warning(f"Chceš smazat projekt '{selected_project}'?")
         if st.button("ANO, smazat projekt"):
+            projects = thaw(projects)
             projects.pop(selected_project)
             save_projects_safely(projects)
             st.success(f"✅ Projekt '{selected_project}' smazán")
             st.rerun()
 
+st.sidebar.markdown("---")
+show_sync_state(st.sidebar)
+
 # ---------- Hlavní část ----------
+tracer.section("app.header")
 st.title("🧪 TestCase Builder – GUI")
 
+for conflict in st.session_state.pop("save_conflicts", []):
+    st.warning(f"⚠️ {conflict}")
+
+# ---------- Vyhledávání ----------
+tracer.section("app.search")
+SEARCH_PAGE_SIZE = 20
+
+with st.expander("🔎 Hledat ve všech projektech"):
+    search_query = st.text_input("Hledaný text", placeholder="Např.: FWA outdoor změna SAC", key="search_query")
+    if search_query.strip():
+        search_page = st.session_state.get("search_page", 1)
+        if st.session_state.get("search_last_query") != search_query:
+            st.session_state["search_last_query"] = search_query
+            search_page = 1
+
+        total, results = search_all(search_query, page=search_page, page_size=SEARCH_PAGE_SIZE)
+        pages = max(1, -(-total // SEARCH_PAGE_SIZE))
+        st.caption(f"Nalezeno {total} výsledků · strana {search_page} / {pages}")
+
+        for hit in results:
+            where = f" · {hit['project']}" if hit["project"] and hit["kind"] != "project" else ""
+            st.markdown(f"{SEARCH_KIND_LABELS[hit['kind']]}{where} · **{hit['title']}**")
+            if hit["snippet"]:
+                st.caption(hit["snippet"])
+
+        col_prev, col_next = st.columns(2)
+        with col_prev:
+            if st.button("⬅️ Předchozí", disabled=search_page <= 1, key="search_prev"):
+                st.session_state["search_page"] = search_page - 1
+                st.rerun()
+        with col_next:
+            if st.button("Další ➡️", disabled=search_page >= pages, key="search_next"):
+                st.session_state["search_page"] = search_page + 1
+                st.rerun()
+
 if selected_project == "— vyber —":
     st.info("Vyber nebo vytvoř projekt v levém panelu.")
+    finish_rerun()
     st.stop()
 
 if selected_project not in projects:
     st.error(f"Projekt '{selected_project}' nebyl nalezen v datech. Vyber jiný projekt.")
+    finish_rerun()
     st.stop()
 
 # NOVÁ HLAVIČKA
@@ -544,13 +553,15 @@ st.subheader("📊 Přehled projektu")
 
 # Základní informace pod sebou
 st.write(f"**Aktivní projekt:** {selected_project}")
-st.write(f"**Subject:** {projects[selected_project].get('subject', 'UAT2\\\\Antosova\\\\')}")
+default_subject = "UAT2\\Antosova\\"
+st.write(f"**Subject:** {projects[selected_project].get('subject', default_subject)}")
 st.write(f"**Počet scénářů:** {len(projects[selected_project].get('scenarios', []))}")
 st.write(f"**GitHub stav:** {check_github_status()}")
 
 st.markdown("---")
 
 # ---------- SEZNAM SCÉNÁŘŮ ----------
+tracer.section("app.scenarios")
 st.subheader("📋 Seznam scénářů")
 
 scenarios = projects[selected_project].get("scenarios", [])
@@ -575,6 +586,7 @@ if scenarios:
         )
         
         if st.button("🔢 Přečíslovat scénáře od 001", use_container_width=True):
+            projects = thaw(projects)
             scen = projects[selected_project]["scenarios"]
             for i, t in enumerate(sorted(scen, key=lambda x: x["order_no"]), start=1):
                 nove_cislo = f"{i:03d}"
@@ -590,6 +602,7 @@ if scenarios:
                     t["test_name"] = f"{nove_cislo}_{t['test_name']}"
             
             projects[selected_project]["scenarios"] = scen
+            reset_next_id(projects[selected_project])
             save_projects_safely(projects)
             st.success("✅ Scénáře a názvy byly přečíslovány.")
             st.rerun()
@@ -599,45 +612,22 @@ else:
 st.markdown("---")
 
 # ---------- ANALÝZA SCÉNÁŘŮ ----------
+tracer.section("app.analysis")
 st.subheader("📊 Analýza scénářů")
 
 # Shromáždění dat pro stromovou strukturu
 segment_data = {"B2C": {}, "B2B": {}}
 
-for scenario in scenarios:
-    segment = scenario.get("segment", "NEZNÁMÝ")
-    kanal = scenario.get("kanal", "NEZNÁMÝ")
-    
-    # SPRÁVNÁ DETEKCE TECHNOLOGIE z názvu test case
-    test_name = scenario.get("test_name", "")
-    technologie = "DSL"
-    
-    if "FIBER" in test_name:
-        technologie = "FIBER"
-    elif "FWA_BISI" in test_name:
-        technologie = "FWA BISI" 
-    elif "FWA_BI" in test_name:
-        technologie = "FWA BI"
-    elif "CABLE" in test_name:
-        technologie = "CABLE"
-    elif "HLAS" in test_name:
-        technologie = "HLAS"
-    elif "DSL" in test_name:
-        technologie = "DSL"
-    
-    akce = scenario.get("akce", "NEZNÁMÁ")
-    
-    if segment not in segment_data:
-        segment_data[segment] = {}
-    
-    if kanal not in segment_data[segment]:
-        segment_data[segment][kanal] = {}
-        
-    if technologie not in segment_data[segment][kanal]:
-        segment_data[segment][kanal][technologie] = []
-        
-    if akce not in segment_data[segment][kanal][technologie]:
-        segment_data[segment][kanal][technologie].append(akce)
+# Buňky pokrytí jsou předpočítané při uložení (coverage.py), technologie je uložená u scénáře
+for cell in get_coverage(selected_project)["cells"]:
+    cell = split_cell(cell)
+    akce_v_bunce = (
+        segment_data.setdefault(cell["segment"], {})
+        .setdefault(cell["kanal"], {})
+        .setdefault(cell["technologie"], [])
+    )
+    if cell["akce"] not in akce_v_bunce:
+        akce_v_bunce.append(cell["akce"])
 
 # VYTVOŘENÍ STROMOVÉ STRUKTURY
 col_b2c, col_b2b = st.columns(2)
@@ -679,6 +669,7 @@ with col_b2b:
 st.markdown("---")
 
 # ---------- PŘEHLED KROKŮ PODLE AKCÍ ----------
+tracer.section("app.steps_overview")
 with st.expander("📋 Přehled kroků podle akcí", expanded=False):
     st.subheader("Kroky dostupné v systému")
     
@@ -730,17 +721,28 @@ with st.expander("📋 Přehled kroků podle akcí", expanded=False):
 st.markdown("---")
 
 # VYTVOŘÍME ZÁLOŽKY PRO SPRÁVU SCÉNÁŘŮ A AKCÍ
-tab1, tab2, tab3, tab4 = st.tabs(["➕ Přidat scénáře", "🔧 Správa akcí", "📤 Export", "🔍 Diagnostika"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["➕ Přidat scénáře", "🔧 Správa akcí", "📤 Export", "🔍 Diagnostika", "📈 Dashboard"])
 
+tracer.section("app.tab1")
 with tab1:
     # ---------- Přidání scénáře ----------
     st.subheader("➕ Přidat nový scénář")
     steps_data = get_steps()
     akce_list = list(steps_data.keys())
 
+    # Věta je mimo formulář, aby se podle ní hned předvybrala akce
+    veta = st.text_area("Věta (požadavek)", height=100, placeholder="Např.: Aktivuj DSL na B2C přes kanál SHOP …")
+    navrhy = get_action_index(steps_data).rank(veta, limit=3)
+    navrzena_akce = navrhy[0][0] if navrhy else None
+
     with st.form("add_scenario"):
-        veta = st.text_area("Věta (požadavek)", height=100, placeholder="Např.: Aktivuj DSL na B2C přes kanál SHOP …")
-        akce = st.selectbox("Akce (z kroky.json)", options=akce_list)
+        akce = st.selectbox(
+            "Akce (z kroky.json)",
+            options=akce_list,
+            index=akce_list.index(navrzena_akce) if navrzena_akce in akce_list else 0
+        )
+        if navrhy:
+            st.caption("🔎 Navržené akce: " + ", ".join(f"{a} ({skore:.2f})" for a, skore in navrhy))
         
         kroky_pro_akci = get_steps_from_action(akce, steps_data)
         pocet_kroku = len(kroky_pro_akci)
@@ -764,17 +766,115 @@ with tab1:
             elif not akce:
                 st.error("Vyber akci (kroky.json).")
             else:
-                tc = generate_testcase(
-                    project=selected_project,
-                    veta=veta.strip(),
-                    akce=akce,
-                    priority=priority,
-                    complexity=complexity,
-                    kroky_data=steps_data,
-                    projects_data=projects
-                )
-                st.success(f"✅ Scénář přidán: {tc['test_name']}")
-                st.rerun()
+                projects = thaw(projects)
+                item = {"veta": veta.strip(), "akce": akce, "priority": priority, "complexity": complexity}
+                tc = generate_testcases(selected_project, [item], steps_data, projects, persist=False)[0]
+                if save_projects_safely(projects):
+                    st.success(f"✅ Scénář přidán: {tc['test_name']}")
+                    st.rerun()
+
+    # ---------- Hromadný import ----------
+    with st.expander("📥 Hromadný import scénářů"):
+        st.caption("Jedna věta na řádek, nebo CSV/XLSX se sloupcem 'veta' (volitelně 'akce', 'priorita', 'komplexita').")
+        bulk_text = st.text_area("Věty", height=150, key="bulk_text")
+        bulk_file = st.file_uploader("…nebo soubor", type=["csv", "xlsx"], key="bulk_file")
+
+        if st.button("🔎 Připravit náhled", key="bulk_prepare"):
+            try:
+                if bulk_file is not None:
+                    vety = sentences_from_file(bulk_file.name, bulk_file.getvalue())
+                else:
+                    vety = sentences_from_text(bulk_text)
+                st.session_state["bulk_preview"] = build_preview(vety, steps_data)
+            except Exception as e:
+                st.error(f"❌ Soubor se nepodařilo načíst: {e}")
+
+        preview = st.session_state.get("bulk_preview")
+        if preview is not None and not preview.empty:
+            edited = st.data_editor(
+                preview,
+                key="bulk_editor",
+                hide_index=True,
+                use_container_width=True,
+                disabled=["segment", "kanal", "technologie", "kroky"],
+                column_config={
+                    "veta": st.column_config.TextColumn("Věta", width="large"),
+                    "akce": st.column_config.SelectboxColumn("Akce", options=akce_list),
+                    "priority": st.column_config.SelectboxColumn("Priorita", options=list(PRIORITY_MAP.values())),
+                    "complexity": st.column_config.SelectboxColumn("Komplexita", options=list(COMPLEXITY_MAP.values())),
+                },
+            )
+
+            errors = validate_preview(edited, steps_data)
+            for row_no, message in errors[:10]:
+                st.warning(f"⚠️ Řádek {row_no}: {message}")
+
+            col_save, col_cancel = st.columns(2)
+            with col_save:
+                if st.button(f"💾 Uložit {len(edited)} scénářů", type="primary", disabled=bool(errors), key="bulk_save"):
+                    projects = thaw(projects)
+                    items = [
+                        {"veta": row.veta.strip(), "akce": row.akce, "priority": row.priority, "complexity": row.complexity}
+                        for row in edited.itertuples(index=False)
+                    ]
+                    generate_testcases(selected_project, items, steps_data, projects, persist=False)
+                    # Jediné uložení pro celou dávku
+                    if save_projects_safely(projects):
+                        st.session_state.pop("bulk_preview", None)
+                        st.success(f"✅ Přidáno {len(edited)} scénářů")
+                        st.rerun()
+            with col_cancel:
+                if st.button("🗑️ Zahodit náhled", key="bulk_discard"):
+                    st.session_state.pop("bulk_preview", None)
+                    st.rerun()
+        elif preview is not None:
+            st.info("Nenalezeny žádné věty.")
+
+    # ---------- Generátor matice ----------
+    with st.expander("🧮 Generátor matice scénářů"):
+        st.caption("Zvol hodnoty dimenzí - vznikne scénář pro každou kombinaci (nebo jen pro pokrytí všech dvojic).")
+        col_seg, col_kan, col_tech = st.columns(3)
+        with col_seg:
+            matrix_segment = st.multiselect("Segment", DIMENSION_VALUES["segment"], key="matrix_segment")
+        with col_kan:
+            matrix_kanal = st.multiselect("Kanál", DIMENSION_VALUES["kanal"], key="matrix_kanal")
+        with col_tech:
+            matrix_tech = st.multiselect("Technologie", DIMENSION_VALUES["technologie"], key="matrix_tech")
+        matrix_akce = st.multiselect("Akce (z kroky.json)", akce_list, key="matrix_akce")
+        matrix_rules_text = st.text_area(
+            "Vyloučené kombinace (jedno pravidlo na řádek)",
+            placeholder="segment=B2B, technologie=FWA_BISI\ntechnologie=HLAS|FWA, kanal=IL",
+            key="matrix_rules"
+        )
+        col_mode, col_prio = st.columns(2)
+        with col_mode:
+            matrix_mode = st.radio("Režim", ["Všechny kombinace", "Pairwise (všechny dvojice)"], key="matrix_mode")
+        with col_prio:
+            matrix_priority = st.selectbox("Priorita", options=list(PRIORITY_MAP.values()), index=1, key="matrix_priority")
+
+        matrix_values = {"segment": matrix_segment, "kanal": matrix_kanal, "technologie": matrix_tech, "akce": matrix_akce}
+        try:
+            matrix_rules = parse_exclusions(matrix_rules_text)
+        except ValueError as e:
+            matrix_rules = None
+            st.error(f"❌ {e}")
+
+        if matrix_akce and matrix_rules is not None:
+            if matrix_mode.startswith("Pairwise"):
+                combos = pairwise(matrix_values, matrix_rules)
+            else:
+                combos = list(expand(matrix_values, matrix_rules))
+            st.info(f"ℹ️ {len(combos)} scénářů (plný součin: {count_full(matrix_values)})")
+
+            if combos and st.button(f"🧮 Vygenerovat {len(combos)} scénářů", type="primary", key="matrix_generate"):
+                projects = thaw(projects)
+                items = build_items(combos, steps_data, matrix_priority)
+                generate_testcases(selected_project, items, steps_data, projects, persist=False)
+                if save_projects_safely(projects):
+                    st.success(f"✅ Přidáno {len(items)} scénářů")
+                    st.rerun()
+        else:
+            st.info("Vyber alespoň jednu akci.")
 
     st.markdown("---")
 
@@ -803,11 +903,16 @@ with tab1:
                     complexity = st.selectbox("Komplexita", options=list(COMPLEXITY_MAP.values()), index=list(COMPLEXITY_MAP.values()).index(scenario["complexity"]))
                     
                     if st.form_submit_button("💾 Uložit změny"):
+                        projects = thaw(projects)
+                        scenario = projects[selected_project]["scenarios"][scenario_index]
                         scenario["veta"] = veta.strip()
                         scenario["akce"] = akce
                         scenario["priority"] = priority
                         scenario["complexity"] = complexity
-                        scenario["kroky"] = get_steps_from_action(akce, steps_data)
+                        # Místo kopie kroků jen odkaz do sdílené tabulky
+                        scenario.pop("kroky", None)
+                        scenario["kroky_ref"] = store_step_set(get_steps_from_action(akce, steps_data))
+                        scenario["technologie"] = scenario_technologie(scenario)
                         
                         # OPRAVA: Zachováme strukturu názvu, pouze aktualizujeme větu
                         current_name_parts = scenario["test_name"].split("_")
@@ -818,6 +923,7 @@ with tab1:
                         else:
                             # Pokud formát není standardní, vytvoříme nový název
                             segment, kanal, technologie = parse_veta(veta.strip())
+                            scenario["technologie"] = technologie
                             new_test_name = f"{current_name_parts[0]}_{kanal}_{segment}_{technologie}_{veta.strip()}"
                         
                         scenario["test_name"] = new_test_name
@@ -843,144 +949,129 @@ with tab1:
         if to_delete != "— žádný —":
             idx = int(to_delete.split(" - ")[0])
             if st.button("🗑️ Potvrdit smazání scénáře"):
+                projects = thaw(projects)
                 scen = [t for t in projects[selected_project]["scenarios"] if t.get("order_no") != idx]
                 for i, t in enumerate(scen, start=1):
                     t["order_no"] = i
                 projects[selected_project]["scenarios"] = scen
+                reset_next_id(projects[selected_project])
                 save_projects_safely(projects)
                 st.success("Scénář smazán a pořadí přepočítáno.")
                 st.rerun()
 
+tracer.section("app.tab2")
 with tab2:
     st.subheader("🔧 Správa akcí a kroků")
     st.info("Zde můžete spravovat všechny akce a jejich kroky. Změny se projeví okamžitě v celé aplikaci.")
     
     sprava_akci()
 
+    # ---------- Podobné kroky a akce ----------
+    with st.expander("🧬 Podobné kroky a akce"):
+        st.caption("Najde téměř stejné kroky napříč všemi akcemi (MinHash/LSH) a navrhne jejich sjednocení.")
+        dup_threshold = st.slider("Minimální podobnost kroků", 0.5, 1.0, STEP_THRESHOLD, 0.05, key="dup_threshold")
+
+        if st.button("🔎 Najít podobné", key="dup_find"):
+            st.session_state["dup_result"] = {
+                "version": snapshot_version(KROKY_PATH),
+                "threshold": dup_threshold,
+                "steps": find_duplicate_steps(get_steps(), dup_threshold),
+                "actions": find_duplicate_actions(get_steps()),
+            }
+
+        dup_result = st.session_state.get("dup_result")
+        if dup_result:
+            st.write(f"**Skupiny podobných kroků:** {len(dup_result['steps'])}")
+            st.caption("Sjednotí se jen zaškrtnuté skupiny a jen v knihovně akcí; uložené scénáře zůstávají beze změny.")
+            accepted = []
+            for group in dup_result["steps"]:
+                if st.checkbox(f"**{group['canonical'].get('description', '')}**", key=f"dup_accept_{group['canonical_hash']}"):
+                    accepted.append(group)
+                for variant in group["variants"]:
+                    st.caption(
+                        f"↳ {variant['step'].get('description', '')} · podobnost {variant['similarity']}"
+                        f" · {variant['uses']}× ({', '.join(variant['actions'])})"
+                    )
+
+            if dup_result["actions"]:
+                st.write("**Akce s podobnými kroky (kandidáti na sloučení):**")
+                for suggestion in dup_result["actions"]:
+                    first, second = suggestion["actions"]
+                    st.write(f"• {first} ≈ {second} ({suggestion['similarity']})")
+
+            if dup_result["steps"] and st.button(
+                f"🔧 Sjednotit vybrané skupiny v akcích ({len(accepted)})", type="primary", key="dup_apply",
+                disabled=not accepted,
+            ):
+                oprav_duplicitni_kroky(groups=accepted)
+                st.session_state.pop("dup_result", None)
+                st.success("✅ Kroky sjednoceny")
+                st.rerun()
+
+tracer.section("app.tab3")
 with tab3:
     st.subheader("📤 Export projektu")
     
-    st.info("Exportuje všechny scénáře projektu do Excelu pro stažení do PC.")
+    st.info("Exportuje všechny scénáře projektu pro stažení do PC.")
     
-    if st.button("💾 Exportovat do Excelu", use_container_width=True, type="primary"):
+    export_format = st.selectbox(
+        "Formát exportu",
+        options=list(EXPORT_FORMATS.keys()),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt]["label"]
+    )
+
+    # ---------- Optimalizace sady ----------
+    export_scope = st.radio(
+        "Rozsah exportu",
+        options=["all"] + list(OPTIMIZER_MODES.keys()),
+        format_func=lambda mode: "Všechny scénáře" if mode == "all" else f"Redukovaná sada – {OPTIMIZER_MODES[mode]}",
+    )
+    selected_indices = None
+    if export_scope != "all":
+        budget = st.number_input(
+            "Limit pracnosti (0 = bez limitu)", min_value=0.0, value=0.0, step=1.0,
+            help="Součet ceny vybraných scénářů (komplexita × váha priority) nepřekročí limit."
+        )
+        selected_indices, summary = optimize(scenarios, export_scope, budget or None)
+        col_sel, col_cost, col_req = st.columns(3)
+        col_sel.metric("Scénáře", f"{summary['selected']} / {summary['total']}")
+        col_cost.metric("Pracnost", f"{summary['cost_selected']} / {summary['cost_total']}")
+        col_req.metric("Pokryté požadavky", f"{summary['covered']} / {summary['requirements']}")
+        with st.expander("📋 Vybrané scénáře"):
+            st.dataframe(
+                pd.DataFrame([scenarios[i] for i in selected_indices], columns=["order_no", "test_name", "priority", "complexity"]),
+                hide_index=True, use_container_width=True
+            )
+
+    if st.button("💾 Exportovat", use_container_width=True, type="primary"):
         try:
-            with st.spinner("Exportuji do Excelu..."):
-                # Získání dat z exportu
-                export_result = export_to_excel(selected_project, projects)
-                
-                # Vytvoření bezpečného názvu souboru
-                safe_project_name = "".join(c for c in selected_project if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                safe_project_name = safe_project_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                file_name = f"testcases_{safe_project_name}.xlsx"
-                
-                # Zpracování výsledku exportu
-                if isinstance(export_result, str):
-                    # ✅ Export do dočasného souboru
-                    with open(export_result, "rb") as file:
-                        file_data = file.read()
-                    
-                    st.success("✅ Export hotový! Soubor je připraven ke stažení.")
-                    
-                    # Download button
-                    st.download_button(
-                        label="⬇️ Stáhnout Excel soubor",
-                        data=file_data,
-                        file_name=file_name,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
-                    
-                    # Úklid - smazání dočasného souboru
-                    try:
-                        import os
-                        os.unlink(export_result)
-                    except:
-                        pass
-                        
+            with st.spinner("Exportuji..."):
+                if selected_indices is None:
+                    # Nezměněný projekt se vrátí z cache, jinak se řádky streamují do paměti
+                    export_result = export_project_cached(selected_project, projects, export_format)
                 else:
-                    # ✅ Export do BytesIO (paměť)
-                    st.success("✅ Export hotový! Soubor je připraven ke stažení.")
-                    
-                    # Download button
-                    st.download_button(
-                        label="⬇️ Stáhnout Excel soubor",
-                        data=export_result.getvalue(),
-                        file_name=file_name,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
-                    
-        except Exception as e:
-            st.error(f"Export selhal: {e}")
-            
-            # ✅ JEDNODUŠŠÍ ALTERNATIVA - přímý export bez souboru
-            try:
-                st.info("🔄 Zkouším alternativní export...")
+                    reduced = {selected_project: reduced_project(projects[selected_project], selected_indices)}
+                    export_result = export_project(selected_project, reduced, export_format)
                 
-                projects_data = get_projects()
-                project_data = projects_data[selected_project]
-                rows = []
-
-                for tc in project_data["scenarios"]:
-                    for i, krok in enumerate(tc.get("kroky", []), start=1):
-                        desc = ""
-                        exp = ""
-
-                        if isinstance(krok, dict):
-                            desc = krok.get("description", "")
-                            exp = krok.get("expected", "")
-                        elif isinstance(krok, str):
-                            desc = krok
-                            exp = ""
-
-                        rows.append({
-                            "Project": selected_project,
-                            "Subject": project_data.get("subject", "UAT2\\Antosova\\"),
-                            "System/Application": "Siebel_CZ",
-                            "Description": f"Segment: {tc['segment']}\nKanál: {tc['kanal']}\nAkce: {tc['akce']}",
-                            "Type": "Manual",
-                            "Test Phase": "4-User Acceptance",
-                            "Test: Test Phase": "4-User Acceptance",
-                            "Test Priority": tc["priority"],
-                            "Test Complexity": tc["complexity"],
-                            "Test Name": tc["test_name"],
-                            "Step Name (Design Steps)": str(i),
-                            "Description (Design Steps)": desc,
-                            "Expected (Design Steps)": exp
-                        })
-
-                df = pd.DataFrame(rows)
-                
-                # ✅ PŘÍMÝ EXPORT DO BYTESIO
-                import io
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Test Cases')
-                output.seek(0)
-                
-                # Bezpečný název souboru
-                safe_name = "".join(c for c in selected_project if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                safe_name = safe_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                file_name = f"testcases_{safe_name}.xlsx"
-                
-                st.success("✅ Alternativní export úspěšný! Soubor je připraven ke stažení.")
+                st.success("✅ Export hotový! Soubor je připraven ke stažení.")
                 
                 st.download_button(
-                    label="⬇️ Stáhnout Excel soubor (alternativní metoda)",
-                    data=output.getvalue(),
-                    file_name=file_name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    label="⬇️ Stáhnout soubor",
+                    data=export_result,
+                    file_name=safe_file_name(selected_project, export_format),
+                    mime=EXPORT_FORMATS[export_format]["mime"],
                     use_container_width=True
                 )
-                
-            except Exception as alt_error:
-                st.error(f"Alternativní export také selhal: {alt_error}")
+                    
+        except Exception as e:
+            st.error(f"Export selhal: {e}")
     
     st.markdown("---")
     
     st.subheader("ℹ️ Informace o exportu")
     st.write("""
     **Co export obsahuje:**
+    - Formáty: Excel, CSV, Parquet (vyžaduje pyarrow), HPQC import XML
     - Všechny scénáře projektu
     - Kroky jednotlivých scénářů
     - Metadata (priorita, komplexita, segment, kanál)
@@ -988,122 +1079,185 @@ with tab3:
     **Co se stane po exportu:**
     1. Data se exportují přímo do paměti
     2. Soubor je připraven ke stažení
-    3. **Žádné ukládání na disk** - pouze download
+    3. Hotový soubor se uloží do cache (`exports/.cache`) - opakovaný export nezměněného projektu je okamžitý
     """)
 
 
+tracer.section("app.tab4")
 with tab4:
     st.subheader("🔍 Diagnostika systému")
     st.info("Tato záložka slouží pro diagnostiku problémů se synchronizací a ukládáním dat.")
     
     if st.button("🔄 Spustit diagnostiku", use_container_width=True):
-        import subprocess
-        import os
-        
+        # Kontroly jen čtou a běží souběžně - nic se nezapisuje do kroky.json ani projects.json
+        st.session_state["health_report"] = run_health_checks()
+
+    health_report = st.session_state.get("health_report")
+    if health_report:
         st.markdown("---")
         st.subheader("📊 Výsledky diagnostiky")
-        
-        # 1. Informace o kroky.json
-        st.write("### 📁 Informace o kroky.json")
-        kroky_cesta = BASE_DIR / "kroky.json"
-        st.write(f"**Cesta:** `{kroky_cesta}`")
-        st.write(f"**Existuje:** `{kroky_cesta.exists()}`")
-        
-        if kroky_cesta.exists():
-            st.write(f"**Velikost:** `{os.path.getsize(kroky_cesta)} bytes`")
-            st.write(f"**Poslední změna:** `{datetime.fromtimestamp(os.path.getmtime(kroky_cesta))}`")
-            
-            # Načteme a zobrazíme počet akcí
-            try:
-                with open(kroky_cesta, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                st.write(f"**Počet akcí v souboru:** `{len(data)}`")
-                st.write("**Názvy akcí:**")
-                for akce in list(data.keys())[:10]:  # Prvních 10 akcí
-                    st.write(f"  - {akce}")
-                if len(data) > 10:
-                    st.write(f"  - ... a dalších {len(data) - 10} akcí")
-            except Exception as e:
-                st.error(f"Chyba při čtení kroky.json: {e}")
-        
-        # 2. Git stav
-        st.markdown("---")
-        st.write("### 🔧 Git stav")
-        
-        # Git status kroky.json
-        result_status = subprocess.run(["git", "status", "-s", "kroky.json"], 
-                                     capture_output=True, text=True, cwd=BASE_DIR)
-        status_output = result_status.stdout.strip()
-        st.write(f"**Status kroky.json:** `{status_output or 'Žádné změny'}`")
-        
-        # Git diff kroky.json
-        result_diff = subprocess.run(["git", "diff", "kroky.json"], 
-                                   capture_output=True, text=True, cwd=BASE_DIR)
-        diff_output = result_diff.stdout.strip()
-        if diff_output:
-            st.write("**Změny v kroky.json:**")
-            st.code(diff_output)
-        else:
-            st.write("**Žádné změny v kroky.json podle Gitu**")
-        
-        # Celkový Git status
-        result_all = subprocess.run(["git", "status", "-s"], 
-                                  capture_output=True, text=True, cwd=BASE_DIR)
-        all_changes = result_all.stdout.strip()
-        if all_changes:
-            st.write("**Všechny změny v repozitáři:**")
-            st.code(all_changes)
+        st.write(f"{HEALTH_ICONS[health_report['status']]} **Celkový stav:** `{health_report['status']}` "
+                 f"· {health_report['checked_at'][11:]} · {health_report['duration_ms']:.0f} ms")
+        for check in health_report["checks"]:
+            with st.expander(f"{HEALTH_ICONS[check['status']]} {check['label']} – {check['summary']}",
+                             expanded=check["status"] == "error"):
+                st.caption(f"{check['duration_ms']:.0f} ms")
+                for detail in check["details"]:
+                    st.write(f"- {detail}")
+        st.download_button("📥 Stáhnout report (JSON)", json.dumps(health_report, ensure_ascii=False, indent=2),
+                           file_name=f"health_{health_report['checked_at'].replace(':', '')}.json",
+                           mime="application/json", key="health_download")
+
+    # Cache načtených souborů
+    st.markdown("---")
+    stats = cache_stats()
+    st.write("### ⚡ Cache souborů")
+    st.write(f"**Zásahy / výpadky:** `{stats['hits']} / {stats['misses']}` "
+             f"(invalidace: `{stats['invalidations']}`, položek: `{stats['entries']}`)")
+    
+    session_stats = buffer_stats(st.session_state)
+    st.write(f"**Snapshot verze (projekty / kroky):** `{snapshot_version(PROJECTS_PATH)} / {snapshot_version(KROKY_PATH)}`")
+    st.write(f"**Tato session:** `{session_stats['keys']} klíčů, {session_stats['edit_buffers']} editací "
+             f"({session_stats['overlay_changes']} změn kroků), {session_stats['snapshot_bound']} výsledků nad snapshotem`")
+    
+    export_stats = export_cache_stats()
+    st.write(f"**Cache exportů:** `{export_stats['files']} souborů, {export_stats['bytes']} bytes` "
+             f"(zásahy / výpadky: `{export_stats['hits']} / {export_stats['misses']}`)")
+    
+    # Git stav z paměti (obnovuje ho vlákno na pozadí)
+    st.write("### 🔧 Git stav")
+    show_sync_state(st)
+
+    # ---------- Časování ----------
+    st.markdown("---")
+    st.subheader("⏱️ Časování")
+    st.caption("Doby trvání funkcí core.py, gitu a sekcí aplikace za posledních několik set volání.")
+    # Přepínač platí pro celý proces (všechny session)
+    if st.button("⏸️ Vypnout měření" if tracer.enabled else "▶️ Zapnout měření", key="timing_toggle"):
+        tracer.enabled = not tracer.enabled
+        st.rerun()
+
+    timing_rows = tracer.summary()
+    if timing_rows:
+        st.dataframe(pd.DataFrame(timing_rows), hide_index=True, use_container_width=True)
+        st.write("**Nejpomalejší reruny:**")
+        for rerun in tracer.slowest_reruns():
+            top = sorted(rerun["spans"].items(), key=lambda item: -item[1])[:3]
+            detail = ", ".join(f"{name} {ms:.0f} ms" for name, ms in top)
+            stav = {"running": " (probíhá)", "interrupted": " (přerušený)"}.get(rerun["status"], "")
+            st.write(f"- `{rerun['started']:%H:%M:%S}` **{rerun['total_ms']:.0f} ms**{stav} – {detail}")
+        if st.button("🧹 Vynulovat měření", key="timing_reset"):
+            tracer.reset()
+            st.rerun()
+    else:
+        st.info("Zatím nic naměřeno.")
+
+    # ---------- Paměť ----------
+    st.markdown("---")
+    st.subheader("🧠 Paměť")
+    st.caption("Profilování přes tracemalloc: snapshot na začátku a konci každého rerunu, "
+               "nárůst připsaný řádkům app.py/core.py. Zpomaluje aplikaci - zapínat jen při hledání úniku.")
+    rss = process_rss()
+    if memory_profiler.enabled:
+        traced, peak = memory_profiler.traced_memory()
+        col_rss, col_traced, col_peak = st.columns(3)
+        col_rss.metric("RSS procesu", f"{rss / 2**20:.0f} MB" if rss else "—")
+        col_traced.metric("Sledováno", f"{traced / 2**20:.1f} MB")
+        col_peak.metric("Špička", f"{peak / 2**20:.1f} MB")
+    elif rss:
+        st.write(f"**RSS procesu:** `{rss / 2**20:.0f} MB`")
+
+    # Přepínač platí pro celý proces (všechny session)
+    if st.button("⏸️ Vypnout profilování paměti" if memory_profiler.enabled else "▶️ Zapnout profilování paměti",
+                 key="memory_toggle"):
+        if memory_profiler.enabled:
+            memory_profiler.disable()
         else:
-            st.write("**Žádné změny v celém repozitáři**")
-        
-        # 3. Test synchronizace
-        st.markdown("---")
-        st.write("### 🧪 Test synchronizace")
-        
-        # Vytvoříme testovací změnu
-        test_content = "Testovací změna pro diagnostiku"
-        try:
-            # Přidáme komentář do kroky.json
-            with open(kroky_cesta, 'r+', encoding='utf-8') as f:
-                data = json.load(f)
-                data['_diagnostika_test'] = test_content
-                f.seek(0)
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.truncate()
-            
-            st.success("✅ Testovací změna přidána do kroky.json")
-            
-            # Zkontrolujeme Git status
-            result_test = subprocess.run(["git", "status", "-s", "kroky.json"], 
-                                       capture_output=True, text=True, cwd=BASE_DIR)
-            if result_test.stdout.strip():
-                st.success("✅ Git detekuje změny v kroky.json")
-                st.code(result_test.stdout.strip())
-                
-                # Ukážeme jak synchronizovat
-                st.write("**Návod na synchronizaci:**")
-                st.code("""
-git add kroky.json
-git commit -m "Testovací změna"
-git push
-                """)
-            else:
-                st.error("❌ Git NEDETEKUJE změny v kroky.json!")
-                st.info("""
-**Možné příčiny:**
-1. Soubor kroky.json není v Git repozitáři
-2. Gitignore blokuje soubor
-3. Problém s oprávněními
-                """)
-            
-            # Uklidíme - odstraníme testovací změnu
-            with open(kroky_cesta, 'r+', encoding='utf-8') as f:
-                data = json.load(f)
-                if '_diagnostika_test' in data:
-                    del data['_diagnostika_test']
-                    f.seek(0)
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                    f.truncate()
-            
-        except Exception as e:
-            st.error(f"❌ Test selhal: {e}")
\ No newline at end of file
+            memory_profiler.enable()
+        st.session_state.pop("memory_report", None)
+        st.rerun()
+
+    if memory_profiler.enabled:
+        reruns = memory_profiler.reruns()
+        if reruns:
+            st.write("**Nárůst paměti v posledních rerunech:**")
+            for rerun in reversed(reruns[-10:]):
+                top = ", ".join(f"{s['site']} {s['bytes'] / 1024:.0f} kB" for s in rerun["top"][:3])
+                st.write(f"- `{rerun['started'][11:]}` session `{rerun['session']}`: "
+                         f"**{rerun['growth_bytes'] / 1024:+.0f} kB** – {top or 'bez nárůstu v aplikaci'}")
+
+        sessions = memory_profiler.sessions()
+        if sessions:
+            st.write("**Velikost session_state po session:**")
+            st.dataframe(
+                pd.DataFrame([{"session": s["session"], "kB": round(s["bytes"] / 1024, 1), "klíčů": s["keys"]} for s in sessions]),
+                hide_index=True, use_container_width=True
+            )
+
+        if st.button("🔎 Největší alokace a report", key="memory_analyze"):
+            st.session_state["memory_report"] = memory_profiler.report()
+        memory_report = st.session_state.get("memory_report")
+        if memory_report:
+            st.write("**Místa s nejvíc drženou pamětí** (řádek aplikace, kam traceback dosáhne, jinak knihovna):")
+            st.dataframe(
+                pd.DataFrame([
+                    {"místo": s["site"], "kB": round(s["bytes"] / 1024, 1), "alokací": s["count"]}
+                    for s in json.loads(memory_report)["top_allocators"]
+                ]),
+                hide_index=True, use_container_width=True
+            )
+            st.download_button("📥 Stáhnout report (JSON)", memory_report,
+                               file_name=f"memory_report_{datetime.now():%Y%m%d_%H%M%S}.json",
+                               mime="application/json", key="memory_download")
+
+tracer.section("app.tab5")
+with tab5:
+    st.subheader("📈 Pokrytí napříč projekty")
+    st.caption("Čte předpočítané agregáty (coverage.json) - přepočítávají se jen změněné projekty při uložení.")
+
+    dashboard_scope = st.selectbox(
+        "Rozsah",
+        options=["— všechny projekty —"] + project_names,
+        key="dashboard_scope"
+    )
+    coverage = get_coverage(None if dashboard_scope == "— všechny projekty —" else dashboard_scope)
+
+    col_scen, col_cells = st.columns(2)
+    col_scen.metric("Scénáře", coverage["scenarios"])
+    col_cells.metric("Pokryté kombinace", len(coverage["cells"]))
+
+    if coverage["cells"]:
+        cells_df = pd.DataFrame(
+            [{**split_cell(key), "count": count} for key, count in coverage["cells"].items()]
+        )
+        cells_df["segment_kanal"] = cells_df["segment"] + " / " + cells_df["kanal"]
+        heatmap = cells_df.groupby(["segment_kanal", "technologie"], as_index=False)["count"].sum()
+
+        st.write("**Heatmapa pokrytí (segment / kanál × technologie)**")
+        st.altair_chart(
+            alt.Chart(heatmap).mark_rect().encode(
+                x=alt.X("technologie:N", title="Technologie"),
+                y=alt.Y("segment_kanal:N", title="Segment / kanál"),
+                color=alt.Color("count:Q", title="Scénáře", scale=alt.Scale(scheme="blues")),
+                tooltip=["segment_kanal", "technologie", "count"],
+            ),
+            use_container_width=True
+        )
+
+        col_prio, col_comp = st.columns(2)
+        with col_prio:
+            st.write("**Priorita**")
+            st.bar_chart(pd.Series(coverage["priority"], name="Scénáře").sort_index())
+        with col_comp:
+            st.write("**Komplexita**")
+            st.bar_chart(pd.Series(coverage["complexity"], name="Scénáře").sort_index())
+
+        with st.expander("📋 Kombinace podle akcí"):
+            st.dataframe(
+                cells_df[["segment", "kanal", "technologie", "akce", "count"]].sort_values("count", ascending=False),
+                hide_index=True, use_container_width=True
+            )
+    else:
+        st.info("Zatím žádné scénáře.")
+
+finish_rerun()
@@ -0,0 +1,107 @@
+import io
+
+import pandas as pd
+
+from core import (
+    PRIORITY_MAP, COMPLEXITY_MAP,
+    get_automatic_complexity, get_steps_from_action, parse_vety, fold_text
+)
+from action_index import get_action_index
+
+# Sloupce náhledu hromadného importu
+PREVIEW_COLUMNS = ["veta", "akce", "segment", "kanal", "technologie", "priority", "complexity", "kroky"]
+
+# Názvy sloupců v CSV/XLSX, které se berou jako věta / akce / priorita / komplexita
+SENTENCE_COLUMNS = {"veta", "sentence", "pozadavek", "text"}
+ACTION_COLUMNS = {"akce", "action"}
+PRIORITY_COLUMNS = {"priorita", "priority"}
+COMPLEXITY_COLUMNS = {"komplexita", "complexity"}
+
+DEFAULT_PRIORITY = PRIORITY_MAP["2"]
+
+
+# ---------- Vstupy ----------
+def sentences_from_text(text):
+    """Jedna věta na řádek, prázdné řádky a odrážky se přeskočí"""
+    vety = []
+    for line in (text or "").splitlines():
+        line = line.strip().lstrip("-*•").strip()
+        if line:
+            vety.append(line)
+    return pd.DataFrame({"veta": vety})
+
+
+def sentences_from_file(file_name, data: bytes):
+    """Načte CSV nebo XLSX; věta je ve sloupci veta/sentence, jinak v prvním sloupci.
+
+    Volitelné sloupce akce, priorita a komplexita se převezmou do náhledu.
+    """
+    if file_name.lower().endswith((".xlsx", ".xlsm")):
+        df = pd.read_excel(io.BytesIO(data), dtype=str)
+    else:
+        # Oddělovač ; i , - CSV z Excelu bývá se středníkem
+        df = pd.read_csv(io.BytesIO(data), dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+
+    columns = {fold_text(str(c)).strip(): c for c in df.columns}
+
+    def pick(names):
+        return next((columns[n] for n in names if n in columns), None)
+
+    sentence_col = pick(SENTENCE_COLUMNS) or df.columns[0]
+    result = pd.DataFrame({"veta": df[sentence_col].fillna("").astype(str).str.strip()})
+    for target, names in (("akce", ACTION_COLUMNS), ("priority", PRIORITY_COLUMNS), ("complexity", COMPLEXITY_COLUMNS)):
+        col = pick(names)
+        if col is not None:
+            result[target] = df[col]
+    return result[result["veta"] != ""].reset_index(drop=True)
+
+
+# ---------- Náhled ----------
+def _normalize_choice(value, mapping, default):
+    """Přijme "1" i "1-High"; neznámou hodnotu nahradí výchozí"""
+    if value is None or pd.isna(value):
+        return default
+    value = str(value).strip()
+    if value in mapping.values():
+        return value
+    return mapping.get(value, default)
+
+
+def build_preview(sentences: pd.DataFrame, kroky_data):
+    """Klasifikuje všechny věty najednou a doplní akci, prioritu a komplexitu"""
+    if sentences.empty:
+        return pd.DataFrame(columns=PREVIEW_COLUMNS)
+
+    preview = sentences.copy()
+    preview[["segment", "kanal", "technologie"]] = parse_vety(preview["veta"])
+
+    index = get_action_index(kroky_data)
+    given_actions = preview["akce"] if "akce" in preview else pd.Series([None] * len(preview))
+    preview["akce"] = [
+        akce if isinstance(akce, str) and akce in kroky_data else index.best(veta)
+        for veta, akce in zip(preview["veta"], given_actions)
+    ]
+
+    step_counts = {akce: len(get_steps_from_action(akce, kroky_data)) for akce in kroky_data}
+    preview["kroky"] = [step_counts.get(akce, 0) for akce in preview["akce"]]
+
+    given_priority = preview["priority"] if "priority" in preview else [None] * len(preview)
+    preview["priority"] = [_normalize_choice(p, PRIORITY_MAP, DEFAULT_PRIORITY) for p in given_priority]
+
+    given_complexity = preview["complexity"] if "complexity" in preview else [None] * len(preview)
+    preview["complexity"] = [
+        _normalize_choice(c, COMPLEXITY_MAP, get_automatic_complexity(pocet))
+        for c, pocet in zip(given_complexity, preview["kroky"])
+    ]
+    return preview[PREVIEW_COLUMNS]
+
+
+def validate_preview(preview: pd.DataFrame, kroky_data):
+    """Seznam chyb (číslo řádku od 1, text); prázdný seznam = lze uložit"""
+    errors = []
+    for i, row in enumerate(preview.itertuples(index=False), start=1):
+        if not str(row.veta or "").strip():
+            errors.append((i, "Věta nesmí být prázdná."))
+        if not row.akce or row.akce not in kroky_data:
+            errors.append((i, "Vyber akci (kroky.json)."))
+    return errors
@@ -0,0 +1,259 @@
+import copy
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from step_sets import content_hash
+
+# Klíče projektu, které řídí uložení samo - do 3cestného slučování nevstupují
+VERSION_KEY = "version"
+COUNTER_KEY = "next_id"
+
+
+# ---------- Zámek souboru ----------
+def _pid_alive(pid):
+    """Běží proces s daným PID? Mimo POSIX nejde zjistit bez rizika (os.kill proces ukončí) - vrací None"""
+    if os.name != "posix":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Zámek s naším PID starší než tento proces zbyl po předchozím běhu se stejným PID
+_PROCESS_STARTED = time.time()
+
+
+class FileLock:
+    """Meziprocesový zámek přes soubor vytvořený s O_EXCL.
+
+    Funguje stejně na Linuxu i Windows a chrání i vlákna jednoho procesu
+    (Streamlit session). Držitel zámku obnovuje jeho mtime ve vlákně na
+    pozadí, takže ani dlouhé uložení nevypadá jako opuštěný zámek. Zámek
+    neobnovený déle než `stale_after` sekund se považuje za pozůstatek
+    spadlého procesu a smaže se - pokud proces zapsaný v zámku ještě
+    běží (POSIX), nechá se být. Zámek s vlastním PID vytvořený před startem
+    procesu zbyl po předchozím běhu (v kontejneru bývá aplikace vždy PID 1)
+    a smaže se hned.
+    """
+
+    def __init__(self, path: Path, timeout=10.0, stale_after=30.0, poll=0.02):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll = poll
+        self._heartbeat = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode("ascii"))
+                os.close(fd)
+                self._start_heartbeat()
+                return
+            except FileExistsError:
+                try:
+                    if self._is_stale():
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Zámek {self.path.name} se nepodařilo získat do {self.timeout} s")
+                time.sleep(self.poll)
+
+    def _is_stale(self):
+        try:
+            owner = int(self.path.read_text(encoding="ascii").strip())
+        except ValueError:
+            owner = None  # prázdný nebo nedopsaný zámek
+        age = time.time() - self.path.stat().st_mtime
+        if owner == os.getpid():
+            # Zámky tohoto procesu vznikly po startu a obnovuje je heartbeat (1 s rezerva na přesnost mtime)
+            return age > time.time() - _PROCESS_STARTED + 1 or age > self.stale_after
+        if age <= self.stale_after:
+            return False
+        return owner is None or not _pid_alive(owner)
+
+    def _start_heartbeat(self):
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.stale_after / 3):
+                try:
+                    os.utime(self.path)
+                except FileNotFoundError:
+                    return
+
+        thread = threading.Thread(target=beat, name=f"lock-heartbeat-{self.path.name}", daemon=True)
+        thread.start()
+        self._heartbeat = stop
+
+    def release(self):
+        if self._heartbeat is not None:
+            self._heartbeat.set()
+            self._heartbeat = None
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# ---------- Identita scénářů ----------
+def new_scenario_id():
+    return uuid.uuid4().hex[:12]
+
+
+def ensure_scenario_ids(projects_data):
+    """Doplní chybějící `uid` scénářů (v místě) a zajistí, že jsou v projektu jedinečná.
+
+    U starších scénářů je uid odvozené z obsahu, takže každá session, která
+    načte stejný soubor, dostane stejné uid - po prvním uložení už je trvalé.
+    Stejné kopie scénáře (nebo zkopírované uid) by se při slučování slily
+    do jednoho, proto další výskyt dostane uid odvozené i z pořadí výskytu.
+    """
+    for name, project_data in projects_data.items():
+        used = set()
+        for tc in project_data.get("scenarios", []):
+            key = [name, tc.get("order_no"), tc.get("test_name"), tc.get("veta"), tc.get("akce")]
+            if "uid" not in tc:
+                tc["uid"] = content_hash(key)[:12]
+            occurrence = 0
+            while tc["uid"] in used:
+                occurrence += 1
+                tc["uid"] = content_hash(key + [occurrence])[:12]
+            used.add(tc["uid"])
+    return projects_data
+
+
+def project_version(project_data):
+    return (project_data or {}).get(VERSION_KEY, 0)
+
+
+# ---------- 3cestné slučování ----------
+def _merge_value(base, mine, theirs):
+    """(výsledek, konflikt?) pro jednu hodnotu"""
+    if mine == base:
+        return theirs, False
+    if theirs == base or mine == theirs:
+        return mine, False
+    return theirs, True
+
+
+def _renumber_duplicates(scenarios, added_uids):
+    """Scénáře přidané souběžně mohly dostat stejné číslo - přečísluje ty moje na konec"""
+    used = {tc.get("order_no") for tc in scenarios if tc["uid"] not in added_uids}
+    next_no = max((n for n in used if isinstance(n, int)), default=0) + 1
+    for tc in scenarios:
+        if tc["uid"] not in added_uids:
+            continue
+        if tc.get("order_no") in used:
+            old_prefix = f"{tc['order_no']:03d}_" if isinstance(tc.get("order_no"), int) else None
+            tc["order_no"] = next_no
+            if old_prefix and tc.get("test_name", "").startswith(old_prefix):
+                tc["test_name"] = f"{next_no:03d}_" + tc["test_name"][len(old_prefix):]
+            next_no += 1
+        used.add(tc["order_no"])
+
+
+def merge_project(name, base, mine, theirs):
+    """Sloučí moje a cizí změny jednoho projektu vůči společnému základu.
+
+    Scénáře se párují podle `uid`; změna jen na jedné straně se převezme,
+    změna téhož scénáře na obou stranách je konflikt a vyhraje uložená verze.
+    Vrací (projekt, seznam konfliktů).
+    """
+    base = base or {}
+    conflicts = []
+    merged = {}
+
+    # Metadata projektu (subject, ...) po klíčích
+    for key in dict.fromkeys([*theirs.keys(), *mine.keys()]):
+        if key in ("scenarios", VERSION_KEY, COUNTER_KEY):
+            merged[key] = None
+            continue
+        value, conflict = _merge_value(base.get(key), mine.get(key), theirs.get(key))
+        if conflict:
+            conflicts.append(f"{name}: '{key}' změnil současně někdo jiný – ponechána jeho hodnota")
+        if value is not None:
+            merged[key] = value
+
+    base_sc = {tc["uid"]: tc for tc in base.get("scenarios", [])}
+    mine_sc = {tc["uid"]: tc for tc in mine.get("scenarios", [])}
+    theirs_sc = {tc["uid"]: tc for tc in theirs.get("scenarios", [])}
+
+    scenarios = []
+    # Pořadí podle uložené verze, moje nové scénáře na konec
+    order = list(theirs_sc) + [uid for uid in mine_sc if uid not in theirs_sc]
+    added_by_me = set()
+    for uid in order:
+        value, conflict = _merge_value(base_sc.get(uid), mine_sc.get(uid), theirs_sc.get(uid))
+        if conflict:
+            label = (theirs_sc.get(uid) or mine_sc.get(uid) or {}).get("test_name", uid)
+            conflicts.append(f"{name}: scénář '{label}' upravil současně někdo jiný – ponechána jeho verze")
+        if value is not None:
+            scenarios.append(copy.deepcopy(value))
+            if uid not in base_sc and uid not in theirs_sc:
+                added_by_me.add(uid)
+
+    _renumber_duplicates(scenarios, added_by_me)
+    merged["scenarios"] = scenarios
+    merged[COUNTER_KEY] = max(
+        [mine.get(COUNTER_KEY, 1), theirs.get(COUNTER_KEY, 1)] + [tc["order_no"] + 1 for tc in scenarios if isinstance(tc.get("order_no"), int)]
+    )
+    return {k: v for k, v in merged.items() if v is not None or k == "scenarios"}, conflicts
+
+
+def merge_projects(base, mine, theirs):
+    """3cestné sloučení všech projektů (compare-and-swap podle verzí).
+
+    Projekt, jehož verze na disku je stejná jako v základu, nikdo mezitím
+    neuložil - převezme se moje verze bez slučování. Vrací (projekty, konflikty).
+    """
+    merged = {}
+    conflicts = []
+
+    for name in dict.fromkeys([*theirs.keys(), *mine.keys()]):
+        b, m, t = base.get(name), mine.get(name), theirs.get(name)
+
+        if t is None:
+            if b is not None:
+                # Smazaný jinou session - moje změny by ho vzkřísily
+                if m != b:
+                    conflicts.append(f"{name}: projekt mezitím někdo smazal – tvoje změny nebyly uloženy")
+                continue
+            merged[name] = copy.deepcopy(m)
+            continue
+
+        if m is None:
+            if b is None:
+                merged[name] = t
+            elif project_version(t) != project_version(b):
+                conflicts.append(f"{name}: projekt mezitím někdo upravil – nebyl smazán")
+                merged[name] = t
+            continue
+
+        if m == b:
+            merged[name] = t
+        elif b is not None and project_version(t) == project_version(b):
+            merged[name] = copy.deepcopy(m)
+        else:
+            merged[name], project_conflicts = merge_project(name, b, m, t)
+            conflicts.extend(project_conflicts)
+
+    for name, project_data in merged.items():
+        if project_data is not theirs.get(name):
+            project_data[VERSION_KEY] = project_version(theirs.get(name)) + 1
+    return merged, conflicts
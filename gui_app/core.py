@@ -1,15 +1,52 @@
+import functools
+import io
 import json
+import re
+import unicodedata
 import pandas as pd
-import copy
-import subprocess
 from pathlib import Path
-import tempfile
 import os
+import sqlite3
+import threading
+from storage import SQLiteProjectStore
+from journal import JournalProjectStore
+from step_sets import StepSetStore
+from git_sync import GitSyncWorker
+from git_status import GitStatusProvider
+from export import iter_hpqc_rows, export_rows
+from export_cache import ExportCache
+from search import SearchIndex
+from coverage import CoverageIndex
+from concurrency import FileLock, ensure_scenario_ids, merge_projects, new_scenario_id
+from timing import tracer
 
 # ---------- Cesty ----------
 BASE_DIR = Path(__file__).resolve().parent.parent
-PROJECTS_PATH = BASE_DIR / "projects.json"
-KROKY_PATH = BASE_DIR / "kroky.json"
+# Datové soubory lze přesměrovat jinam (benchmarky, zkušební instance); git zůstává v BASE_DIR
+DATA_DIR = Path(os.environ.get("TESTCASE_DATA_DIR", BASE_DIR))
+PROJECTS_PATH = DATA_DIR / "projects.json"
+KROKY_PATH = DATA_DIR / "kroky.json"
+PROJECTS_DB_PATH = DATA_DIR / "projects.db"
+STEP_SETS_PATH = DATA_DIR / "step_sets.json"
+EXPORT_CACHE_DIR = DATA_DIR / "exports" / ".cache"
+SEARCH_DB_PATH = DATA_DIR / "search.db"
+COVERAGE_PATH = DATA_DIR / "coverage.json"
+PROJECTS_LOCK_PATH = DATA_DIR / "projects.json.lock"
+
+# ---------- Úložiště projektů ----------
+# "json" = celý projects.json při každém uložení (výchozí)
+# "sqlite" = projects.db, ukládají se jen změněné řádky (projects.json se při prvním spuštění naimportuje)
+# "journal" = projects.json jako snapshot + projects.journal.jsonl s mutacemi, kompakce na pozadí
+PROJECTS_BACKEND = os.environ.get("TESTCASE_PROJECTS_BACKEND", "json")
+_project_store = None
+
+# ---------- Cache načtených souborů ----------
+# Sdílená pro celý proces (všechny reruny i session) - klíč je cesta, hodnota (otisk, snapshot, verze)
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+# Každé nové naparsování souboru dostane vyšší číslo verze
+_snapshot_seq = 0
 
 # ---------- Statické mapy ----------
 PRIORITY_MAP = {
@@ -26,93 +63,230 @@ COMPLEXITY_MAP = {
     "5": "5-Low"
 }
 
+
+def get_automatic_complexity(pocet_kroku):
+    """Automaticky určí komplexitu podle počtu kroků"""
+    if pocet_kroku <= 5:
+        return "5-Low"
+    elif pocet_kroku <= 10:
+        return "4-Medium"
+    elif pocet_kroku <= 15:
+        return "3-Big"
+    elif pocet_kroku <= 20:
+        return "2-Huge"
+    else:
+        return "1-Giant"
+
 # ---------- Funkce práce se soubory ----------
+def get_project_store():
+    """Vrací úložiště projektů podle PROJECTS_BACKEND (None = přímo projects.json)"""
+    global _project_store
+    if _project_store is None and PROJECTS_BACKEND == "sqlite":
+        _project_store = SQLiteProjectStore(PROJECTS_DB_PATH, json_path=PROJECTS_PATH)
+    elif _project_store is None and PROJECTS_BACKEND == "journal":
+        _project_store = JournalProjectStore(PROJECTS_PATH)
+    return _project_store
+
+@tracer.timed("core.load_json")
 def load_json(path: Path):
+    store = get_project_store()
+    if store is not None and Path(path) == PROJECTS_PATH:
+        return ensure_scenario_ids(store.load())
     if not path.exists():
         return {}
     with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        data = json.load(f)
+    if Path(path) == PROJECTS_PATH:
+        # Stabilní uid scénářů pro slučování souběžných uložení
+        ensure_scenario_ids(data)
+    return data
+
+@tracer.timed("core.save_json")
+def save_json(path: Path, data, changed=None):
+    """Uloží soubor; `changed` = jména změněných projektů/akcí, jen ty se přeindexují"""
+    previous = _file_signature(path) if changed is not None else None
+    try:
+        store = get_project_store()
+        if store is not None and Path(path) == PROJECTS_PATH:
+            store.save(data)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    finally:
+        invalidate_cache(path)
+    update_search_index(path, data, changed, previous)
+    if Path(path) == PROJECTS_PATH:
+        update_coverage_index(data, changed, previous)
+
+@tracer.timed("core.save_projects")
+def save_projects(base, projects_data):
+    """Uloží projekty bez přepsání cizích změn (compare-and-swap pod zámkem).
+
+    `base` je snapshot, ze kterého session vycházela. Pod zámkem souboru se
+    načte aktuální stav; projekty, které mezitím nikdo nezměnil, se uloží
+    rovnou, ostatní se 3cestně sloučí po scénářích. Vrací (uložená data,
+    seznam konfliktů).
+    """
+    with FileLock(PROJECTS_LOCK_PATH):
+        current = load_json(PROJECTS_PATH)
+        merged, conflicts = merge_projects(base, projects_data, current)
+        # Nezměněné projekty jsou po sloučení tytéž objekty jako na disku - rozdíl bez porovnávání obsahu
+        changed = [name for name in merged if merged[name] is not current.get(name)]
+        changed += [name for name in current if name not in merged]
+        save_json(PROJECTS_PATH, merged, changed)
+    for conflict in conflicts:
+        print(f"⚠️ Konflikt při ukládání: {conflict}")
+
+    # Scénáře s kroky_ref bez step_sets.json nemají kroky - sady se synchronizují s nimi
+    if _in_repo(STEP_SETS_PATH) and any(
+        "kroky_ref" in tc for name in changed if name in merged for tc in merged[name].get("scenarios", [])
+    ):
+        get_sync_worker().request_sync([STEP_SETS_PATH], "Auto update: sdílené sady kroků")
+    return merged, conflicts
+
+# ---------- Neměnné snapshoty ----------
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Snapshot z cache je jen pro čtení - pro úpravy použij thaw()")
+
+class FrozenDict(dict):
+    """Slovník jen pro čtení; copy.deepcopy() vrací běžnou měnitelnou kopii"""
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+class FrozenList(list):
+    """Seznam jen pro čtení; copy.deepcopy() vrací běžnou měnitelnou kopii"""
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
 
-def save_json(path: Path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+def freeze(obj):
+    """Převede načtená JSON data na neměnný snapshot"""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+def thaw(obj):
+    """Měnitelná kopie snapshotu - před úpravou a uložením"""
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(v) for v in obj]
+    return obj
+
+# ---------- Cache s klíčem cesta + mtime + velikost ----------
+def _file_signature(path: Path):
+    store = get_project_store()
+    if store is not None and Path(path) == PROJECTS_PATH:
+        return store.signature()
+    try:
+        st_info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st_info.st_mtime_ns, st_info.st_size)
+
+@tracer.timed("core.load_json_cached")
+def load_json_cached(path: Path):
+    """Neměnný snapshot souboru; znovu se parsuje jen když se změnil mtime nebo velikost"""
+    key = str(path)
+    signature = _file_signature(path)
+    with _file_cache_lock:
+        cached = _file_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _cache_stats["hits"] += 1
+            return cached[1]
+        _cache_stats["misses"] += 1
+
+    snapshot = freeze(load_json(path))
+    global _snapshot_seq
+    with _file_cache_lock:
+        _snapshot_seq += 1
+        _file_cache[key] = (signature, snapshot, _snapshot_seq)
+    return snapshot
+
+def snapshot_version(path: Path):
+    """Verze aktuálního snapshotu souboru - mění se jen při novém naparsování"""
+    load_json_cached(path)
+    with _file_cache_lock:
+        cached = _file_cache.get(str(path))
+        return cached[2] if cached is not None else 0
+
+def invalidate_cache(path: Path = None):
+    """Zahodí snapshot souboru (nebo všech souborů) z cache"""
+    with _file_cache_lock:
+        if path is None:
+            _file_cache.clear()
+        else:
+            _file_cache.pop(str(path), None)
+        _cache_stats["invalidations"] += 1
+
+def cache_stats():
+    """Počty zásahů/výpadků cache - pro záložku Diagnostika"""
+    with _file_cache_lock:
+        return {**_cache_stats, "entries": len(_file_cache)}
+
+# ---------- Synchronizace s GitHub ----------
+_sync_worker = None
+_status_provider = None
+
+def _in_repo(path):
+    """Datové soubory mimo repozitář (TESTCASE_DATA_DIR) se nesynchronizují"""
+    return Path(path).resolve().is_relative_to(BASE_DIR.resolve())
+
+def get_sync_worker():
+    """Sdílený worker, který na pozadí commituje a pushuje změny"""
+    global _sync_worker
+    if _sync_worker is None:
+        _sync_worker = GitSyncWorker(BASE_DIR, on_synced=lambda: get_status_provider().refresh_now())
+    return _sync_worker
+
+def get_status_provider():
+    """Sdílený stav gitu obnovovaný na pozadí (TTL nebo změna souborů)"""
+    global _status_provider
+    if _status_provider is None:
+        git_dir = BASE_DIR / ".git"
+        _status_provider = GitStatusProvider(
+            BASE_DIR,
+            watch_paths=[git_dir / "index", git_dir / "HEAD", git_dir / "FETCH_HEAD", KROKY_PATH, PROJECTS_PATH, STEP_SETS_PATH],
+            last_sync=lambda: get_sync_worker().state()["last_sync"],
+            data_paths=[KROKY_PATH, PROJECTS_PATH, STEP_SETS_PATH],
+        )
+    return _status_provider
 
 # ---------- Funkce pro správu kroků ----------
 def save_kroky_data(data):
-    """Uloží data do kroky.json a provede git commit + push"""
+    """Uloží data do kroky.json; git commit + push proběhne na pozadí"""
     try:
-        # Uložení do souboru
         save_json(KROKY_PATH, data)
         print(f"✅ Kroky.json uložen lokálně ({len(data)} akcí)")
-        
-        # Git operace - s lepší chybovou handling
-        try:
-            # Nejprve zkontrolujeme jestli jsme v git repozitáři
-            check_git = subprocess.run(["git", "status"], capture_output=True, text=True)
-            if "not a git repository" in check_git.stderr:
-                print("⚠️ Není Git repozitář - přeskočeno")
-                return
-            
-            # Nastavení uživatele pokud není nastaven
-            try:
-                subprocess.run(["git", "config", "user.email", "testcase-builder@example.com"], check=True)
-                subprocess.run(["git", "config", "user.name", "TestCase Builder"], check=True)
-                print("✅ Git uživatel nastaven")
-            except:
-                print("⚠️ Nelze nastavit Git uživatele")
-            
-            # Přidání souboru
-            result_add = subprocess.run(["git", "add", str(KROKY_PATH)], 
-                                      capture_output=True, text=True)
-            if result_add.returncode != 0:
-                print(f"⚠️ Git add selhal: {result_add.stderr}")
-                return
-            print("✅ Git add úspěšný")
-            
-            # Commit - pouze pokud jsou změny
-            result_status = subprocess.run(["git", "status", "--porcelain"], 
-                                         capture_output=True, text=True)
-            if not result_status.stdout.strip():
-                print("ℹ️ Žádné změny k commitování")
-                return
-            
-            result_commit = subprocess.run(["git", "commit", "-m", "Auto update: změny v akcích a krocích"], 
-                                         capture_output=True, text=True)
-            if result_commit.returncode != 0:
-                print(f"⚠️ Git commit selhal: {result_commit.stderr}")
-                return
-            print("✅ Git commit úspěšný")
-            
-            # Nejprve pull s rebase
-            try:
-                result_pull = subprocess.run(["git", "pull", "--rebase", "--autostash"], 
-                                           capture_output=True, text=True)
-                if result_pull.returncode != 0:
-                    print(f"⚠️ Git pull selhal: {result_pull.stderr}")
-            except Exception as pull_error:
-                print(f"⚠️ Git pull selhal: {pull_error}")
-                
-            # Push
-            result_push = subprocess.run(["git", "push"], 
-                                       capture_output=True, text=True)
-            if result_push.returncode != 0:
-                print(f"⚠️ Git push selhal: {result_push.stderr}")
-                return
-            
-            print("✅ Kroky.json uložen a změny nahrány na GitHub")
-            
-        except Exception as git_error:
-            print(f"⚠️ Git operace selhala: {git_error}")
-            print("ℹ️ Data byla uložena lokálně, ale GitHub synchronizace selhala")
-            
     except Exception as e:
         print(f"❌ Chyba při ukládání: {e}")
-        # I když vše selže, soubor se uloží lokálně
-        save_json(KROKY_PATH, data)
+        return
+
+    # Commit a push řeší worker - uložení nečeká na síť
+    get_sync_worker().request_sync([KROKY_PATH], "Auto update: změny v akcích a krocích")
 
 def add_new_action(akce_nazev, akce_popis, kroky):
     """Přidá novou akci do kroky.json"""
-    kroky_data = get_steps()
+    kroky_data = thaw(get_steps())
     
     kroky_data[akce_nazev] = {
         "description": akce_popis,
@@ -124,7 +298,7 @@ def add_new_action(akce_nazev, akce_popis, kroky):
 
 def update_action(akce_nazev, akce_popis, kroky):
     """Aktualizuje existující akci v kroky.json"""
-    kroky_data = get_steps()
+    kroky_data = thaw(get_steps())
     
     if akce_nazev in kroky_data:
         kroky_data[akce_nazev] = {
@@ -139,7 +313,7 @@ def update_action(akce_nazev, akce_popis, kroky):
 
 def delete_action(akce_nazev):
     """Smaže akci z kroky.json"""
-    kroky_data = get_steps()
+    kroky_data = thaw(get_steps())
     
     if akce_nazev in kroky_data:
         del kroky_data[akce_nazev]
@@ -150,11 +324,8 @@ def delete_action(akce_nazev):
 
 # ---------- Nová funkce načítání kroků ----------
 def get_steps():
-    """Vrací novou kopii dat z kroky.json - zachovává nový formát"""
-    if not KROKY_PATH.exists():
-        return {}
-    with open(KROKY_PATH, "r", encoding="utf-8") as f:
-        return copy.deepcopy(json.load(f))
+    """Vrací neměnný snapshot kroky.json z cache - pro úpravy použij thaw()"""
+    return load_json_cached(KROKY_PATH)
 
 # ---------- Pomocná funkce pro získání kroků z akce ----------
 def get_steps_from_action(akce, kroky_data):
@@ -172,192 +343,377 @@ def get_steps_from_action(akce, kroky_data):
     else:
         return []
 
-# ---------- Generování názvu test casu ----------
+# ---------- Fulltextové vyhledávání ----------
+_search_index = None
+
+def get_search_index():
+    global _search_index
+    if _search_index is None:
+        _search_index = SearchIndex(SEARCH_DB_PATH, fold=fold_text)
+    return _search_index
+
+def update_search_index(path: Path, data, changed=None, previous=None):
+    """Po uložení přeindexuje změněné projekty/akce; chyba indexu nesmí shodit uložení.
+
+    Jen když index odpovídal verzi souboru před uložením (`previous`) a známe
+    změněná jména. Jinak se nic nepřepočítává - soubor má novou verzi a index
+    se plně srovná až při dalším hledání.
+    """
+    prefix = {PROJECTS_PATH: "project", KROKY_PATH: "akce"}.get(Path(path))
+    if changed is None or prefix is None:
+        return
+    try:
+        index = get_search_index()
+        if index.is_synced(prefix, previous):
+            sync = index.sync_projects if prefix == "project" else index.sync_actions
+            sync(data, names=changed, version=_file_signature(path))
+    except sqlite3.Error as e:
+        print(f"⚠️ Aktualizace vyhledávacího indexu selhala: {e}")
+
+@tracer.timed("core.search_all")
+def search_all(query, page=1, page_size=20):
+    """Hledá ve všech projektech, scénářích a akcích; vrací (počet, výsledky stránky)"""
+    index = get_search_index()
+    # Změny mimo save_json (CLI, git pull, uložení bez známých změn) se doindexují při prvním dotazu.
+    # Verze se čtou před daty - při souběžném zápisu se index spíš srovná znovu, než aby zůstal pozadu
+    versions = (_file_signature(PROJECTS_PATH), _file_signature(KROKY_PATH))
+    index.sync_if_changed(load_json_cached(PROJECTS_PATH), load_json_cached(KROKY_PATH), versions)
+    return index.search(query, page, page_size)
+
+# ---------- Pokrytí (agregace) ----------
+_coverage_index = None
+
+def get_coverage_index():
+    global _coverage_index
+    if _coverage_index is None:
+        _coverage_index = CoverageIndex(COVERAGE_PATH, technologie=scenario_technologie)
+    return _coverage_index
+
+def update_coverage_index(data, changed=None, previous=None):
+    """Po uložení přepočítá jen změněné projekty - a jen když index odpovídal verzi před uložením"""
+    index = get_coverage_index()
+    if changed is not None and index.is_synced(previous):
+        index.sync(data, names=changed, version=_file_signature(PROJECTS_PATH))
+
+@tracer.timed("core.get_coverage")
+def get_coverage(project_name=None):
+    """Hotové agregáty pokrytí pro projekt, nebo součty přes všechny projekty"""
+    index = get_coverage_index()
+    # Změny mimo save_json (CLI, git pull, uložení bez známých změn) se dopočítají při prvním čtení
+    version = _file_signature(PROJECTS_PATH)
+    index.sync_if_changed(load_json_cached(PROJECTS_PATH), version)
+    return index.project(project_name) if project_name else index.totals()
+
+# ---------- Sdílené sady kroků ----------
+_step_set_store = StepSetStore(STEP_SETS_PATH)
+
+def store_step_set(kroky):
+    """Uloží kroky do sdílené tabulky a vrátí odkaz pro scénář (kroky_ref)"""
+    return _step_set_store.put(kroky)
+
+def get_scenario_steps(tc):
+    """Kroky scénáře - starší scénáře mají kopii v 'kroky', nové jen odkaz 'kroky_ref'"""
+    if "kroky" in tc:
+        return tc["kroky"]
+    if tc.get("kroky_ref"):
+        return _step_set_store.get(tc["kroky_ref"])
+    return []
+
+@tracer.timed("core.make_df")
+def make_df(projects, project_name):
+    """Přehled scénářů projektu jako DataFrame (seznam scénářů v GUI)"""
+    sc = projects.get(project_name, {}).get("scenarios", [])
+    if not sc:
+        return pd.DataFrame()
+    rows = []
+    for tc in sc:
+        rows.append({
+            "Order": tc.get("order_no"),
+            "Test Name": tc.get("test_name"),
+            "Action": tc.get("akce"),
+            "Segment": tc.get("segment"),
+            "Channel": tc.get("kanal"),
+            "Priority": tc.get("priority"),
+            "Complexity": tc.get("complexity"),
+            "Kroky": len(get_scenario_steps(tc))
+        })
+    return pd.DataFrame(rows).sort_values(by="Order", ascending=True)
+
+# ---------- Klasifikace věty (segment, kanál, technologie) ----------
+# Pořadí v mapách = priorita při více shodách ve větě
+SEGMENT_MAP = {
+    "b2c": "B2C",
+    "b2b": "B2B"
+}
+
+KANAL_MAP = {
+    "shop": "SHOP",
+    "il": "IL"
+}
+
+TECHNOLOGIE_MAP = {
+    "dsl": "DSL",
+    "vdsl": "DSL",
+    "adsl": "DSL",
+    "fwa bi": "FWA_BI",
+    "fwa indoor": "FWA_BI",
+    "fwa bisi": "FWA_BISI",
+    "fwa outdoor": "FWA_BISI",
+    "fwa": "FWA",
+    "fiber": "FIBER",
+    "optin": "FIBER",
+    "opticky internet": "FIBER",
+    "optika": "FIBER",
+    "ftth": "FIBER",
+    "cable": "CABLE",
+    "hlas": "HLAS",
+    "hlasovy": "HLAS",
+    "mobil": "HLAS",
+    "next tarif": "HLAS",
+    "tarif": "HLAS",
+    "voice": "HLAS"
+}
+
+def fold_text(text: str) -> str:
+    """Malá písmena bez diakritiky - 'Optický' -> 'opticky'"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return text.lower()
+
+def _key_pattern(key):
+    # Klíč musí začínat na hranici slova; krátké zkratky (il, dsl, b2c) i končit,
+    # delší slova smí mít českou koncovku ("shopu", "tarifu", "mobilni")
+    words = r"[\s_\-]+".join(re.escape(word) for word in key.split())
+    end = r"(?![a-z0-9])" if len(key) <= 3 else ""
+    return rf"(?<![a-z0-9]){words}{end}"
+
+def _compile_classifier():
+    """Jeden regulární výraz pro všechny dimenze - věta se projde jedním průchodem"""
+    dimensions = {"segment": SEGMENT_MAP, "kanal": KANAL_MAP, "technologie": TECHNOLOGIE_MAP}
+    ranks = {}
+    groups = []
+    for dim, mapping in dimensions.items():
+        # Technologie: delší klíč má přednost (fwa bisi před fwa bi před fwa)
+        keys = sorted(mapping, key=len, reverse=True) if dim == "technologie" else list(mapping)
+        ranks[dim] = {key: rank for rank, key in enumerate(keys)}
+        alternatives = "|".join(_key_pattern(key) for key in sorted(mapping, key=len, reverse=True))
+        groups.append(f"(?P<{dim}>{alternatives})")
+    return re.compile("|".join(groups)), dimensions, ranks
+
+_CLASSIFIER, _CLASSIFIER_MAPS, _CLASSIFIER_RANKS = _compile_classifier()
+_CLASSIFIER_DEFAULTS = {"segment": "NA", "kanal": "NA", "technologie": "X"}
+
+@functools.lru_cache(maxsize=4096)
+def _classify(veta_folded):
+    best = {}
+    for match in _CLASSIFIER.finditer(veta_folded):
+        dim = match.lastgroup
+        key = " ".join(re.split(r"[\s_\-]+", match.group(dim)))
+        rank = _CLASSIFIER_RANKS[dim][key]
+        if dim not in best or rank < best[dim][0]:
+            best[dim] = (rank, _CLASSIFIER_MAPS[dim][key])
+    return tuple(best[dim][1] if dim in best else _CLASSIFIER_DEFAULTS[dim]
+                 for dim in ("segment", "kanal", "technologie"))
+
 def parse_veta(veta: str):
     """Z věty vytáhne klíčové údaje: segment, kanál, technologii"""
-    veta_low = veta.lower()
-    segment = "B2C" if "b2c" in veta_low else "B2B" if "b2b" in veta_low else "NA"
-    kanal = "SHOP" if "shop" in veta_low else "IL" if "il" in veta_low else "NA"
-
-    # ROZŠÍŘENÉ A OPRAVENÉ MAPOVÁNÍ TECHNOLOGIÍ
-    technologie_map = {
-        "dsl": "DSL",
-        "vdsl": "DSL", 
-        "adsl": "DSL",
-        "fwa bi": "FWA_BI",
-        "fwa indoor": "FWA_BI",
-        "fwa bisi": "FWA_BISI",
-        "fwa outdoor": "FWA_BISI",
-        "fiber": "FIBER",
-        "optin": "FIBER",
-        "opticky internet": "FIBER",
-        "optika": "FIBER",
-        "ftth": "FIBER",
-        "cable": "CABLE",
-        "hlas": "HLAS",
-        "hlasovy": "HLAS",
-        "mobil": "HLAS",
-        "next tarif": "HLAS",
-        "tarif": "HLAS",
-        "voice": "HLAS"
-    }
-    
-    technologie = "X"
-    
-    # DŮLEŽITÉ: Nejprve kontrolujeme delší řetězce, pak kratší
-    for k, v in sorted(technologie_map.items(), key=lambda x: len(x[0]), reverse=True):
-        if k in veta_low:
-            technologie = v
-            break
-            
-    return segment, kanal, technologie
+    return _classify(fold_text(veta))
+
+@tracer.timed("core.parse_vety")
+def parse_vety(vety):
+    """Dávková klasifikace seznamu nebo pandas Series vět.
+
+    Pro seznam vrací seznam trojic (segment, kanál, technologie), pro Series
+    DataFrame se sloupci segment, kanal, technologie se stejným indexem.
+    """
+    if isinstance(vety, pd.Series):
+        result = [_classify(fold_text(veta)) for veta in vety.fillna("").astype(str)]
+        return pd.DataFrame(result, index=vety.index, columns=["segment", "kanal", "technologie"])
+    return [_classify(fold_text(veta)) for veta in vety]
+
+# Nejdelší první - "FWA_BISI" se nesmí rozpoznat jako "FWA"
+_TECHNOLOGIE_BY_LENGTH = sorted(set(TECHNOLOGIE_MAP.values()), key=len, reverse=True)
+
+def scenario_technologie(tc):
+    """Technologie scénáře - uložená, u starších scénářů z názvu testu, jinak z věty.
+
+    Název má tvar 001_KANAL_SEGMENT_TECHNOLOGIE_věta a technologie může sama
+    obsahovat podtržítko (FWA_BI), proto se porovnává se známými hodnotami.
+    """
+    if tc.get("technologie"):
+        return tc["technologie"]
+    parts = tc.get("test_name", "").split("_", 3)
+    if len(parts) == 4:
+        for value in _TECHNOLOGIE_BY_LENGTH:
+            if parts[3] == value or parts[3].startswith(value + "_"):
+                return value
+    return parse_veta(tc.get("veta", ""))[2]
 
 # ---------- Generování test casu ----------
-def generate_testcase(project, veta, akce, priority, complexity, kroky_data, projects_data):
-    """Vytvoří nový test case a uloží ho do projektu"""
+def reset_next_id(project_data):
+    """Srovná čítač next_id se scénáři (po smazání nebo přečíslování)"""
+    project_data["next_id"] = max((s["order_no"] for s in project_data["scenarios"]), default=0) + 1
+
+
+def _reserve_order_numbers(project_data, count):
+    """Rezervuje blok `count` pořadových čísel z čítače next_id.
+
+    Nové scénáře se přidávají na konec, takže platný čítač je vždy o jedna
+    větší než číslo posledního scénáře; celý seznam se prochází jen tehdy,
+    když čítač chybí, zaostává nebo je nafouknutý (starší projects.json,
+    ruční úpravy, smazané scénáře).
+    """
+    scenarios = project_data["scenarios"]
+    next_id = project_data.get("next_id")
+    last = scenarios[-1].get("order_no") if scenarios else 0
+    if not isinstance(next_id, int) or not isinstance(last, int) or next_id != last + 1:
+        reset_next_id(project_data)
+        next_id = project_data["next_id"]
+
+    project_data["next_id"] = next_id + count
+    return range(next_id, next_id + count)
+
+
+@tracer.timed("core.generate_testcases")
+def generate_testcases(project, items, kroky_data, projects_data, persist=True, test_name=None):
+    """Vytvoří dávku test casů a uloží projekt jednou.
+
+    `items` jsou slovníky s klíči veta, akce, priority, complexity; volitelně
+    segment, kanal a technologie přepíšou hodnoty z klasifikace věty.
+    `test_name(order_no, tc)` nahradí výchozí název testu (main.py má vlastní).
+    S `persist` se uloží přes save_projects (zámek, verze projektu) a
+    `projects_data` se nahradí uloženým stavem.
+    """
+    # Základ pro 3cestné sloučení - stávající scénáře se nemění, stačí mělká kopie seznamu
+    base = dict(projects_data)
+    if project in projects_data:
+        base[project] = {**projects_data[project], "scenarios": list(projects_data[project]["scenarios"])}
+
     if project not in projects_data:
         projects_data[project] = {"next_id": 1, "subject": "UAT2\\Antosova\\", "scenarios": []}
-    
+
     project_data = projects_data[project]
-    
-    # ✅ BEZPEČNÉ ČÍSLOVÁNÍ - kontrola duplicit
-    existing_orders = [scenario["order_no"] for scenario in project_data["scenarios"]]
-    if existing_orders:
-        order_no = max(existing_orders) + 1
-    else:
-        order_no = 1
-    
-    project_data["next_id"] = order_no + 1
-    nove_cislo = f"{order_no:03d}"
-
-    segment, kanal, technologie = parse_veta(veta)
-    test_name = f"{nove_cislo}_{kanal}_{segment}_{technologie}_{veta.strip()}"
-
-    # Načtení kroků podle akce - POUŽÍVÁME POMOCNOU FUNKCI
-    kroky = get_steps_from_action(akce, kroky_data)
-
-    tc = {
-        "order_no": order_no,
-        "test_name": test_name,
-        "akce": akce,
-        "segment": segment,
-        "kanal": kanal,
-        "priority": priority,
-        "complexity": complexity,
-        "veta": veta,
-        "kroky": copy.deepcopy(kroky)  # Hluboká kopie kroků
-    }
+    items = list(items)
+    if not items:
+        return []
 
-    project_data["scenarios"].append(tc)
-    save_json(PROJECTS_PATH, projects_data)
-    return tc
+    order_numbers = _reserve_order_numbers(project_data, len(items))
+    classified = parse_vety([item["veta"] for item in items])
+    kroky_refs = {}
 
+    created = []
+    for order_no, item, (segment, kanal, technologie) in zip(order_numbers, items, classified):
+        veta = item["veta"]
+        akce = item["akce"]
+        segment = item.get("segment") or segment
+        kanal = item.get("kanal") or kanal
+        technologie = item.get("technologie") or technologie
 
-# ---------- Export do Excelu ----------
-def export_to_excel(project_name, projects_data):
-    """Exportuje test casy daného projektu do Excelu - POUŽÍVÁ DOČASNÝ SOUBOR"""
+        # Stejná akce = stejná sada kroků, stačí ji uložit jednou za dávku
+        if akce not in kroky_refs:
+            kroky_refs[akce] = store_step_set(get_steps_from_action(akce, kroky_data))
+
+        tc = {
+            "uid": new_scenario_id(),
+            "order_no": order_no,
+            "test_name": f"{order_no:03d}_{kanal}_{segment}_{technologie}_{veta.strip()}",
+            "akce": akce,
+            "segment": segment,
+            "kanal": kanal,
+            "technologie": technologie,
+            "priority": item["priority"],
+            "complexity": item["complexity"],
+            "veta": veta,
+            "kroky_ref": kroky_refs[akce]  # Odkaz do sdílené tabulky kroků
+        }
+        if test_name:
+            tc["test_name"] = test_name(order_no, tc)
+        created.append(tc)
+
+    project_data["scenarios"].extend(created)
+    if persist:
+        merged, _ = save_projects(base, projects_data)
+        projects_data.clear()
+        projects_data.update(merged)
+    return created
+
+
+def generate_testcase(project, veta, akce, priority, complexity, kroky_data, projects_data):
+    """Vytvoří nový test case a uloží ho do projektu"""
+    item = {"veta": veta, "akce": akce, "priority": priority, "complexity": complexity}
+    return generate_testcases(project, [item], kroky_data, projects_data)[0]
+
+
+# ---------- Export ----------
+@tracer.timed("core.export_project")
+def export_project(project_name, projects_data, fmt="xlsx", target=None):
+    """Exportuje test casy projektu do zvoleného formátu (xlsx, csv, parquet, hpqc_xml).
+
+    Řádky se generují líně a streamují přímo do výstupu; bez `target` vrací BytesIO.
+    """
     project_data = projects_data[project_name]
-    rows = []
+    rows = iter_hpqc_rows(project_name, project_data, get_scenario_steps)
+    output = export_rows(rows, fmt, target)
+    print(f"✅ Exportováno ({fmt}, {len(project_data['scenarios'])} scénářů)")
+    return output
+
+_export_cache = ExportCache(EXPORT_CACHE_DIR)
+
+def export_project_cached(project_name, projects_data, fmt="xlsx"):
+    """Jako export_project, ale nezměněný projekt se vrátí hotový z exports/.cache"""
+    project_data = projects_data[project_name]
+    key = ExportCache.key(project_name, project_data, fmt)
+
+    data = _export_cache.get(project_name, fmt, key)
+    if data is not None:
+        print(f"✅ Export z cache ({fmt})")
+        return io.BytesIO(data)
+
+    output = export_project(project_name, projects_data, fmt)
+    _export_cache.put(project_name, fmt, key, output.getvalue())
+    return output
+
+def export_cache_stats():
+    return _export_cache.stats()
+
+def export_to_excel(project_name, projects_data):
+    """Exportuje test casy daného projektu do Excelu (BytesIO)"""
+    return export_project(project_name, projects_data, "xlsx")
 
-    for tc in project_data["scenarios"]:
-        for i, krok in enumerate(tc.get("kroky", []), start=1):
-            desc = ""
-            exp = ""
-
-            if isinstance(krok, dict):
-                desc = krok.get("description", "")
-                exp = krok.get("expected", "")
-            elif isinstance(krok, str):
-                desc = krok
-                exp = ""
-
-            rows.append({
-                "Project": project_name,
-                "Subject": project_data.get("subject", "UAT2\\Antosova\\"),
-                "System/Application": "Siebel_CZ",
-                "Description": f"Segment: {tc['segment']}\nKanál: {tc['kanal']}\nAkce: {tc['akce']}",
-                "Type": "Manual",
-                "Test Phase": "4-User Acceptance",
-                "Test: Test Phase": "4-User Acceptance",
-                "Test Priority": tc["priority"],
-                "Test Complexity": tc["complexity"],
-                "Test Name": tc["test_name"],
-                "Step Name (Design Steps)": str(i),
-                "Description (Design Steps)": desc,
-                "Expected (Design Steps)": exp
-            })
-
-    df = pd.DataFrame(rows)
-    
-    # ✅ BEZPEČNÉ JMÉNO SOUBORU - odstranění nepovolených znaků
-    safe_project_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    safe_project_name = safe_project_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-    
-    # ✅ POUŽITÍ DOČASNÉHO SOUBORU S BEZPEČNÝM JMÉNEM
-    try:
-        # Vytvoříme dočasný soubor s bezpečným jménem
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx', prefix=f'testcases_{safe_project_name}_') as tmp_file:
-            temp_path = tmp_file.name
-        
-        # Uložíme data do dočasného souboru
-        df.to_excel(temp_path, index=False)
-        
-        print(f"✅ Exportováno do dočasného souboru: {temp_path}")
-        return temp_path
-        
-    except Exception as e:
-        print(f"❌ Chyba při exportu: {e}")
-        
-        # ✅ ALTERNATIVNÍ ŘEŠENÍ - použijeme BytesIO pro přímý export do paměti
-        try:
-            import io
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Test Cases')
-            
-            output.seek(0)
-            print("✅ Exportováno do paměti pomocí BytesIO")
-            return output
-            
-        except Exception as io_error:
-            print(f"❌ BytesIO export také selhal: {io_error}")
-            raise e
-        
 
 # ---------- Funkce pro opravu duplicitních kroků ----------
-def oprav_duplicitni_kroky():
-    """Opraví duplicitní kroky v kroky.json"""
-    kroky_data = get_steps()
+@tracer.timed("core.oprav_duplicitni_kroky")
+def oprav_duplicitni_kroky(threshold=None, groups=None):
+    """Sjednotí téměř stejné kroky v knihovně akcí (kroky.json) na kanonickou variantu.
+
+    `groups` jsou skupiny z find_duplicate_steps, které uživatel potvrdil; bez
+    nich se najdou všechny skupiny nad `threshold`. V každé akci se pak odstraní
+    i přesné duplicity. Uložené scénáře (kroky_ref, starší kopie "kroky") se
+    nemění - drží kroky, se kterými byly vytvořené.
+    """
+    # similarity importuje core - import až při volání
+    from similarity import STEP_THRESHOLD, find_duplicate_steps, canonical_step_map, canonicalize_steps
+
+    kroky_data = thaw(get_steps())
+    if groups is None:
+        groups = find_duplicate_steps(kroky_data, threshold or STEP_THRESHOLD)
+    step_map = canonical_step_map(groups)
     opraveno = False
-    
-    for akce, kroky in kroky_data.items():
-        puvodni_pocet = len(kroky)
-        
-        # Odstranění duplicitních kroků
-        jedinecne_kroky = []
-        videne_popisy = set()
-        
-        for krok in kroky:
-            popis = krok.get('description', '')
-            # Pokud jsme tento popis ještě neviděli, přidáme krok
-            if popis not in videne_popisy:
-                jedinecne_kroky.append(krok)
-                videne_popisy.add(popis)
-        
-        nove_kroky = jedinecne_kroky
-        novy_pocet = len(nove_kroky)
-        
-        if puvodni_pocet != novy_pocet:
-            kroky_data[akce] = nove_kroky
+
+    for akce, obsah in kroky_data.items():
+        kroky = get_steps_from_action(akce, kroky_data)
+        nove_kroky = canonicalize_steps(kroky, step_map)
+        if nove_kroky != kroky:
+            if isinstance(obsah, dict):
+                obsah["steps"] = nove_kroky
+            else:
+                kroky_data[akce] = nove_kroky
             opraveno = True
-            print(f"🔧 Opravena akce '{akce}': {puvodni_pocet} → {novy_pocet} kroků")
-    
+            print(f"🔧 Opravena akce '{akce}': {len(kroky)} → {len(nove_kroky)} kroků")
+
     if opraveno:
-        # Ulož opravená data
-        with open(KROKY_PATH, 'w', encoding='utf-8') as f:
-            json.dump(kroky_data, f, ensure_ascii=False, indent=2)
+        save_kroky_data(kroky_data)
         print("✅ Kroky.json byl opraven!")
     else:
         print("✅ Žádné duplicity nebyly nalezeny.")
-    
-    return kroky_data
\ No newline at end of file
+
+    return kroky_data
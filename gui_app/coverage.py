@@ -0,0 +1,206 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+# ---------- Cesty ----------
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_COVERAGE_PATH = BASE_DIR / "coverage.json"
+
+# Pořadí dimenzí v klíči buňky "segment|kanal|technologie|akce"
+CELL_DIMENSIONS = ["segment", "kanal", "technologie", "akce"]
+CELL_SEPARATOR = "|"
+
+
+def _signature(project_data):
+    raw = json.dumps(project_data.get("scenarios", []), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def cell_key(segment, kanal, technologie, akce):
+    return CELL_SEPARATOR.join([segment, kanal, technologie, akce])
+
+
+def split_cell(key):
+    return dict(zip(CELL_DIMENSIONS, key.split(CELL_SEPARATOR, 3)))
+
+
+def _stored_technologie(tc):
+    return tc.get("technologie", "X")
+
+
+def project_aggregate(project_data, technologie=_stored_technologie):
+    """Počty scénářů jednoho projektu: buňky pokrytí, priority, komplexity"""
+    cells, priority, complexity = Counter(), Counter(), Counter()
+    for tc in project_data.get("scenarios", []):
+        cells[cell_key(tc.get("segment", "NA"), tc.get("kanal", "NA"), technologie(tc), tc.get("akce", ""))] += 1
+        priority[tc.get("priority", "")] += 1
+        complexity[tc.get("complexity", "")] += 1
+    return {
+        "scenarios": len(project_data.get("scenarios", [])),
+        "cells": dict(cells),
+        "priority": dict(priority),
+        "complexity": dict(complexity),
+    }
+
+
+def _add(totals, aggregate, sign):
+    totals["scenarios"] += sign * aggregate["scenarios"]
+    for field in ("cells", "priority", "complexity"):
+        target = totals[field]
+        for key, count in aggregate[field].items():
+            target[key] = target.get(key, 0) + sign * count
+            if not target[key]:
+                del target[key]
+
+
+def _empty_totals():
+    return {"scenarios": 0, "cells": {}, "priority": {}, "complexity": {}}
+
+
+def _as_version(version):
+    """Verze souboru ve tvaru, který přežije uložení do JSON (n-tice -> seznamy)"""
+    return json.loads(json.dumps(version)) if version is not None else None
+
+
+class CoverageIndex:
+    """Předpočítané pokrytí po projektech a součty přes všechny projekty.
+
+    Uložení předá jména změněných projektů a přepočítají se jen ty; součty
+    se upraví odečtením starého a přičtením nového agregátu. Bez jmen se
+    porovnají otisky všech projektů - to proběhne až při čtení nad verzí
+    projects.json, kterou index ještě neviděl. Dashboard pak jen čte hotové
+    slovníky. Stav i verze se ukládají do coverage.json, aby se po restartu
+    nemusel počítat znovu.
+    """
+
+    def __init__(self, path: Path = DEFAULT_COVERAGE_PATH, technologie=_stored_technologie):
+        self.path = Path(path)
+        self.technologie = technologie
+        self._lock = threading.Lock()
+        self._projects = None   # název -> {"signature", "aggregate"}
+        self._totals = None
+        self._synced = None
+
+    def _load(self):
+        if self._projects is not None:
+            return
+        data = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ coverage.json nelze načíst, přepočítám: {e}")
+        self._projects = data.get("projects", {})
+        self._totals = data.get("totals", _empty_totals())
+        self._synced = data.get("version")
+
+    def _save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"projects": self._projects, "totals": self._totals, "version": self._synced}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # ----- Aktualizace -----
+    def sync(self, projects_data, names=None, version=None):
+        """Přepočítá změněné, nové a smazané projekty (s `names` jen ty); vrací počet přepočítaných"""
+        version = _as_version(version)
+        with self._lock:
+            self._load()
+            changed = 0
+            stale = list(self._projects) if names is None else [n for n in names if n in self._projects]
+            for name in stale:
+                if name not in projects_data:
+                    _add(self._totals, self._projects.pop(name)["aggregate"], -1)
+                    changed += 1
+
+            for name in (projects_data if names is None else [n for n in names if n in projects_data]):
+                project_data = projects_data[name]
+                signature = _signature(project_data)
+                entry = self._projects.get(name)
+                if entry is not None and entry["signature"] == signature:
+                    continue
+                if entry is not None:
+                    _add(self._totals, entry["aggregate"], -1)
+                aggregate = project_aggregate(project_data, self.technologie)
+                _add(self._totals, aggregate, +1)
+                self._projects[name] = {"signature": signature, "aggregate": aggregate}
+                changed += 1
+
+            if changed or version != self._synced:
+                self._synced = version
+                self._save()
+            return changed
+
+    def is_synced(self, version):
+        with self._lock:
+            self._load()
+            return version is not None and self._synced == _as_version(version)
+
+    def sync_if_changed(self, projects_data, version=None):
+        """Plná synchronizace jen pro verzi projects.json, kterou index ještě neviděl"""
+        if not self.is_synced(version):
+            self.sync(projects_data, version=version)
+
+    # ----- Čtení -----
+    def totals(self):
+        with self._lock:
+            self._load()
+            return self._totals
+
+    def project(self, name):
+        with self._lock:
+            self._load()
+            entry = self._projects.get(name)
+            return entry["aggregate"] if entry else _empty_totals()
+
+    def project_names(self):
+        with self._lock:
+            self._load()
+            return list(self._projects)
+
+
+# ---------- Doplnění technologie ----------
+def backfill_technologie(projects_data, technologie):
+    """Zapíše technologii do scénářů, které ji ještě nemají; vrací počet doplněných"""
+    count = 0
+    for project_data in projects_data.values():
+        for tc in project_data.get("scenarios", []):
+            if not tc.get("technologie"):
+                tc["technologie"] = technologie(tc)
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pokrytí scénářů (coverage.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="doplní pole technologie do starších scénářů v projects.json")
+    sub.add_parser("rebuild", help="přepočítá coverage.json od nuly")
+    args = parser.parse_args()
+
+    from core import COVERAGE_PATH, PROJECTS_PATH, load_json, save_projects, scenario_technologie
+
+    base = load_json(PROJECTS_PATH)
+    if args.command == "backfill":
+        projects_data = copy.deepcopy(base)
+        count = backfill_technologie(projects_data, scenario_technologie)
+        if count:
+            # Přes zámek a porovnání verzí - souběžné uložení z GUI se nepřepíše
+            _, conflicts = save_projects(base, projects_data)
+            if conflicts:
+                print("⚠️ Část projektů mezitím upravil někdo jiný - spusť backfill znovu")
+        print(f"✅ Doplněna technologie u {count} scénářů")
+    else:
+        COVERAGE_PATH.unlink(missing_ok=True)
+        CoverageIndex(COVERAGE_PATH, technologie=scenario_technologie).sync(base)
+        print(f"✅ {COVERAGE_PATH.name} přepočítán ({len(base)} projektů)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import csv
+import io
+from itertools import groupby, islice
+from pathlib import Path
+from xml.sax.saxutils import XMLGenerator
+
+from openpyxl import Workbook
+
+# ---------- HPQC sloupce ----------
+HPQC_COLUMNS = [
+    "Project",
+    "Subject",
+    "System/Application",
+    "Description",
+    "Type",
+    "Test Phase",
+    "Test: Test Phase",
+    "Test Priority",
+    "Test Complexity",
+    "Test Name",
+    "Step Name (Design Steps)",
+    "Description (Design Steps)",
+    "Expected (Design Steps)",
+]
+
+# Sloupce jednoho kroku - zbytek řádku popisuje celý test
+STEP_COLUMNS = HPQC_COLUMNS[-3:]
+
+DEFAULT_SUBJECT = "UAT2\\Antosova\\"
+DEFAULT_EXPECTED = ""
+SYSTEM_APPLICATION = "Siebel_CZ"
+TYPE = "Manual"
+TEST_PHASE = "4-User Acceptance"
+
+
+# ---------- Generátor řádků ----------
+def iter_hpqc_rows(project_name, project_data, get_steps, test_name=None, expected_default=DEFAULT_EXPECTED):
+    """Postupně vrací řádky HPQC exportu (tuple ve pořadí HPQC_COLUMNS).
+
+    `get_steps(tc)` vrací kroky scénáře, `test_name(order, tc)` případně
+    přepočítá název testu podle pořadí scénáře v seznamu. Řádek je jeden na
+    krok, scénář bez kroků proto ve výstupu chybí (stejně jako dřív v Excelu).
+    """
+    subject = project_data.get("subject", DEFAULT_SUBJECT)
+
+    for order, tc in enumerate(project_data.get("scenarios", []), start=1):
+        name = test_name(order, tc) if test_name else tc["test_name"]
+        description = f"Segment: {tc['segment']}\nKanál: {tc['kanal']}\nAkce: {tc['akce']}"
+
+        for i, krok in enumerate(get_steps(tc), start=1):
+            if isinstance(krok, dict):
+                desc = krok.get("description", "")
+                exp = krok.get("expected", expected_default)
+            else:
+                desc = krok
+                exp = expected_default
+
+            yield (
+                project_name,
+                subject,
+                SYSTEM_APPLICATION,
+                description,
+                TYPE,
+                TEST_PHASE,
+                TEST_PHASE,
+                tc["priority"],
+                tc["complexity"],
+                name,
+                str(i),
+                desc,
+                exp,
+            )
+
+
+# ---------- Výstupy (sinks) ----------
+def write_xlsx(rows, target=None):
+    """Zapíše řádky do xlsx v režimu write-only (konstantní paměť).
+
+    `target` je cesta nebo binární soubor; bez něj se vrátí nový BytesIO
+    připravený pro `st.download_button`.
+    """
+    output = io.BytesIO() if target is None else target
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(HPQC_COLUMNS)
+    for row in rows:
+        ws.append(row)
+    wb.save(str(output) if isinstance(output, Path) else output)
+
+    if isinstance(output, io.BytesIO):
+        output.seek(0)
+    return output
+
+
+def _open_binary(target):
+    """Vrací (binární soubor, zavřít?) pro cestu, otevřený soubor nebo nový BytesIO"""
+    if target is None:
+        return io.BytesIO(), False
+    if isinstance(target, (str, Path)):
+        return open(target, "wb"), True
+    return target, False
+
+
+def _finish(output, close):
+    if close:
+        output.close()
+        return output.name
+    output.seek(0)
+    return output
+
+
+def write_csv(rows, target=None, delimiter=";"):
+    """Streamuje řádky do CSV v jednom průchodu (UTF-8 s BOM kvůli Excelu)"""
+    output, close = _open_binary(target)
+    text = io.TextIOWrapper(output, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text, delimiter=delimiter)
+    writer.writerow(HPQC_COLUMNS)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+    return _finish(output, close)
+
+
+def write_parquet(rows, target=None, batch_size=10_000):
+    """Zapíše řádky do Parquetu po dávkách - vyžaduje pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Export do Parquetu vyžaduje balíček pyarrow (pip install pyarrow)") from e
+
+    output, close = _open_binary(target)
+    schema = pa.schema([(column, pa.string()) for column in HPQC_COLUMNS])
+    rows = iter(rows)
+    with pq.ParquetWriter(output, schema) as writer:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays([pa.array(c, pa.string()) for c in columns], schema=schema))
+    return _finish(output, close)
+
+
+def write_hpqc_xml(rows, target=None):
+    """Zapíše HPQC import XML: jeden <Test> s poli testu a jeho <DesignStep> kroky.
+
+    Test vzniká z řádků kroků, takže scénář bez kroků <Test> nemá - stejně
+    jako ve všech ostatních formátech.
+    """
+    output, close = _open_binary(target)
+    xml = XMLGenerator(output, encoding="utf-8", short_empty_elements=True)
+    test_columns = HPQC_COLUMNS[:-3]
+
+    def field(name, value):
+        xml.startElement("Field", {"Name": name})
+        xml.characters("" if value is None else str(value))
+        xml.endElement("Field")
+
+    xml.startDocument()
+    xml.startElement("Tests", {})
+    # Kroky jednoho testu jdou v generátoru za sebou
+    for test_row, steps in groupby(rows, key=lambda row: row[:-3]):
+        xml.startElement("Test", {})
+        for name, value in zip(test_columns, test_row):
+            field(name, value)
+        xml.startElement("DesignSteps", {})
+        for row in steps:
+            xml.startElement("DesignStep", {})
+            for name, value in zip(STEP_COLUMNS, row[-3:]):
+                field(name, value)
+            xml.endElement("DesignStep")
+        xml.endElement("DesignSteps")
+        xml.endElement("Test")
+    xml.endElement("Tests")
+    xml.endDocument()
+    return _finish(output, close)
+
+
+# ---------- Registr formátů ----------
+EXPORT_FORMATS = {
+    "xlsx": {
+        "label": "Excel (xlsx)",
+        "sink": write_xlsx,
+        "extension": "xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+    "csv": {
+        "label": "CSV",
+        "sink": write_csv,
+        "extension": "csv",
+        "mime": "text/csv",
+    },
+    "parquet": {
+        "label": "Parquet (analytika)",
+        "sink": write_parquet,
+        "extension": "parquet",
+        "mime": "application/vnd.apache.parquet",
+    },
+    "hpqc_xml": {
+        "label": "HPQC import XML",
+        "sink": write_hpqc_xml,
+        "extension": "xml",
+        "mime": "application/xml",
+    },
+}
+
+
+def safe_file_name(project_name, fmt="xlsx"):
+    """Bezpečný název souboru exportu (bez nepovolených znaků)"""
+    safe_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    safe_name = safe_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+    return f"testcases_{safe_name}.{EXPORT_FORMATS[fmt]['extension']}"
+
+
+def export_rows(rows, fmt="xlsx", target=None):
+    """Pošle řádky do výstupu zvoleného formátu"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Neznámý formát exportu: {fmt}")
+    return EXPORT_FORMATS[fmt]["sink"](rows, target)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+# Zvýšit při změně podoby exportu - staré soubory v cache se přestanou používat
+EXPORT_VERSION = 1
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class ExportCache:
+    """Hotové exporty na disku s klíčem podle obsahu projektu.
+
+    Klíč je hash scénářů, subjectu, názvu projektu a formátu - změna projektu
+    tedy znamená nový klíč a starý soubor téhož projektu se smaže. Celková
+    velikost je omezena `max_bytes`, vyhazuje se nejdéle nepoužitý soubor (LRU
+    podle mtime, který se při každém zásahu obnoví).
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(project_name, project_data, fmt):
+        payload = {
+            "version": EXPORT_VERSION,
+            "project": project_name,
+            "format": fmt,
+            "subject": project_data.get("subject"),
+            "scenarios": project_data.get("scenarios", []),
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _prefix(project_name, fmt):
+        # Krátký hash názvu - soubory jednoho projektu a formátu se dají najít a smazat
+        name_hash = hashlib.sha1(project_name.encode("utf-8")).hexdigest()[:12]
+        return f"{name_hash}_{fmt}_"
+
+    def _path(self, project_name, fmt, key):
+        return self.cache_dir / f"{self._prefix(project_name, fmt)}{key}.bin"
+
+    def get(self, project_name, fmt, key):
+        """Vrací bajty exportu, nebo None"""
+        path = self._path(project_name, fmt, key)
+        with self._lock:
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            os.utime(path)
+            self.hits += 1
+            return data
+
+    def put(self, project_name, fmt, key, data: bytes):
+        """Uloží export a smaže starší verze téhož projektu a formátu"""
+        path = self._path(project_name, fmt, key)
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for old in self.cache_dir.glob(f"{self._prefix(project_name, fmt)}*.bin"):
+                if old != path:
+                    old.unlink(missing_ok=True)
+
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.bin"):
+            try:
+                st_info = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st_info.st_mtime_ns, st_info.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self):
+        files = list(self.cache_dir.glob("*.bin")) if self.cache_dir.exists() else []
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "files": len(files),
+            "bytes": sum(p.stat().st_size for p in files),
+        }
@@ -0,0 +1,140 @@
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from timing import tracer
+
+
+class GitStatusProvider:
+    """Stav git repozitáře obnovovaný vláknem na pozadí.
+
+    Hlavička aplikace čte jen poslední stav z paměti. Obnova proběhne po
+    vypršení `ttl`, při změně sledovaných souborů (mtime) nebo na vyžádání
+    přes `refresh_now()`. Stačí na ni jediné `git status --porcelain=v2 --branch`.
+    Z nesledovaných souborů se počítají jen datové (`data_paths`) - nový
+    step_sets.json je změna čekající na synchronizaci, ostatní nesledované ne.
+    """
+
+    def __init__(self, repo_dir: Path, ttl=60.0, poll_interval=2.0, watch_paths=(), last_sync=None, data_paths=()):
+        self.repo_dir = Path(repo_dir)
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.watch_paths = [Path(p) for p in watch_paths]
+        self.data_paths = self._relative(data_paths)
+        self._last_sync = last_sync
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._mtimes = None
+        self._status = {
+            "state": "unknown",
+            "branch": None,
+            "upstream": None,
+            "ahead": 0,
+            "behind": 0,
+            "changed": 0,
+            "checked_at": None,
+            "error": None,
+        }
+
+    # ----- Veřejné API -----
+    def status(self):
+        """Poslední známý stav (bez spouštění gitu); první volání spustí vlákno"""
+        self._start()
+        with self._lock:
+            result = dict(self._status)
+        result["last_sync"] = self._last_sync() if self._last_sync else None
+        return result
+
+    def refresh_now(self):
+        """Vyžádá okamžitou obnovu na pozadí"""
+        self._wake.set()
+
+    def _relative(self, paths):
+        """Cesty relativně k repozitáři ve tvaru, jak je vypisuje git (soubory mimo repozitář vynechá)"""
+        repo = self.repo_dir.resolve()
+        relative = set()
+        for path in paths:
+            try:
+                relative.add(Path(path).resolve().relative_to(repo).as_posix())
+            except ValueError:
+                pass
+        return relative
+
+    # ----- Vlákno -----
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="git-status", daemon=True)
+            self._wake.set()
+            self._thread.start()
+
+    def _watched_mtimes(self):
+        mtimes = []
+        for path in self.watch_paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return mtimes
+
+    def _run(self):
+        last_refresh = 0.0
+        while True:
+            woken = self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+            mtimes = self._watched_mtimes()
+            files_changed = mtimes != self._mtimes
+            expired = time.monotonic() - last_refresh >= self.ttl
+            if woken or files_changed or expired:
+                self._mtimes = mtimes
+                self._refresh()
+                last_refresh = time.monotonic()
+
+    def _refresh(self):
+        status = {"checked_at": datetime.now(), "error": None}
+        try:
+            with tracer.span("git.status"):
+                result = subprocess.run(
+                    ["git", "status", "--porcelain=v2", "--branch", "--untracked-files=all"],
+                    capture_output=True, text=True, cwd=self.repo_dir, timeout=30
+                )
+            if result.returncode != 0:
+                status["state"] = "no_repo" if "not a git repository" in result.stderr else "error"
+                status["error"] = result.stderr.strip() or None
+            else:
+                status.update(self._parse(result.stdout, self.data_paths))
+        except Exception as e:
+            status["state"] = "error"
+            status["error"] = str(e)
+
+        with self._lock:
+            self._status.update(status)
+
+    @staticmethod
+    def _parse(output, data_paths=()):
+        parsed = {"branch": None, "upstream": None, "ahead": 0, "behind": 0, "changed": 0}
+        for line in output.splitlines():
+            if line.startswith("# branch.head "):
+                parsed["branch"] = line.split(" ", 2)[2]
+            elif line.startswith("# branch.upstream "):
+                parsed["upstream"] = line.split(" ", 2)[2]
+            elif line.startswith("# branch.ab "):
+                ahead, behind = line.split(" ")[2:4]
+                parsed["ahead"] = int(ahead.lstrip("+"))
+                parsed["behind"] = int(behind.lstrip("-"))
+            elif line.startswith("? "):
+                # Nesledovaný soubor je čekající změna jen tehdy, když je to datový soubor
+                if line[2:] in data_paths:
+                    parsed["changed"] += 1
+            elif line and not line.startswith(("#", "!")):
+                parsed["changed"] += 1
+
+        dirty = parsed["changed"] or parsed["ahead"] or parsed["behind"]
+        parsed["state"] = "pending" if dirty else "synced"
+        return parsed
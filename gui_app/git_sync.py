@@ -0,0 +1,192 @@
+import queue
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from timing import tracer
+
+GIT_USER_EMAIL = "testcase-builder@example.com"
+GIT_USER_NAME = "TestCase Builder"
+
+# Stavy workeru -> text pro UI
+STATUS_LABELS = {
+    "idle": "✅ Synchronizováno",
+    "waiting": "⏳ Čeká na další změny",
+    "syncing": "🔄 Synchronizuji s GitHub",
+    "retrying": "🔁 Opakuji pokus o synchronizaci",
+    "error": "⚠️ Synchronizace selhala",
+    "disabled": "❌ Není Git repozitář",
+}
+
+
+class GitSyncWorker:
+    """Jediné vlákno, které na pozadí commituje a pushuje změněné soubory.
+
+    Uložení jen zařadí požadavek do fronty a hned se vrátí. Worker počká
+    `debounce` sekund na další změny, všechny je zabalí do jednoho commitu
+    a pull/push při selhání opakuje s exponenciálním odstupem.
+    """
+
+    def __init__(self, repo_dir: Path, debounce=3.0, max_retries=4, backoff=2.0, timeout=60, on_synced=None):
+        self.repo_dir = Path(repo_dir)
+        self.on_synced = on_synced
+        self.debounce = debounce
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._state = {
+            "status": "idle",
+            "pending": 0,
+            "last_sync": None,
+            "last_commit": None,
+            "last_error": None,
+            "attempt": 0,
+        }
+
+    # ----- Veřejné API -----
+    def request_sync(self, paths, message, immediate=False):
+        """Zařadí soubory ke commitu a pushi; vrací se okamžitě"""
+        self._start()
+        # Počítadlo, _idle i fronta se mění najednou - worker nesmí ohlásit klid mezi clear() a put()
+        with self._lock:
+            self._state["pending"] += 1
+            self._idle.clear()
+            self._queue.put({"paths": [str(p) for p in paths], "message": message, "immediate": immediate})
+
+    def state(self):
+        """Kopie aktuálního stavu pro sidebar a Diagnostiku"""
+        with self._lock:
+            return dict(self._state)
+
+    def flush(self, timeout=None):
+        """Počká, až worker zpracuje vše ve frontě (pro CLI a testy)"""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ----- Vlákno -----
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="git-sync", daemon=True)
+            self._thread.start()
+
+    def _set_state(self, **changes):
+        with self._lock:
+            self._state.update(changes)
+
+    def _collect_batch(self, first):
+        """Sloučí požadavky, které přijdou během debounce intervalu"""
+        batch = [first]
+        if not first["immediate"]:
+            self._set_state(status="waiting")
+            deadline = time.monotonic() + self.debounce
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+                # Každá další změna posune okno - dávka se odešle až po klidu
+                deadline = time.monotonic() + self.debounce
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+
+            batch = self._collect_batch(first)
+            try:
+                self._sync(batch)
+            except Exception as e:
+                self._set_state(status="error", last_error=str(e))
+                print(f"⚠️ Git synchronizace selhala: {e}")
+            finally:
+                if self.on_synced is not None:
+                    self.on_synced()
+                with self._lock:
+                    self._state["pending"] = max(0, self._state["pending"] - len(batch))
+                    if not self._state["pending"]:
+                        self._idle.set()
+
+    # ----- Git operace -----
+    def _git(self, *args):
+        with tracer.span(f"git.{args[0]}"):
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, cwd=self.repo_dir, timeout=self.timeout
+            )
+
+    def _sync(self, batch):
+        if self._git("rev-parse", "--is-inside-work-tree").returncode != 0:
+            self._set_state(status="disabled")
+            return
+
+        self._set_state(status="syncing", attempt=0)
+        paths = sorted({p for item in batch for p in item["paths"]})
+        messages = list(dict.fromkeys(item["message"] for item in batch))
+
+        result_add = self._git("add", "--", *paths)
+        if result_add.returncode != 0:
+            raise RuntimeError(f"git add: {result_add.stderr.strip()}")
+
+        # Commit jen pokud je co commitovat
+        if self._git("diff", "--cached", "--quiet", "--", *paths).returncode != 0:
+            message = messages[0] if len(messages) == 1 else f"{messages[0]} (+{len(batch) - 1} změn)"
+            result_commit = self._git(
+                "-c", f"user.email={GIT_USER_EMAIL}", "-c", f"user.name={GIT_USER_NAME}",
+                "commit", "-m", message, "--", *paths
+            )
+            if result_commit.returncode != 0:
+                raise RuntimeError(f"git commit: {result_commit.stderr.strip()}")
+            self._set_state(last_commit=self._git("rev-parse", "--short", "HEAD").stdout.strip())
+
+        self._push_with_retry()
+
+    def _push_with_retry(self):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._set_state(status="retrying", attempt=attempt)
+                time.sleep(min(self.backoff * 2 ** (attempt - 1), 60))
+
+            result_pull = self._git(
+                "-c", f"user.email={GIT_USER_EMAIL}", "-c", f"user.name={GIT_USER_NAME}",
+                "pull", "--rebase", "--autostash"
+            )
+            if result_pull.returncode != 0:
+                last_error = f"git pull: {result_pull.stderr.strip()}"
+                # Nedokončený rebase by zablokoval další pokusy
+                self._git("rebase", "--abort")
+                continue
+
+            result_push = self._git("push")
+            if result_push.returncode == 0:
+                self._set_state(status="idle", last_sync=datetime.now(), last_error=None, attempt=0)
+                return
+            last_error = f"git push: {result_push.stderr.strip()}"
+
+        raise RuntimeError(last_error)
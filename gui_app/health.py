@@ -0,0 +1,321 @@
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from core import (
+    BASE_DIR, DATA_DIR, PROJECTS_PATH, KROKY_PATH, STEP_SETS_PATH,
+    PRIORITY_MAP, COMPLEXITY_MAP, load_json_cached,
+)
+
+STATUS_ORDER = {"ok": 0, "warning": 1, "error": 2}
+STATUS_ICONS = {"ok": "✅", "warning": "⚠️", "error": "❌"}
+
+MAX_DETAILS = 50
+GIT_TIMEOUT = 15
+
+# Volné místo: pod MIN_FREE_ERROR chyba, pod MIN_FREE_WARNING nebo MIN_FREE_SHARE varování
+MIN_FREE_ERROR = 100 * 2**20
+MIN_FREE_WARNING = 2**30
+MIN_FREE_SHARE = 0.05
+
+SCENARIO_FIELDS = {
+    "order_no": int, "test_name": str, "akce": str, "segment": str,
+    "kanal": str, "priority": str, "complexity": str, "veta": str,
+}
+
+
+class HealthContext:
+    """Sdílená data jednoho běhu kontrol - každý soubor se načte jen jednou.
+
+    Kontroly běží souběžně; první, která soubor potřebuje, ho načte (ze
+    sdílené cache snapshotů), ostatní počkají na stejný výsledek. Nic se
+    nezapisuje.
+    """
+
+    def __init__(self, repo_dir=BASE_DIR, data_dir=DATA_DIR,
+                 projects_path=PROJECTS_PATH, kroky_path=KROKY_PATH, step_sets_path=STEP_SETS_PATH):
+        self.repo_dir = Path(repo_dir)
+        self.data_dir = Path(data_dir)
+        self.projects_path = Path(projects_path)
+        self.kroky_path = Path(kroky_path)
+        self.step_sets_path = Path(step_sets_path)
+        self._locks = {}
+        self._loaded = {}
+        self._guard = threading.Lock()
+
+    def load(self, path):
+        """(data, chyba) - chyba je text, když soubor chybí nebo není platný JSON"""
+        key = str(path)
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._loaded:
+                # projects.json může být v jiném úložišti (sqlite, žurnál) - to řeší load_json
+                if Path(path) != PROJECTS_PATH and not Path(path).exists():
+                    self._loaded[key] = (None, "soubor neexistuje")
+                else:
+                    try:
+                        self._loaded[key] = (load_json_cached(path), None)
+                    except (OSError, ValueError) as e:
+                        self._loaded[key] = (None, str(e))
+            return self._loaded[key]
+
+    def git(self, *args):
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=self.repo_dir, timeout=GIT_TIMEOUT
+        )
+
+
+def _result(status, summary, details=()):
+    details = list(details)
+    if len(details) > MAX_DETAILS:
+        details = details[:MAX_DETAILS] + [f"… a dalších {len(details) - MAX_DETAILS}"]
+    return {"status": status, "summary": summary, "details": details}
+
+
+def _steps_of(obsah):
+    if isinstance(obsah, dict):
+        return obsah.get("steps")
+    return obsah
+
+
+# ---------- Kontroly ----------
+def check_json(ctx):
+    """Soubory jdou načíst a mají očekávaný tvar (objekt na nejvyšší úrovni)"""
+    details = []
+    status = "ok"
+    for path, required in [(ctx.projects_path, False), (ctx.kroky_path, True), (ctx.step_sets_path, False)]:
+        data, error = ctx.load(path)
+        if error == "soubor neexistuje" and not required:
+            details.append(f"{path.name}: neexistuje (zatím nepoužit)")
+        elif error:
+            status = "error"
+            details.append(f"{path.name}: {error}")
+        elif not isinstance(data, dict):
+            status = "error"
+            details.append(f"{path.name}: na nejvyšší úrovni není objekt")
+        else:
+            details.append(f"{path.name}: OK ({len(data)} položek)")
+    summary = "Všechny soubory jsou platný JSON" if status == "ok" else "Některý soubor nejde načíst"
+    return _result(status, summary, details)
+
+
+def check_scenarios(ctx):
+    """Každý scénář má povinná pole správného typu, známou prioritu/komplexitu a kroky"""
+    projects, error = ctx.load(ctx.projects_path)
+    if error:
+        return _result("error", f"{ctx.projects_path.name} nejde načíst: {error}")
+    step_sets, _ = ctx.load(ctx.step_sets_path)
+    known_sets = (step_sets or {}).get("sets", {})
+    priorities, complexities = set(PRIORITY_MAP.values()), set(COMPLEXITY_MAP.values())
+
+    problems = []
+    count = 0
+    for name, project in projects.items():
+        if not isinstance(project, dict) or not isinstance(project.get("scenarios"), list):
+            problems.append(f"{name}: projekt nemá seznam 'scenarios'")
+            continue
+        for tc in project["scenarios"]:
+            count += 1
+            label = f"{name} / {tc.get('test_name', tc.get('order_no', '?'))}" if isinstance(tc, dict) else name
+            if not isinstance(tc, dict):
+                problems.append(f"{label}: scénář není objekt")
+                continue
+            for field, field_type in SCENARIO_FIELDS.items():
+                if not isinstance(tc.get(field), field_type):
+                    problems.append(f"{label}: chybí nebo má špatný typ '{field}'")
+            if isinstance(tc.get("priority"), str) and tc["priority"] not in priorities:
+                problems.append(f"{label}: neznámá priorita '{tc['priority']}'")
+            if isinstance(tc.get("complexity"), str) and tc["complexity"] not in complexities:
+                problems.append(f"{label}: neznámá komplexita '{tc['complexity']}'")
+            if "kroky" in tc:
+                if not isinstance(tc["kroky"], list):
+                    problems.append(f"{label}: 'kroky' není seznam")
+            elif tc.get("kroky_ref"):
+                if tc["kroky_ref"] not in known_sets:
+                    problems.append(f"{label}: sada kroků '{tc['kroky_ref']}' ve step_sets.json neexistuje")
+            else:
+                problems.append(f"{label}: nemá kroky ani odkaz kroky_ref")
+
+    if problems:
+        return _result("error", f"{len(problems)} problémů v {count} scénářích", problems)
+    return _result("ok", f"{count} scénářů v {len(projects)} projektech odpovídá schématu")
+
+
+def check_actions(ctx):
+    """Akce jsou ve starém (seznam) nebo novém ({description, steps}) formátu a mají kroky"""
+    kroky_data, error = ctx.load(ctx.kroky_path)
+    if error:
+        return _result("error", f"{ctx.kroky_path.name} nejde načíst: {error}")
+
+    problems = []
+    legacy = 0
+    for akce, obsah in kroky_data.items():
+        if isinstance(obsah, list):
+            legacy += 1
+        elif not isinstance(obsah, dict):
+            problems.append(f"{akce}: akce není objekt ani seznam kroků")
+            continue
+        elif not isinstance(obsah.get("description", ""), str):
+            problems.append(f"{akce}: 'description' není text")
+        steps = _steps_of(obsah)
+        if not isinstance(steps, list) or not steps:
+            problems.append(f"{akce}: nemá žádné kroky")
+            continue
+        for i, krok in enumerate(steps, 1):
+            if isinstance(krok, dict):
+                if not isinstance(krok.get("description"), str) or not isinstance(krok.get("expected"), str):
+                    problems.append(f"{akce}: krok {i} nemá text 'description' a 'expected'")
+            elif not isinstance(krok, str):
+                problems.append(f"{akce}: krok {i} má neznámý formát")
+
+    if problems:
+        return _result("error", f"{len(problems)} problémů v {len(kroky_data)} akcích", problems)
+    note = f" ({legacy} ve starém formátu)" if legacy else ""
+    return _result("ok", f"{len(kroky_data)} akcí odpovídá schématu{note}")
+
+
+def check_orphaned_actions(ctx):
+    """Scénáře, které odkazují na akci, jež už v knihovně akcí není"""
+    projects, error = ctx.load(ctx.projects_path)
+    kroky_data, kroky_error = ctx.load(ctx.kroky_path)
+    if error or kroky_error:
+        return _result("error", "Data nejde načíst", [e for e in (error, kroky_error) if e])
+
+    orphans = Counter()
+    for name, project in projects.items():
+        for tc in project.get("scenarios", []) if isinstance(project, dict) else []:
+            if isinstance(tc, dict) and tc.get("akce") and tc["akce"] not in kroky_data:
+                orphans[(name, tc["akce"])] += 1
+
+    if orphans:
+        details = [f"{name}: '{akce}' ({count}×)" for (name, akce), count in sorted(orphans.items())]
+        return _result("warning", f"{sum(orphans.values())} scénářů odkazuje na neexistující akci", details)
+    return _result("ok", "Všechny akce scénářů existují")
+
+
+def check_order_numbers(ctx):
+    """Stejné order_no u více scénářů jednoho projektu a next_id za posledním číslem"""
+    projects, error = ctx.load(ctx.projects_path)
+    if error:
+        return _result("error", f"{ctx.projects_path.name} nejde načíst: {error}")
+
+    problems = []
+    for name, project in projects.items():
+        if not isinstance(project, dict):
+            continue
+        numbers = Counter(tc.get("order_no") for tc in project.get("scenarios", []) if isinstance(tc, dict))
+        duplicates = sorted(n for n, c in numbers.items() if c > 1 and isinstance(n, int))
+        if duplicates:
+            problems.append(f"{name}: duplicitní čísla {', '.join(str(n) for n in duplicates)}")
+        highest = max((n for n in numbers if isinstance(n, int)), default=0)
+        if isinstance(project.get("next_id"), int) and project["next_id"] <= highest:
+            problems.append(f"{name}: next_id {project['next_id']} není za posledním číslem {highest}")
+
+    if problems:
+        return _result("error", f"Problémy s číslováním v {len(problems)} případech", problems)
+    return _result("ok", "Čísla scénářů jsou jedinečná")
+
+
+def check_git_remote(ctx):
+    """Dostupnost vzdáleného repozitáře (ls-remote); u lokálního bare remote i jeho existence"""
+    result = ctx.git("config", "--get-regexp", r"^remote\..*\.url$")
+    if result.returncode not in (0, 1):
+        return _result("error", "Adresář není Git repozitář", [result.stderr.strip()])
+    remotes = dict(line.split(" ", 1) for line in result.stdout.splitlines() if " " in line)
+    if not remotes:
+        return _result("warning", "Repozitář nemá nastavený žádný remote")
+
+    key = "remote.origin.url" if "remote.origin.url" in remotes else next(iter(remotes))
+    name, url = key[len("remote."):-len(".url")], remotes[key]
+    details = [f"{name}: {url}"]
+
+    if "://" not in url and not url.startswith("git@"):
+        remote_path = (ctx.repo_dir / url).resolve()
+        if not remote_path.exists():
+            return _result("error", f"Lokální remote '{name}' neexistuje", details)
+        if not ((remote_path / "HEAD").exists() and (remote_path / "objects").is_dir()):
+            details.append("Pozor: lokální remote není bare repozitář")
+
+    try:
+        listed = ctx.git("ls-remote", "--heads", name)
+    except subprocess.TimeoutExpired:
+        return _result("error", f"Remote '{name}' neodpověděl do {GIT_TIMEOUT} s", details)
+    if listed.returncode != 0:
+        return _result("error", f"Remote '{name}' není dostupný", details + [listed.stderr.strip()])
+    heads = [line.split("\t", 1)[-1] for line in listed.stdout.splitlines()]
+    status = "warning" if len(details) > 1 else "ok"
+    return _result(status, f"Remote '{name}' je dostupný ({len(heads)} větví)", details + heads[:10])
+
+
+def check_git_worktree(ctx):
+    """Neodeslané změny datových souborů (čekají na synchronizaci)"""
+    tracked = []
+    for path in (ctx.kroky_path, ctx.projects_path, ctx.step_sets_path):
+        try:
+            tracked.append(str(path.resolve().relative_to(ctx.repo_dir.resolve())))
+        except ValueError:
+            pass  # datový soubor mimo repozitář se nesynchronizuje
+    if not tracked:
+        return _result("ok", "Datové soubory jsou mimo repozitář")
+    result = ctx.git("status", "--porcelain", "--", *tracked)
+    if result.returncode != 0:
+        return _result("error", "Git status selhal", [result.stderr.strip()])
+    changes = result.stdout.splitlines()
+    if changes:
+        return _result("warning", f"{len(changes)} datových souborů čeká na synchronizaci", changes)
+    return _result("ok", "Datové soubory jsou commitnuté")
+
+
+def check_disk_space(ctx):
+    usage = shutil.disk_usage(ctx.data_dir)
+    share = usage.free / usage.total if usage.total else 0
+    summary = f"Volno {usage.free / 2**30:.1f} GB z {usage.total / 2**30:.1f} GB ({share:.0%})"
+    if usage.free < MIN_FREE_ERROR:
+        return _result("error", summary)
+    if usage.free < MIN_FREE_WARNING or share < MIN_FREE_SHARE:
+        return _result("warning", summary)
+    return _result("ok", summary)
+
+
+CHECKS = {
+    "json": ("Platnost JSON souborů", check_json),
+    "scenarios": ("Schéma scénářů", check_scenarios),
+    "actions": ("Schéma akcí", check_actions),
+    "orphaned_actions": ("Scénáře s neexistující akcí", check_orphaned_actions),
+    "order_numbers": ("Duplicitní čísla scénářů", check_order_numbers),
+    "git_remote": ("Dostupnost Git remote", check_git_remote),
+    "git_worktree": ("Neodeslané změny", check_git_worktree),
+    "disk_space": ("Místo na disku", check_disk_space),
+}
+
+
+def _run_check(ctx, name):
+    label, fn = CHECKS[name]
+    start = time.perf_counter()
+    try:
+        result = fn(ctx)
+    except Exception as e:
+        result = _result("error", f"Kontrola selhala: {e}")
+    return {"name": name, "label": label, **result, "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def run_health_checks(names=None, ctx=None, max_workers=None):
+    """Spustí kontroly souběžně (jen čtení) a vrátí strukturovaný report"""
+    ctx = ctx or HealthContext()
+    names = list(names or CHECKS)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(names)) as pool:
+        results = list(pool.map(lambda name: _run_check(ctx, name), names))
+    worst = max((r["status"] for r in results), key=STATUS_ORDER.get, default="ok")
+    return {
+        "checked_at": datetime.now().isoformat(timespec="seconds"),
+        "status": worst,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "checks": results,
+    }
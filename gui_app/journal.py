@@ -0,0 +1,200 @@
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+
+from concurrency import FileLock
+from storage import apply_mutation, diff_projects
+
+# Po překročení této velikosti žurnálu (v bajtech) se spustí kompakce na pozadí
+DEFAULT_COMPACT_THRESHOLD = 256 * 1024
+
+
+def _write_atomic(path: Path, data, indent=2):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+class JournalProjectStore:
+    """Projekty jako snapshot (projects.json) + žurnál mutací po jednom JSON řádku.
+
+    Uložení připíše na konec žurnálu jen změněné řádky, takže cena zápisu nezávisí
+    na velikosti projektu. Při načtení se žurnál přehraje nad snapshotem; jakmile
+    přeroste `compact_threshold`, vlákno na pozadí ho složí do nového snapshotu.
+
+    Snapshot, seq v meta souboru a žurnál tvoří jeden stav - čtení, připsání
+    i zápis kompakce proto běží pod meziprocesovým zámkem souboru, jinak by
+    načtení mezi zápisem snapshotu a seq přehrálo už složené mutace znovu.
+    """
+
+    def __init__(self, snapshot_path: Path, compact_threshold=DEFAULT_COMPACT_THRESHOLD):
+        self.snapshot_path = Path(snapshot_path)
+        stem = self.snapshot_path.stem
+        self.journal_path = self.snapshot_path.with_name(f"{stem}.journal.jsonl")
+        self.meta_path = self.snapshot_path.with_name(f"{stem}.journal.meta.json")
+        self.file_lock = FileLock(self.snapshot_path.with_name(f"{stem}.journal.lock"))
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._state = None
+        self._seq = 0
+        self._compaction = None
+
+    def signature(self):
+        """Otisk snapshotu a žurnálu (mtime, velikost) pro cache v core.py"""
+        paths = [self.snapshot_path, self.journal_path]
+        return tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in paths)
+
+    # ----- Čtení -----
+    def _snapshot_seq(self):
+        if not self.meta_path.exists():
+            return 0
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("seq", 0)
+
+    def _read_journal(self, after_seq):
+        """Vrací záznamy žurnálu novější než snapshot (poškozený poslední řádek přeskočí)"""
+        if not self.journal_path.exists():
+            return []
+        entries = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Nedopsaný řádek po pádu aplikace
+                    print(f"⚠️ Přeskočen poškozený řádek žurnálu: {line[:80]}")
+                    continue
+                if entry["seq"] > after_seq:
+                    entries.append(entry)
+        return entries
+
+    def load(self):
+        """Načte snapshot a přehraje nad ním žurnál"""
+        with self._lock:
+            projects_data = {}
+            with self.file_lock:
+                if self.snapshot_path.exists():
+                    with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                        projects_data = json.load(f)
+                seq = self._snapshot_seq()
+                entries = self._read_journal(seq)
+
+            for entry in entries:
+                apply_mutation(projects_data, entry)
+                seq = entry["seq"]
+
+            self._state = copy.deepcopy(projects_data)
+            self._seq = seq
+            return projects_data
+
+    # ----- Zápis -----
+    def _repair_tail(self):
+        """Poslední řádek bez konce řádku (pád během zápisu) se před připsáním opraví.
+
+        Jinak by se nový záznam přilepil za něj a čtení by zahodilo oba.
+        Nedopsaný záznam se odřízne, úplný JSON jen dostane chybějící konec řádku.
+        """
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            start = size
+            while start > 0:
+                step = min(4096, start)
+                f.seek(start - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    start = start - step + newline + 1
+                    break
+                start -= step
+
+            f.seek(start)
+            tail = f.read()
+            try:
+                json.loads(tail)
+                f.write(b"\n")
+            except ValueError:
+                print(f"⚠️ Odříznut nedopsaný řádek žurnálu: {tail[:80]!r}")
+                f.truncate(start)
+
+    def apply(self, ops):
+        """Připíše mutace do žurnálu a případně spustí kompakci"""
+        if not ops:
+            return
+        with self._lock:
+            if self._state is None:
+                self.load()
+
+            lines = []
+            for op in ops:
+                self._seq += 1
+                entry = {"seq": self._seq, **op}
+                lines.append(json.dumps(entry, ensure_ascii=False))
+                apply_mutation(self._state, entry)
+
+            with self.file_lock:
+                self._repair_tail()
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            if self.journal_path.stat().st_size > self.compact_threshold:
+                self.compact(background=True)
+
+    def save(self, projects_data):
+        """Uloží projekty jako rozdíl proti poslednímu stavu"""
+        with self._lock:
+            if self._state is None:
+                self.load()
+            ops = diff_projects(self._state, projects_data)
+            self.apply(ops)
+            return ops
+
+    # ----- Kompakce -----
+    def _write_compacted(self, state, seq):
+        # Snapshot, seq i zkrácený žurnál se zapíšou najednou - nikdo je mezitím nepřečte
+        with self._lock, self.file_lock:
+            _write_atomic(self.snapshot_path, state)
+            _write_atomic(self.meta_path, {"seq": seq}, indent=None)
+
+            # Ze žurnálu zůstanou jen mutace zapsané během kompakce
+            remaining = [json.dumps(e, ensure_ascii=False) for e in self._read_journal(seq)]
+            tmp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in remaining))
+            os.replace(tmp_path, self.journal_path)
+
+        print(f"✅ Žurnál složen do {self.snapshot_path.name} (seq {seq})")
+
+    def compact(self, background=False):
+        """Složí žurnál do nového snapshotu; s background=True ve vlákně na pozadí"""
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return self._compaction
+            if self._state is None:
+                self.load()
+            state = copy.deepcopy(self._state)
+            seq = self._seq
+
+            if not background:
+                self._write_compacted(state, seq)
+                return None
+
+            self._compaction = threading.Thread(
+                target=self._write_compacted, args=(state, seq), name="journal-compaction", daemon=True
+            )
+            self._compaction.start()
+            return self._compaction
@@ -0,0 +1,166 @@
+from itertools import combinations, product
+
+from core import SEGMENT_MAP, KANAL_MAP, TECHNOLOGIE_MAP, get_automatic_complexity, get_steps_from_action
+
+# Dimenze matice v pořadí, ve kterém se skládá název testu
+DIMENSIONS = ["segment", "kanal", "technologie", "akce"]
+
+# Hodnoty dimenzí, které zná parse_veta (bez duplicit, v pořadí map)
+DIMENSION_VALUES = {
+    "segment": list(dict.fromkeys(SEGMENT_MAP.values())),
+    "kanal": list(dict.fromkeys(KANAL_MAP.values())),
+    "technologie": list(dict.fromkeys(TECHNOLOGIE_MAP.values())),
+}
+
+# Stejné výchozí hodnoty jako parse_veta, když dimenze není zvolena
+EMPTY_VALUES = {"segment": "NA", "kanal": "NA", "technologie": "X"}
+
+
+# ---------- Vylučovací pravidla ----------
+def parse_exclusions(text):
+    """Pravidla po řádcích: 'segment=B2B, technologie=FWA_BISI' nebo 'technologie=HLAS|FWA'.
+
+    Kombinace se vyloučí, pokud odpovídá všem podmínkám jednoho pravidla.
+    """
+    rules = []
+    for line_no, line in enumerate((text or "").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        rule = {}
+        for part in line.split(","):
+            if "=" not in part:
+                raise ValueError(f"Řádek {line_no}: očekávám 'dimenze=hodnota', dostal jsem '{part.strip()}'")
+            dim, values = (x.strip() for x in part.split("=", 1))
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Řádek {line_no}: neznámá dimenze '{dim}' (povolené: {', '.join(DIMENSIONS)})")
+            rule[dim] = {v.strip() for v in values.split("|") if v.strip()}
+        rules.append(rule)
+    return rules
+
+
+def _violates(assignment, rules):
+    """Porušuje (i neúplné) přiřazení některé pravidlo? Pravidlo platí až při všech dimenzích"""
+    for rule in rules:
+        if all(dim in assignment and assignment[dim] in values for dim, values in rule.items()):
+            return True
+    return False
+
+
+# ---------- Generování kombinací ----------
+def _active_dimensions(values):
+    return [dim for dim in DIMENSIONS if values.get(dim)]
+
+
+def expand(values, rules=()):
+    """Všechny kombinace (kartézský součin) zvolených hodnot bez vyloučených"""
+    dims = _active_dimensions(values)
+    for combo in product(*(values[dim] for dim in dims)):
+        assignment = dict(zip(dims, combo))
+        if not _violates(assignment, rules):
+            yield assignment
+
+
+def count_full(values):
+    total = 1
+    for dim in _active_dimensions(values):
+        total *= len(values[dim])
+    return total
+
+
+def pairwise(values, rules=()):
+    """Kombinace pokrývající každou dvojici hodnot dvou dimenzí (all-pairs).
+
+    Hladový algoritmus ve stylu AETG: řádek začne první nepokrytou dvojicí
+    a ostatní dimenze doplní hodnotou, která pokryje nejvíc dalších dvojic.
+    Když pravidla pozdější dimenzi nic nedovolí, vrátí se a zkusí u dřívějších
+    jinou hodnotu. Nepokrytelná je jen dvojice, kterou nedoplní žádná kombinace.
+    """
+    dims = _active_dimensions(values)
+    if len(dims) < 2:
+        return list(expand(values, rules))
+
+    uncovered = {
+        ((d1, v1), (d2, v2))
+        for d1, d2 in combinations(dims, 2)
+        for v1 in values[d1]
+        for v2 in values[d2]
+        if not _violates({d1: v1, d2: v2}, rules)
+    }
+    # Deterministické pořadí semínek - stejný vstup dá stejnou sadu
+    seeds = sorted(uncovered, key=lambda pair: (
+        dims.index(pair[0][0]), values[pair[0][0]].index(pair[0][1]),
+        dims.index(pair[1][0]), values[pair[1][0]].index(pair[1][1]),
+    ))
+
+    rows = []
+    for seed in seeds:
+        if seed not in uncovered:
+            continue
+        assignment = _complete(dict(seed), dims, values, rules, uncovered)
+        if assignment is None:
+            uncovered.discard(seed)
+            continue
+
+        for d1, d2 in combinations(dims, 2):
+            uncovered.discard(((d1, assignment[d1]), (d2, assignment[d2])))
+        rows.append({dim: assignment[dim] for dim in dims})
+    return rows
+
+
+def _complete(assignment, dims, values, rules, uncovered):
+    """Doplní chybějící dimenze (nejdřív hodnoty s největším ziskem); None, když to nejde"""
+    missing = [dim for dim in dims if dim not in assignment]
+    if not missing:
+        return assignment
+    dim = missing[0]
+
+    candidates = []
+    for index, value in enumerate(values[dim]):
+        assignment[dim] = value
+        if not _violates(assignment, rules):
+            gain = sum(
+                1 for other, other_value in assignment.items()
+                if other != dim and _pair(dims, dim, value, other, other_value) in uncovered
+            )
+            candidates.append((-gain, index, value))
+        del assignment[dim]
+
+    for _, _, value in sorted(candidates):
+        complete = _complete({**assignment, dim: value}, dims, values, rules, uncovered)
+        if complete is not None:
+            return complete
+    return None
+
+
+def _pair(dims, d1, v1, d2, v2):
+    # Dvojice je vždy uložená v pořadí dimenzí
+    if dims.index(d1) > dims.index(d2):
+        d1, v1, d2, v2 = d2, v2, d1, v1
+    return ((d1, v1), (d2, v2))
+
+
+# ---------- Scénáře ----------
+def build_items(combos, kroky_data, priority):
+    """Převede kombinace na položky pro generate_testcases (dimenze jsou explicitní).
+
+    Věta je "akce - zvolené hodnoty", např. "Aktivace - FIX - B2C SHOP DSL".
+    """
+    complexity_by_action = {}
+    items = []
+    for combo in combos:
+        fields = {**EMPTY_VALUES, **combo}
+        akce = fields["akce"]
+        if akce not in complexity_by_action:
+            complexity_by_action[akce] = get_automatic_complexity(len(get_steps_from_action(akce, kroky_data)))
+        hodnoty = " ".join(combo[dim] for dim in DIMENSIONS[:3] if dim in combo)
+        items.append({
+            "veta": f"{akce} - {hodnoty}" if hodnoty else akce,
+            "akce": akce,
+            "segment": fields["segment"],
+            "kanal": fields["kanal"],
+            "technologie": fields["technologie"],
+            "priority": priority,
+            "complexity": complexity_by_action[akce],
+        })
+    return items
@@ -0,0 +1,198 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# Řádky kódu aplikace, kterým se připisují alokace (app.py, core.py a ostatní moduly gui_app)
+APP_DIR = str(Path(__file__).resolve().parent)
+
+# Alokace samotného profileru (snapshoty, porovnání) se nepočítají
+_OWN_FILE = str(Path(__file__).resolve())
+
+# Hloubka tracebacku - každý rámec navíc tracemalloc výrazně zpomalí (5 rámců několikanásobně víc než 3)
+TRACE_FRAMES = 4
+TOP_LIMIT = 15
+SESSION_TTL = 8 * 3600  # session bez rerunu déle než 8 h se z přehledu vyřadí
+
+
+def _site(frame):
+    if frame.filename.startswith(APP_DIR):
+        return f"{Path(frame.filename).name}:{frame.lineno}"
+    # Knihovna - stačí cesta od site-packages / lib
+    parts = Path(frame.filename).parts
+    return f"{'/'.join(parts[-2:])}:{frame.lineno}"
+
+
+def _app_site(traceback):
+    """Nejvnitřnější rámec z kódu aplikace, který alokaci vyvolal (i přes pandas).
+
+    Když krátký traceback do aplikace nedosáhne, vrátí nejstarší zachycený
+    rámec knihovny. Alokace samotného profileru vrací None.
+    """
+    site = None
+    for frame in traceback:  # rámce jdou od nejstaršího, platí poslední z aplikace
+        if frame.filename == _OWN_FILE:
+            return None
+        if frame.filename.startswith(APP_DIR):
+            site = _site(frame)
+    return site or _site(traceback[0])
+
+
+def _by_app_site(stats, size_attr, count_attr):
+    """Sečte statistiky tracemalloc (seskupené po tracebacku) podle místa v aplikaci"""
+    sites = {}
+    for stat in stats:
+        site = _app_site(stat.traceback)
+        if site is None:
+            continue
+        entry = sites.setdefault(site, {"site": site, "bytes": 0, "count": 0})
+        entry["bytes"] += getattr(stat, size_attr)
+        entry["count"] += getattr(stat, count_attr)
+    return sites
+
+
+def deep_sizeof(obj, seen=None):
+    """Přibližná velikost objektu včetně obsahu (DataFrame podle memory_usage)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, "memory_usage") and callable(obj.memory_usage):
+        try:
+            usage = obj.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except (TypeError, ValueError):
+            pass
+    if hasattr(obj, "nbytes") and isinstance(getattr(obj, "nbytes"), int):
+        return obj.nbytes
+
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def process_rss():
+    """Aktuální RSS procesu v bajtech (jen Linux, jinde None)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryProfiler:
+    """Volitelné profilování paměti po rerunech (tracemalloc).
+
+    Zapnutý profiler pořídí snapshot na začátku a na konci každého rerunu
+    a nárůst připíše řádkům app.py/core.py, které alokaci vyvolaly. Výsledky
+    posledních rerunů jsou v kruhovém bufferu; každá session navíc hlásí
+    velikost svého session_state. Vypnutý profiler nic nestojí.
+    """
+
+    def __init__(self, max_reruns=30):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reruns = deque(maxlen=max_reruns)
+        self._sessions = {}
+
+    @property
+    def enabled(self):
+        return tracemalloc.is_tracing()
+
+    def enable(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+
+    def disable(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._local.start = None
+
+    def reset(self):
+        with self._lock:
+            self._reruns.clear()
+            self._sessions.clear()
+
+    # ----- Reruny -----
+    def begin_rerun(self):
+        self._local.start = tracemalloc.take_snapshot() if self.enabled else None
+
+    def end_rerun(self, session_id, session_state):
+        start = getattr(self._local, "start", None)
+        self._local.start = None
+        if not self.enabled:
+            return
+
+        footprint = deep_sizeof({k: v for k, v in session_state.items()})
+        with self._lock:
+            self._sessions[session_id] = {
+                "session": session_id,
+                "bytes": footprint,
+                "keys": len(session_state.keys()),
+                "updated": time.time(),
+            }
+            cutoff = time.time() - SESSION_TTL
+            for sid in [sid for sid, s in self._sessions.items() if s["updated"] < cutoff]:
+                del self._sessions[sid]
+
+        if start is None:
+            return
+        end = tracemalloc.take_snapshot()
+        sites = _by_app_site(end.compare_to(start, "traceback"), "size_diff", "count_diff")
+        growth = sorted((s for s in sites.values() if s["bytes"] > 0), key=lambda s: -s["bytes"])
+        with self._lock:
+            self._reruns.append({
+                "started": datetime.now().isoformat(timespec="seconds"),
+                "session": session_id,
+                "growth_bytes": sum(s["bytes"] for s in sites.values()),
+                "top": growth[:TOP_LIMIT],
+            })
+
+    # ----- Čtení -----
+    def top_allocators(self, limit=TOP_LIMIT):
+        """Místa (přednostně řádky aplikace), kterým patří nejvíc právě držené paměti"""
+        if not self.enabled:
+            return []
+        sites = _by_app_site(tracemalloc.take_snapshot().statistics("traceback"), "size", "count")
+        return sorted(sites.values(), key=lambda s: -s["bytes"])[:limit]
+
+    def traced_memory(self):
+        """(aktuálně sledováno, špička) v bajtech"""
+        return tracemalloc.get_traced_memory() if self.enabled else (0, 0)
+
+    def reruns(self):
+        with self._lock:
+            return list(self._reruns)
+
+    def sessions(self):
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda s: -s["bytes"])
+
+    def report(self):
+        """Celý stav jako JSON (ke stažení z Diagnostiky)"""
+        traced, peak = self.traced_memory()
+        return json.dumps({
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "enabled": self.enabled,
+            "rss_bytes": process_rss(),
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "top_allocators": self.top_allocators(),
+            "reruns": self.reruns(),
+            "sessions": self.sessions(),
+        }, ensure_ascii=False, indent=2)
+
+
+# Sdílený pro celý proces; TESTCASE_MEMPROFILE=1 profilování zapne hned při startu
+memory_profiler = MemoryProfiler()
+if os.environ.get("TESTCASE_MEMPROFILE") == "1":
+    memory_profiler.enable()
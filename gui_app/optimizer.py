@@ -0,0 +1,97 @@
+import heapq
+from itertools import combinations
+
+from core import scenario_technologie
+
+# Dimenze, jejichž kombinace musí redukovaná sada pokrýt
+COVERAGE_DIMENSIONS = ["segment", "kanal", "technologie", "akce"]
+
+# Cena provedení scénáře: komplexita = pracnost, vysoká priorita scénář zlevní
+COMPLEXITY_COST = {"1-Giant": 5.0, "2-Huge": 4.0, "3-Big": 3.0, "4-Medium": 2.0, "5-Low": 1.0}
+PRIORITY_FACTOR = {"1-High": 0.5, "2-Medium": 1.0, "3-Low": 1.5}
+
+MODES = {
+    "combinations": "Každá pokrytá kombinace segment × kanál × technologie × akce",
+    "pairwise": "Každá pokrytá dvojice hodnot (pairwise)",
+}
+
+
+def scenario_dimensions(tc):
+    """Hodnoty dimenzí scénáře"""
+    return {
+        "segment": tc.get("segment", "NA"),
+        "kanal": tc.get("kanal", "NA"),
+        "technologie": scenario_technologie(tc),
+        "akce": tc.get("akce", ""),
+    }
+
+
+def scenario_cost(tc):
+    return COMPLEXITY_COST.get(tc.get("complexity"), 2.0) * PRIORITY_FACTOR.get(tc.get("priority"), 1.0)
+
+
+def requirements(tc, mode="combinations"):
+    """Co scénář pokrývá: celou kombinaci, nebo všechny dvojice jejích hodnot"""
+    dims = scenario_dimensions(tc)
+    if mode == "pairwise":
+        return {((a, dims[a]), (b, dims[b])) for a, b in combinations(COVERAGE_DIMENSIONS, 2)}
+    return {tuple(dims[d] for d in COVERAGE_DIMENSIONS)}
+
+
+def optimize(scenarios, mode="combinations", budget=None):
+    """Nejlevnější podmnožina scénářů pokrývající vše, co pokrývá celý projekt.
+
+    Vážené hladové set cover (poměr cena / nově pokryté požadavky) s líným
+    přepočtem přes haldu: zisk scénáře jen klesá, takže stačí přepočítat
+    vrchol haldy a vzít ho, pokud zůstane nejlepší. Při shodném poměru
+    rozhoduje pořadí scénáře v projektu. S `budget` (limit pracnosti) se
+    scénář, který se do zbytku limitu nevejde, přeskočí a část požadavků
+    zůstane nepokrytá. Vrací indexy vybraných scénářů v původním pořadí a souhrn.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Neznámý režim optimalizace: {mode}")
+
+    covers = [requirements(tc, mode) for tc in scenarios]
+    costs = [scenario_cost(tc) for tc in scenarios]
+    uncovered = set().union(*covers) if covers else set()
+    universe = len(uncovered)
+
+    # (cena za požadavek, index, počet pokrytých při výpočtu)
+    heap = [(costs[i] / len(c), i, len(c)) for i, c in enumerate(covers) if c]
+    heapq.heapify(heap)
+
+    selected = []
+    remaining = budget
+    while uncovered and heap:
+        ratio, i, gain = heapq.heappop(heap)
+        new_gain = len(covers[i] & uncovered)
+        if new_gain == 0:
+            continue
+        # Zbytek limitu jen klesá - co se nevejde teď, nevejde se ani později
+        if remaining is not None and costs[i] > remaining + 1e-9:
+            continue
+        if new_gain != gain:
+            heapq.heappush(heap, (costs[i] / new_gain, i, new_gain))
+            continue
+        selected.append(i)
+        uncovered -= covers[i]
+        if remaining is not None:
+            remaining -= costs[i]
+
+    selected.sort()
+    summary = {
+        "mode": mode,
+        "requirements": universe,
+        "covered": universe - len(uncovered),
+        "total": len(scenarios),
+        "selected": len(selected),
+        "cost_total": round(sum(costs), 2),
+        "cost_selected": round(sum(costs[i] for i in selected), 2),
+    }
+    return selected, summary
+
+
+def reduced_project(project_data, selected):
+    """Kopie projektu jen s vybranými scénáři (pro export redukované sady)"""
+    scenarios = project_data.get("scenarios", [])
+    return {**project_data, "scenarios": [scenarios[i] for i in selected]}
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    kind UNINDEXED,
+    project UNINDEXED,
+    ref UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+-- Otisk zdroje (projekt / akce) - přeindexuje se jen to, co se změnilo
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+-- Které řádky docs patří ke zdroji (mazání bez průchodu celé FTS tabulky)
+CREATE TABLE IF NOT EXISTS doc_sources (
+    docid INTEGER PRIMARY KEY,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS doc_sources_source ON doc_sources(source);
+"""
+
+# Název má při řazení větší váhu než tělo dokumentu
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+KIND_LABELS = {"project": "📁 Projekt", "scenario": "🧪 Scénář", "akce": "🔧 Akce"}
+
+
+def _signature(obj):
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _steps_text(obsah):
+    kroky = obsah.get("steps", []) if isinstance(obsah, dict) else obsah or []
+    parts = []
+    for krok in kroky:
+        if isinstance(krok, dict):
+            parts.extend([krok.get("description", ""), krok.get("expected", "")])
+        else:
+            parts.append(str(krok))
+    return "\n".join(p for p in parts if p)
+
+
+def _project_docs(name, project):
+    yield ("project", name, "", name, project.get("subject", ""))
+    for tc in project.get("scenarios", []):
+        body = "\n".join([tc.get("veta", ""), tc.get("akce", "")])
+        yield ("scenario", name, str(tc.get("order_no", "")), tc.get("test_name", ""), body)
+
+
+def _action_docs(akce, obsah):
+    popis = obsah.get("description", "") if isinstance(obsah, dict) else ""
+    yield ("akce", "", akce, akce, "\n".join([popis, _steps_text(obsah)]))
+
+
+def build_match(query, fold):
+    """Dotaz uživatele -> FTS5 MATCH: všechna slova, každé jako prefix"""
+    tokens = re.findall(r"[a-z0-9]+", fold(query or ""))
+    return " AND ".join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """Fulltextový index projektů, scénářů a akcí (SQLite FTS5).
+
+    Index je odvozený z projects.json a kroky.json a dá se kdykoli smazat.
+    Uložení předá jména změněných projektů/akcí (`names`) a přeindexují se jen
+    ty; bez nich `sync_*` porovná otisky všech a přepíše změněné. Index si
+    pamatuje verzi souboru (otisk mtime/velikost), se kterou je srovnaný -
+    plná synchronizace proběhne až při dotazu nad jinou verzí.
+    """
+
+    def __init__(self, db_path: Path, fold=str.lower):
+        self.db_path = Path(db_path)
+        self.fold = fold
+        self._lock = threading.Lock()
+        self._synced = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    # ----- Aktualizace -----
+    def sync_projects(self, projects_data, names=None, version=None):
+        self._sync("project", projects_data, _project_docs, names, version)
+
+    def sync_actions(self, kroky_data, names=None, version=None):
+        self._sync("akce", kroky_data, _action_docs, names, version)
+
+    def is_synced(self, prefix, version):
+        return version is not None and self._synced.get(prefix) == version
+
+    def sync_if_changed(self, projects_data, kroky_data, versions=(None, None)):
+        """Plná synchronizace jen pro verze souborů, které index ještě neviděl"""
+        project_version, kroky_version = versions
+        if not self.is_synced("project", project_version):
+            self.sync_projects(projects_data, version=project_version)
+        if not self.is_synced("akce", kroky_version):
+            self.sync_actions(kroky_data, version=kroky_version)
+
+    def _sync(self, prefix, items, make_docs, names=None, version=None):
+        keys = items.keys() if names is None else [key for key in names if key in items]
+        signatures = {f"{prefix}:{key}": (key, _signature(items[key])) for key in keys}
+        removed = None if names is None else {f"{prefix}:{key}" for key in names if key not in items}
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if removed is None:
+                        stored = dict(conn.execute(
+                            "SELECT source, signature FROM sources WHERE source LIKE ? ESCAPE '\\'",
+                            (prefix.replace("%", "\\%").replace("_", "\\_") + ":%",),
+                        ))
+                        removed = stored.keys() - signatures.keys()
+                    else:
+                        stored = dict(conn.execute(
+                            f"SELECT source, signature FROM sources WHERE source IN ({','.join('?' * len(signatures))})",
+                            list(signatures),
+                        )) if signatures else {}
+                    for source in removed:
+                        self._delete_source(conn, source)
+
+                    for source, (key, signature) in signatures.items():
+                        if stored.get(source) == signature:
+                            continue
+                        self._delete_source(conn, source)
+                        for doc in make_docs(key, items[key]):
+                            cursor = conn.execute(
+                                "INSERT INTO docs(kind, project, ref, title, body) VALUES (?, ?, ?, ?, ?)", doc
+                            )
+                            conn.execute(
+                                "INSERT INTO doc_sources(docid, source) VALUES (?, ?)", (cursor.lastrowid, source)
+                            )
+                        conn.execute(
+                            "INSERT OR REPLACE INTO sources(source, signature) VALUES (?, ?)", (source, signature)
+                        )
+            finally:
+                conn.close()
+            self._synced[prefix] = version
+
+    @staticmethod
+    def _delete_source(conn, source):
+        docids = [row[0] for row in conn.execute("SELECT docid FROM doc_sources WHERE source = ?", (source,))]
+        conn.executemany("DELETE FROM docs WHERE rowid = ?", [(d,) for d in docids])
+        conn.execute("DELETE FROM doc_sources WHERE source = ?", (source,))
+        conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    # ----- Dotazy -----
+    def search(self, query, page=1, page_size=20):
+        """Výsledky seřazené podle bm25; vrací (celkový počet, seznam slovníků)"""
+        match = build_match(query, self.fold)
+        if not match:
+            return 0, []
+
+        offset = (max(page, 1) - 1) * page_size
+        with self._lock:
+            conn = self._connect()
+            try:
+                total = conn.execute("SELECT count(*) FROM docs WHERE docs MATCH ?", (match,)).fetchone()[0]
+                rows = conn.execute(
+                    f"""
+                    SELECT kind, project, ref, title,
+                           snippet(docs, 4, '**', '**', ' … ', 12),
+                           bm25(docs, 0, 0, 0, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+                    FROM docs WHERE docs MATCH ?
+                    ORDER BY score LIMIT ? OFFSET ?
+                    """,
+                    (match, page_size, offset),
+                ).fetchall()
+            finally:
+                conn.close()
+
+        results = [
+            {"kind": kind, "project": project, "ref": ref, "title": title, "snippet": snippet, "score": -score}
+            for kind, project, ref, title, snippet, score in rows
+        ]
+        return total, results
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                return dict(conn.execute("SELECT kind, count(*) FROM docs GROUP BY kind").fetchall())
+            finally:
+                conn.close()
@@ -0,0 +1,112 @@
+from step_sets import content_hash
+
+# Rozpracovaná editace akce: "edit_kroky_{akce}" -> overlay nad sdíleným snapshotem
+EDIT_BUFFER_PREFIX = "edit_kroky_"
+
+# Výsledky vázané na snapshot, ze kterého vznikly: klíč session -> sledovaný soubor
+SNAPSHOT_BOUND_KEYS = {
+    "dup_result": "kroky",
+}
+
+
+def edit_buffer_key(akce):
+    return f"{EDIT_BUFFER_PREFIX}{akce}"
+
+
+# ---------- Overlay kroků akce ----------
+def new_overlay(base_steps):
+    """Prázdný overlay - session drží jen změny, kroky samotné zůstávají ve sdíleném snapshotu.
+
+    `base` je otisk kroků, nad kterými overlay vznikl; když je mezitím někdo
+    jiný uloží, indexy v overlayi už neplatí.
+    """
+    return {"base": content_hash(list(base_steps)), "edits": {}, "removed": set(), "added": []}
+
+
+def overlay_entries(base_steps, overlay):
+    """Výsledné kroky jako dvojice (odkaz, krok); odkaz je ("b", index) nebo ("n", index přidaného)"""
+    entries = [
+        (("b", i), overlay["edits"].get(i, krok))
+        for i, krok in enumerate(base_steps) if i not in overlay["removed"]
+    ]
+    entries.extend((("n", j), krok) for j, krok in enumerate(overlay["added"]))
+    return entries
+
+
+def overlay_steps(base_steps, overlay):
+    return [krok for _, krok in overlay_entries(base_steps, overlay)]
+
+
+def overlay_set(base_steps, overlay, ref, krok):
+    """Zapíše upravený krok; návrat k původní hodnotě změnu z overlaye odstraní"""
+    kind, index = ref
+    if kind == "n":
+        overlay["added"][index] = krok
+    elif krok == base_steps[index]:
+        overlay["edits"].pop(index, None)
+    else:
+        overlay["edits"][index] = krok
+
+
+def overlay_remove(overlay, ref):
+    kind, index = ref
+    if kind == "n":
+        overlay["added"].pop(index)
+    else:
+        overlay["edits"].pop(index, None)
+        overlay["removed"].add(index)
+
+
+def overlay_is_stale(base_steps, overlay):
+    return overlay["base"] != content_hash(list(base_steps))
+
+
+def overlay_size(overlay):
+    """Počet změn, které overlay drží"""
+    return len(overlay["edits"]) + len(overlay["removed"]) + len(overlay["added"])
+
+
+# ---------- Úklid session ----------
+def collect_stale_buffers(state, steps_data, versions):
+    """Odstraní ze session rozpracované buffery, které už nikdo nezobrazuje.
+
+    - overlaye akcí, které se právě needitují nebo už neexistují,
+    - výsledky spočítané nad starší verzí snapshotu (`versions` = soubor -> verze),
+    - potvrzení smazání akce, která už neexistuje.
+    Vrací seznam odstraněných klíčů.
+    """
+    active = state.get("edit_akce")
+    if active is not None and active not in steps_data:
+        state["edit_akce"] = None
+        active = None
+
+    removed = []
+    for key in list(state.keys()):
+        if not isinstance(key, str):
+            continue
+        if key.startswith(EDIT_BUFFER_PREFIX):
+            if active is None or key != edit_buffer_key(active) or not isinstance(state[key], dict):
+                removed.append(key)
+        elif key in SNAPSHOT_BOUND_KEYS:
+            value = state[key]
+            version = value.get("version") if isinstance(value, dict) else None
+            if version != versions.get(SNAPSHOT_BOUND_KEYS[key]):
+                removed.append(key)
+
+    for key in removed:
+        del state[key]
+
+    if state.get("smazat_akci") and state["smazat_akci"] not in steps_data:
+        state["smazat_akci"] = None
+    return removed
+
+
+def buffer_stats(state):
+    """Počet a velikost bufferů v session - pro záložku Diagnostika"""
+    overlays = [v for k, v in state.items() if isinstance(k, str) and k.startswith(EDIT_BUFFER_PREFIX)]
+    return {
+        "keys": len(state.keys()),
+        "edit_buffers": len(overlays),
+        "overlay_changes": sum(overlay_size(o) for o in overlays if isinstance(o, dict)),
+        "snapshot_bound": sum(1 for k in SNAPSHOT_BOUND_KEYS if k in state),
+    }
@@ -0,0 +1,225 @@
+import re
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from core import fold_text
+from step_sets import content_hash
+
+# Mersennovo prvočíslo pro univerzální hashování (a * x + b) mod P
+_PRIME = (1 << 31) - 1
+
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+BANDS = 16  # 16 pásem × 4 řádky ~ kandidát od Jaccardovy podobnosti kolem 0.5
+
+STEP_THRESHOLD = 0.9
+ACTION_THRESHOLD = 0.6
+
+# Slova technologie - kroky, které se v nich liší, popisují jinou službu ("z roletky FIX" ≠ "z roletky Mobil/TV").
+# Krátké zkratky musí sedět přesně, delší kmeny smí mít koncovku (pevneho, mobilni, optikou)
+TECHNOLOGY_WORDS = {"dsl", "vdsl", "adsl", "fwa", "ftth", "fix", "tv", "iptv", "bi", "bisi"}
+TECHNOLOGY_STEMS = ("fiber", "optik", "optic", "cable", "hlas", "mobil", "tarif", "voice", "pevn", "indoor", "outdoor")
+# Zápor obrací význam kroku ("je aktivní" ≠ "není aktivní")
+NEGATION_WORDS = {"ne", "neni", "nejsou", "nebyl", "nebyla", "nebylo", "bez", "nelze"}
+
+
+# ---------- Shingling a MinHash ----------
+def normalize_step_text(text):
+    """Bez diakritiky, interpunkce a vícenásobných mezer"""
+    return " ".join(re.findall(r"[a-z0-9]+", fold_text(text or "")))
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """Množina znakových k-gramů (krátké kroky se liší koncovkami, ne celými slovy)"""
+    text = normalize_step_text(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def word_tokens(text):
+    """Množina slov kroku - podobnost po slovech nespojí kroky, které se liší celým slovem"""
+    return set(normalize_step_text(text).split())
+
+
+def technology_tokens(tokens):
+    return frozenset(t for t in tokens if t in TECHNOLOGY_WORDS or t.startswith(TECHNOLOGY_STEMS))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash podpisy a LSH pásma pro hledání podobných množin bez porovnání všech dvojic"""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm musí být dělitelné počtem pásem")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64)
+        # a < 2^31, crc < 2^32 -> součin se vejde do uint64
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def candidate_pairs(self, signatures):
+        """Dvojice indexů, které sdílí aspoň jedno pásmo podpisu"""
+        pairs = set()
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            start = band * self.rows
+            for i, sig in enumerate(signatures):
+                buckets[sig[start:start + self.rows].tobytes()].append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return pairs
+
+
+def _clusters(count, pairs):
+    """Union-find nad potvrzenými dvojicemi -> seznam skupin indexů (jen skupiny > 1)"""
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for i in range(count):
+        groups[find(i)].append(i)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+# ---------- Kroky ----------
+def _action_steps(obsah):
+    if isinstance(obsah, dict):
+        return obsah.get("steps", [])
+    return obsah if isinstance(obsah, list) else []
+
+
+def _step_text(krok):
+    if isinstance(krok, dict):
+        return f"{krok.get('description', '')} {krok.get('expected', '')}"
+    return str(krok)
+
+
+def step_guard(krok):
+    """Co musí mít dva kroky shodné, aby šly sjednotit: úvodní sloveso popisu, slova technologie a zápory.
+
+    "Aktivuj balíček Security" a "Deaktivuj balíček Security" se po slovech liší málo,
+    ale znamenají opak; stejně tak krok pro FIX a pro Mobil/TV.
+    """
+    description = krok.get("description", "") if isinstance(krok, dict) else str(krok)
+    words = normalize_step_text(description).split()
+    tokens = word_tokens(_step_text(krok))
+    return (words[0] if words else "", technology_tokens(tokens), frozenset(tokens & NEGATION_WORDS))
+
+
+def find_duplicate_steps(kroky_data, threshold=STEP_THRESHOLD, hasher=None):
+    """Skupiny téměř stejných kroků napříč všemi akcemi.
+
+    Jedinečné kroky (podle obsahu) dostanou MinHash podpis ze svých slov, LSH
+    vrátí jen kandidátní dvojice a ty se ověří přesnou Jaccardovou podobností
+    slov a shodou `step_guard` - počet porovnání roste s počtem podobných
+    kroků, ne s druhou mocninou knihovny. Shodný guard je tranzitivní, takže
+    kanonický krok (nejpoužívanější varianta) nikdy nepřekročí technologii.
+    """
+    hasher = hasher or MinHasher()
+
+    unique = {}        # hash kroku -> krok
+    usage = Counter()  # hash kroku -> počet výskytů
+    where = defaultdict(list)
+    for akce, obsah in kroky_data.items():
+        for i, krok in enumerate(_action_steps(obsah)):
+            h = content_hash(krok)
+            unique.setdefault(h, krok)
+            usage[h] += 1
+            where[h].append((akce, i))
+
+    keys = list(unique)
+    position = {h: i for i, h in enumerate(keys)}
+    token_sets = [word_tokens(_step_text(unique[h])) for h in keys]
+    guards = [step_guard(unique[h]) for h in keys]
+    signatures = [hasher.signature(s) for s in token_sets]
+    confirmed = [
+        (a, b) for a, b in hasher.candidate_pairs(signatures)
+        if guards[a] == guards[b] and jaccard(token_sets[a], token_sets[b]) >= threshold
+    ]
+
+    groups = []
+    for members in _clusters(len(keys), confirmed):
+        member_keys = [keys[i] for i in members]
+        canonical = max(member_keys, key=lambda h: (usage[h], len(_step_text(unique[h]))))
+        groups.append({
+            "canonical": unique[canonical],
+            "canonical_hash": canonical,
+            "variants": [
+                {
+                    "step": unique[h],
+                    "hash": h,
+                    "uses": usage[h],
+                    "actions": sorted({akce for akce, _ in where[h]}),
+                    "similarity": round(jaccard(token_sets[position[h]], token_sets[position[canonical]]), 2),
+                }
+                for h in member_keys if h != canonical
+            ],
+        })
+    groups.sort(key=lambda g: -sum(v["uses"] for v in g["variants"]))
+    return groups
+
+
+def canonical_step_map(groups):
+    """hash varianty -> kanonický krok"""
+    return {v["hash"]: g["canonical"] for g in groups for v in g["variants"]}
+
+
+def canonicalize_steps(kroky, step_map):
+    """Nahradí varianty kanonickým krokem a odstraní duplicity uvnitř jedné sady"""
+    result = []
+    seen = set()
+    for krok in kroky:
+        krok = step_map.get(content_hash(krok), krok)
+        h = content_hash(krok)
+        if h not in seen:
+            seen.add(h)
+            result.append(krok)
+    return result
+
+
+# ---------- Akce ----------
+def find_duplicate_actions(kroky_data, threshold=ACTION_THRESHOLD, hasher=None):
+    """Dvojice akcí s podobnými kroky - návrhy na sloučení (seřazené od nejpodobnějších)"""
+    hasher = hasher or MinHasher()
+    names = list(kroky_data)
+    shingle_sets = [
+        set().union(*(shingles(_step_text(k)) for k in _action_steps(kroky_data[akce])))
+        for akce in names
+    ]
+    signatures = [hasher.signature(s) for s in shingle_sets]
+
+    suggestions = []
+    for a, b in hasher.candidate_pairs(signatures):
+        similarity = jaccard(shingle_sets[a], shingle_sets[b])
+        if similarity >= threshold:
+            suggestions.append({"actions": (names[min(a, b)], names[max(a, b)]), "similarity": round(similarity, 2)})
+    suggestions.sort(key=lambda s: -s["similarity"])
+    return suggestions
@@ -0,0 +1,125 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+# ---------- Cesty ----------
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_STEP_SETS_PATH = BASE_DIR / "step_sets.json"
+
+
+def content_hash(obj):
+    """Krátký hash obsahu - stejné kroky dají vždy stejný klíč"""
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class StepSetStore:
+    """Sdílená tabulka kroků adresovaná obsahem.
+
+    Scénář si místo kopie kroků pamatuje jen `kroky_ref` - hash sady kroků akce
+    v okamžiku generování. Každý jedinečný krok je v souboru uložen jen jednou
+    (`steps`), sada je seznam hashů kroků (`sets`). Zápis probíhá pod zámkem
+    souboru nad čerstvě načteným obsahem, takže CLI a aplikace si sady nepřepíšou.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.RLock()
+        self._steps = None
+        self._sets = None
+        self._mtime = None
+        self._resolved = {}
+
+    def _load(self, force=False):
+        mtime = self.path.stat().st_mtime_ns if self.path.exists() else None
+        if self._sets is not None and mtime == self._mtime and not force:
+            return
+
+        data = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        self._steps = data.get("steps", {})
+        self._sets = data.get("sets", {})
+        self._mtime = mtime
+        self._resolved = {}
+
+    def _save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"steps": self._steps, "sets": self._sets}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+    def put(self, kroky):
+        """Uloží sadu kroků (pokud ještě neexistuje) a vrátí její hash"""
+        step_hashes = [content_hash(krok) for krok in kroky]
+        ref = content_hash(step_hashes)
+
+        # concurrency importuje step_sets (content_hash) - zámek až tady
+        from concurrency import FileLock
+
+        with self._lock:
+            self._load()
+            if ref in self._sets:
+                return ref
+
+            with FileLock(self.lock_path):
+                # Jiný proces mohl mezitím přidat své sady - zapisuje se nad aktuálním souborem
+                self._load(force=True)
+                if ref in self._sets:
+                    return ref
+                for step_hash, krok in zip(step_hashes, kroky):
+                    self._steps.setdefault(step_hash, krok)
+                self._sets[ref] = step_hashes
+                self._save()
+        return ref
+
+    def get(self, ref):
+        """Vrátí kroky sady; výsledek je sdílený mezi scénáři - neměnit!"""
+        with self._lock:
+            self._load()
+            if ref not in self._resolved:
+                step_hashes = self._sets.get(ref)
+                if step_hashes is None:
+                    print(f"⚠️ Sada kroků {ref} nebyla nalezena")
+                    return []
+                self._resolved[ref] = [self._steps[h] for h in step_hashes]
+            return self._resolved[ref]
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {"sets": len(self._sets), "steps": len(self._steps)}
+
+
+def migrate_projects(projects_data, store: StepSetStore):
+    """Nahradí kopie kroků ve scénářích odkazem `kroky_ref` (v místě)"""
+    migrated = 0
+    for project_data in projects_data.values():
+        for scenario in project_data.get("scenarios", []):
+            if "kroky" in scenario:
+                scenario["kroky_ref"] = store.put(scenario.pop("kroky"))
+                migrated += 1
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Převod kopií kroků ve scénářích na odkazy do step_sets.json")
+    parser.add_argument("projects", type=Path, nargs="+", help="např. projects.json projekty.json")
+    parser.add_argument("--step-sets", type=Path, default=DEFAULT_STEP_SETS_PATH)
+    args = parser.parse_args()
+
+    store = StepSetStore(args.step_sets)
+    for projects_path in args.projects:
+        with open(projects_path, "r", encoding="utf-8") as f:
+            projects_data = json.load(f)
+        migrated = migrate_projects(projects_data, store)
+        with open(projects_path, "w", encoding="utf-8") as f:
+            json.dump(projects_data, f, ensure_ascii=False, indent=2)
+        print(f"✅ {projects_path}: {migrated} scénářů převedeno na odkazy")
+    print(f"ℹ️ {args.step_sets}: {store.stats()}")
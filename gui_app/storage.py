@@ -0,0 +1,384 @@
+import argparse
+import copy
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+# ---------- Cesty ----------
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_JSON_PATH = BASE_DIR / "projects.json"
+DEFAULT_DB_PATH = BASE_DIR / "projects.db"
+
+# Klíče scénáře, které mají v databázi vlastní sloupec
+SCENARIO_COLUMNS = ("order_no", "test_name", "akce")
+
+
+# ---------- Mutace projektů ----------
+def _without_numbering(scenario):
+    """Scénář bez čísla a názvu - pro rozpoznání pouhého přečíslování"""
+    return {k: v for k, v in scenario.items() if k not in ("order_no", "test_name")}
+
+
+def _project_meta(project_data):
+    # Místo scénářů jen zástupná hodnota, aby se zachovalo pořadí klíčů v JSON
+    return {k: (None if k == "scenarios" else v) for k, v in project_data.items()}
+
+
+def _diff_scenarios(name, old, new):
+    """Porovná seznamy scénářů jednoho projektu a vrátí řádkové mutace"""
+    ops = []
+
+    # Přidání na konec seznamu (generate_testcase)
+    if len(new) >= len(old) and new[:len(old)] == old:
+        for index in range(len(old), len(new)):
+            ops.append({"op": "add_scenario", "project": name, "index": index, "scenario": new[index]})
+        return ops
+
+    # Smazání jednoho scénáře - zbytek se porovná jako úprava/přečíslování
+    if len(new) == len(old) - 1:
+        deleted = next((i for i in range(len(new)) if _without_numbering(new[i]) != _without_numbering(old[i])), len(new))
+        ops.append({"op": "delete_scenario", "project": name, "index": deleted})
+        old = old[:deleted] + old[deleted + 1:]
+
+    if len(new) != len(old):
+        return None
+
+    changed = [i for i in range(len(new)) if new[i] != old[i]]
+    if not changed:
+        return ops
+
+    if all(_without_numbering(new[i]) == _without_numbering(old[i]) for i in changed):
+        numbers = [[sc.get("order_no"), sc.get("test_name")] for sc in new]
+        ops.append({"op": "renumber", "project": name, "numbers": numbers})
+        return ops
+
+    for index in changed:
+        ops.append({"op": "edit_scenario", "project": name, "index": index, "scenario": new[index]})
+    return ops
+
+
+def diff_projects(old, new):
+    """Vrátí seznam mutací, které převedou `old` na `new`.
+
+    Rozpoznává přidání, úpravu, smazání a přečíslování scénářů a přejmenování
+    projektu. Co nelze popsat řádkově, se uloží jako celý projekt (`set_project`).
+    """
+    ops = []
+    removed = [name for name in old if name not in new]
+    added = [name for name in new if name not in old]
+
+    # Přejmenování = zmizelý projekt se stejným obsahem jako nový
+    for name in list(removed):
+        match = next((a for a in added if new[a] == old[name]), None)
+        if match is not None:
+            ops.append({"op": "rename_project", "project": name, "new_name": match})
+            removed.remove(name)
+            added.remove(match)
+
+    for name in removed:
+        ops.append({"op": "delete_project", "project": name})
+
+    for name, project_data in new.items():
+        if name in added:
+            ops.append({"op": "set_project", "project": name, "data": project_data})
+            continue
+        if name not in old:
+            continue
+
+        old_data = old[name]
+        if old_data == project_data:
+            continue
+
+        if _project_meta(old_data) != _project_meta(project_data):
+            ops.append({"op": "set_meta", "project": name, "meta": _project_meta(project_data)})
+
+        scenario_ops = _diff_scenarios(name, old_data.get("scenarios", []), project_data.get("scenarios", []))
+        if scenario_ops is None:
+            ops.append({"op": "set_project", "project": name, "data": project_data})
+        else:
+            ops.extend(scenario_ops)
+
+    return ops
+
+
+def apply_mutation(projects_data, op):
+    """Aplikuje jednu mutaci na slovník projektů (v místě)"""
+    kind = op["op"]
+    name = op["project"]
+
+    if kind == "set_project":
+        projects_data[name] = copy.deepcopy(op["data"])
+    elif kind == "delete_project":
+        projects_data.pop(name, None)
+    elif kind == "rename_project":
+        projects_data[op["new_name"]] = projects_data.pop(name)
+    elif kind == "set_meta":
+        scenarios = projects_data.get(name, {}).get("scenarios", [])
+        projects_data[name] = copy.deepcopy(op["meta"])
+        projects_data[name]["scenarios"] = scenarios
+    elif kind == "add_scenario":
+        projects_data[name]["scenarios"].insert(op["index"], copy.deepcopy(op["scenario"]))
+    elif kind == "edit_scenario":
+        projects_data[name]["scenarios"][op["index"]] = copy.deepcopy(op["scenario"])
+    elif kind == "delete_scenario":
+        projects_data[name]["scenarios"].pop(op["index"])
+    elif kind == "renumber":
+        for scenario, (order_no, test_name) in zip(projects_data[name]["scenarios"], op["numbers"]):
+            scenario["order_no"] = order_no
+            scenario["test_name"] = test_name
+    else:
+        raise ValueError(f"Neznámá mutace: {kind}")
+
+
+# ---------- SQLite úložiště ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    meta TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL REFERENCES projects(name) ON UPDATE CASCADE ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    order_no INTEGER,
+    test_name TEXT,
+    akce TEXT,
+    data TEXT NOT NULL,
+    has_kroky INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_project ON scenarios(project, position);
+CREATE TABLE IF NOT EXISTS steps (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    description TEXT,
+    expected TEXT,
+    raw TEXT,
+    PRIMARY KEY (scenario_id, idx)
+);
+"""
+
+
+def _step_row(scenario_id, idx, krok):
+    # Standardní krok {"description", "expected"} jde do sloupců, cokoliv jiného jako JSON
+    if isinstance(krok, dict) and list(krok.keys()) == ["description", "expected"]:
+        return (scenario_id, idx, krok["description"], krok["expected"], None)
+    return (scenario_id, idx, None, None, json.dumps(krok, ensure_ascii=False))
+
+
+def _step_from_row(description, expected, raw):
+    if raw is not None:
+        return json.loads(raw)
+    return {"description": description, "expected": expected}
+
+
+class SQLiteProjectStore:
+    """Projekty, scénáře a kroky v SQLite - ukládá se jen to, co se změnilo"""
+
+    def __init__(self, db_path: Path, json_path: Path = None):
+        self.db_path = Path(db_path)
+        self.json_path = Path(json_path) if json_path else None
+        self._lock = threading.RLock()
+        self._snapshot = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def signature(self):
+        """Otisk souborů databáze (mtime, velikost) pro cache v core.py"""
+        paths = [self.db_path, self.db_path.with_name(self.db_path.name + "-wal")]
+        return tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in paths)
+
+    # ----- Čtení -----
+    def _read_all(self, conn):
+        projects_data = {}
+        for name, meta in conn.execute("SELECT name, meta FROM projects ORDER BY position"):
+            projects_data[name] = json.loads(meta)
+            projects_data[name]["scenarios"] = []
+
+        by_id = {}
+        rows = conn.execute(
+            "SELECT id, project, data, has_kroky FROM scenarios ORDER BY project, position"
+        )
+        for scenario_id, project, data, has_kroky in rows:
+            scenario = json.loads(data)
+            if has_kroky:
+                scenario["kroky"] = []
+            projects_data[project]["scenarios"].append(scenario)
+            by_id[scenario_id] = scenario
+
+        for scenario_id, description, expected, raw in conn.execute(
+            "SELECT scenario_id, description, expected, raw FROM steps ORDER BY scenario_id, idx"
+        ):
+            by_id[scenario_id]["kroky"].append(_step_from_row(description, expected, raw))
+
+        return projects_data
+
+    def load(self):
+        """Načte všechny projekty; prázdnou databázi naplní z projects.json"""
+        with self._lock:
+            if not self.db_path.exists() and self.json_path and self.json_path.exists():
+                import_projects_json(self.json_path, self.db_path)
+
+            with self._connect() as conn:
+                projects_data = self._read_all(conn)
+            conn.close()
+
+            self._snapshot = copy.deepcopy(projects_data)
+            return projects_data
+
+    # ----- Zápis -----
+    def _insert_scenario(self, conn, project, position, scenario):
+        data = {k: v for k, v in scenario.items() if k != "kroky"}
+        cur = conn.execute(
+            "INSERT INTO scenarios (project, position, order_no, test_name, akce, data, has_kroky) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (project, position, *(scenario.get(k) for k in SCENARIO_COLUMNS),
+             json.dumps(data, ensure_ascii=False), int("kroky" in scenario))
+        )
+        scenario_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO steps (scenario_id, idx, description, expected, raw) VALUES (?, ?, ?, ?, ?)",
+            [_step_row(scenario_id, i, krok) for i, krok in enumerate(scenario.get("kroky", []))]
+        )
+        return scenario_id
+
+    def _insert_project(self, conn, name, project_data):
+        position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM projects").fetchone()[0]
+        conn.execute(
+            "INSERT INTO projects (name, position, meta) VALUES (?, ?, ?)",
+            (name, position, json.dumps(_project_meta(project_data), ensure_ascii=False))
+        )
+        for i, scenario in enumerate(project_data.get("scenarios", [])):
+            self._insert_scenario(conn, name, i, scenario)
+
+    def _scenario_id(self, conn, project, index):
+        row = conn.execute(
+            "SELECT id FROM scenarios WHERE project = ? AND position = ?", (project, index)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Scénář {index} v projektu '{project}' neexistuje")
+        return row[0]
+
+    def _apply(self, conn, op):
+        kind = op["op"]
+        name = op["project"]
+
+        if kind == "set_project":
+            conn.execute("DELETE FROM projects WHERE name = ?", (name,))
+            self._insert_project(conn, name, op["data"])
+        elif kind == "delete_project":
+            conn.execute("DELETE FROM projects WHERE name = ?", (name,))
+        elif kind == "rename_project":
+            conn.execute(
+                "UPDATE projects SET name = ?, position = (SELECT MAX(position) + 1 FROM projects) WHERE name = ?",
+                (op["new_name"], name)
+            )
+        elif kind == "set_meta":
+            conn.execute(
+                "UPDATE projects SET meta = ? WHERE name = ?",
+                (json.dumps(op["meta"], ensure_ascii=False), name)
+            )
+        elif kind == "add_scenario":
+            conn.execute(
+                "UPDATE scenarios SET position = position + 1 WHERE project = ? AND position >= ?",
+                (name, op["index"])
+            )
+            self._insert_scenario(conn, name, op["index"], op["scenario"])
+        elif kind == "edit_scenario":
+            conn.execute("DELETE FROM scenarios WHERE id = ?", (self._scenario_id(conn, name, op["index"]),))
+            self._insert_scenario(conn, name, op["index"], op["scenario"])
+        elif kind == "delete_scenario":
+            conn.execute("DELETE FROM scenarios WHERE id = ?", (self._scenario_id(conn, name, op["index"]),))
+            conn.execute(
+                "UPDATE scenarios SET position = position - 1 WHERE project = ? AND position > ?",
+                (name, op["index"])
+            )
+        elif kind == "renumber":
+            for position, (order_no, test_name) in enumerate(op["numbers"]):
+                row = conn.execute(
+                    "SELECT data FROM scenarios WHERE project = ? AND position = ?", (name, position)
+                ).fetchone()
+                data = json.loads(row[0])
+                data["order_no"] = order_no
+                data["test_name"] = test_name
+                conn.execute(
+                    "UPDATE scenarios SET order_no = ?, test_name = ?, data = ? WHERE project = ? AND position = ?",
+                    (order_no, test_name, json.dumps(data, ensure_ascii=False), name, position)
+                )
+        else:
+            raise ValueError(f"Neznámá mutace: {kind}")
+
+    def apply(self, ops):
+        """Provede mutace v jedné transakci"""
+        if not ops:
+            return
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for op in ops:
+                        self._apply(conn, op)
+            finally:
+                conn.close()
+
+            if self._snapshot is not None:
+                for op in ops:
+                    apply_mutation(self._snapshot, op)
+
+    def save(self, projects_data):
+        """Uloží projekty - do databáze zapíše jen rozdíl proti poslednímu stavu"""
+        with self._lock:
+            if self._snapshot is None:
+                self.load()
+            ops = diff_projects(self._snapshot, projects_data)
+            self.apply(ops)
+            return ops
+
+
+# ---------- Import / export ----------
+def import_projects_json(json_path: Path, db_path: Path):
+    """Jednorázově naplní databázi z projects.json (existující obsah nahradí)"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        projects_data = json.load(f)
+
+    store = SQLiteProjectStore(db_path)
+    conn = store._connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM projects")
+            for name, project_data in projects_data.items():
+                store._insert_project(conn, name, project_data)
+    finally:
+        conn.close()
+
+    print(f"✅ Importováno {len(projects_data)} projektů do {db_path}")
+    return len(projects_data)
+
+
+def export_projects_json(db_path: Path, json_path: Path):
+    """Vyexportuje databázi zpět do projects.json (kvůli git diffům)"""
+    projects_data = SQLiteProjectStore(db_path).load()
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(projects_data, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ Exportováno {len(projects_data)} projektů do {json_path}")
+    return len(projects_data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Převod projects.json <-> projects.db")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--json", type=Path, default=DEFAULT_JSON_PATH)
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        import_projects_json(args.json, args.db)
+    else:
+        export_projects_json(args.db, args.json)
@@ -0,0 +1,153 @@
+import functools
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+
+class _NullSpan:
+    """Span při vypnutém měření - nic nedělá"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def _percentile(ordered, q):
+    """Percentil metodou nejbližšího pořadí nad seřazeným seznamem"""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Tracer:
+    """Lehké měření doby trvání úseků (span) pro záložku Diagnostika.
+
+    Každý span přidá vzorek do kruhového bufferu svého jména (pro p50/p95)
+    a připočte se k právě běžícímu rerunu aplikace. Reruny se drží v dalším
+    kruhovém bufferu, takže paměť zůstává konstantní. Rerun patří vláknu,
+    ve kterém Streamlit spouští skript; spany z jiných vláken (git na pozadí)
+    mají jen vzorky. Vypnutý tracer vrací sdílený prázdný span.
+    """
+
+    def __init__(self, enabled=True, max_reruns=50, max_samples=500):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._reruns = deque(maxlen=max_reruns)
+
+    # ----- Měření -----
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """Dekorátor - celé volání funkce jako jeden span"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, name, ms):
+        rerun = getattr(self._local, "rerun", None)
+        with self._lock:
+            self._samples[name].append(ms)
+            if rerun is not None:
+                rerun["spans"][name] = rerun["spans"].get(name, 0.0) + ms
+                rerun["total_ms"] = (time.perf_counter() - rerun["start"]) * 1000
+
+    # ----- Reruny aplikace -----
+    def begin_rerun(self):
+        """Začátek rerunu; rerun přerušený st.rerun() se tím uzavře"""
+        if getattr(self._local, "rerun", None) is not None:
+            self.end_rerun(status="interrupted")
+        if not self.enabled:
+            return
+        rerun = {"started": datetime.now(), "start": time.perf_counter(), "total_ms": 0.0, "spans": {}, "status": "running"}
+        with self._lock:
+            self._reruns.append(rerun)
+        self._local.rerun = rerun
+        self._local.section = None
+
+    def section(self, name):
+        """Uzavře předchozí sekci skriptu a otevře další (bez odsazování bloků do `with`)"""
+        if getattr(self._local, "rerun", None) is None:
+            return
+        self._close_section()
+        self._local.section = (name, time.perf_counter())
+
+    def _close_section(self):
+        section = getattr(self._local, "section", None)
+        if section is not None:
+            name, start = section
+            self._local.section = None
+            self._record(name, (time.perf_counter() - start) * 1000)
+
+    def end_rerun(self, status="done"):
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is None:
+            return
+        self._close_section()
+        with self._lock:
+            rerun["total_ms"] = (time.perf_counter() - rerun["start"]) * 1000
+            rerun["status"] = status
+        self._local.rerun = None
+
+    # ----- Čtení -----
+    def summary(self):
+        """Statistika po spanech: počet, p50, p95, max (ms), seřazeno od nejhoršího p95"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items() if values}
+        rows = [
+            {
+                "span": name,
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50), 2),
+                "p95_ms": round(_percentile(ordered, 95), 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+            for name, ordered in samples.items()
+        ]
+        return sorted(rows, key=lambda row: -row["p95_ms"])
+
+    def slowest_reruns(self, limit=5):
+        with self._lock:
+            reruns = [dict(r, spans=dict(r["spans"])) for r in self._reruns]
+        return sorted(reruns, key=lambda r: -r["total_ms"])[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._reruns.clear()
+
+
+# Sdílený pro celý proces; TESTCASE_TIMING=0 měření vypne
+tracer = Tracer(enabled=os.environ.get("TESTCASE_TIMING", "1") != "0")
@@ -1,35 +1,38 @@
+import argparse
 import json
-import re
+import os
 import subprocess
+import sys
 from pathlib import Path
-import pandas as pd
-import time
-import unicodedata
 import copy
 
 # --- Cesty ---
 BASE_DIR = Path(__file__).resolve().parent
-EXPORTS_DIR = BASE_DIR / "exports"
-KROKY_PATH = BASE_DIR / "kroky.json"
-PROJEKTY_PATH = BASE_DIR / "projekty.json"
+DATA_DIR = Path(os.environ.get("TESTCASE_DATA_DIR", BASE_DIR))
+EXPORTS_DIR = DATA_DIR / "exports"
+KROKY_PATH = DATA_DIR / "kroky.json"
+PROJEKTY_PATH = DATA_DIR / "projekty.json"
+
+# Sdílené funkce s GUI (gui_app/core.py)
+sys.path.insert(0, str(BASE_DIR / "gui_app"))
+from core import generate_testcases, get_steps_from_action, get_scenario_steps, parse_veta, reset_next_id  # noqa: E402
+from export import EXPORT_FORMATS, export_rows, iter_hpqc_rows, safe_file_name  # noqa: E402
+from action_index import get_action_index  # noqa: E402
+from health import CHECKS, HealthContext, run_health_checks  # noqa: E402
 
 # --- Globální proměnné ---
 AKTUALNI_PROJEKT = None
 projekty_data = {}
 
 # --- Statické hodnoty ---
-SYSTEM_APPLICATION = "Siebel_CZ"
-TYPE = "Manual"
-TEST_PHASE = "4-User Acceptance"
-TEST_TEST_PHASE = "4-User Acceptance"
 PRIORITY_MAP = {"1": "1-High", "2": "2-Medium", "3": "3-Low"}
 COMPLEXITY_MAP = {"1": "1-Giant", "2": "2-Huge", "3": "3-Big", "4": "4-Medium", "5": "5-Low"}
+DEFAULT_SUBJECT = "UAT2\\Antosova\\"
 
 
 # --- Pomocné funkce ---
 def safe_print(text):
     print(text, flush=True)
-    time.sleep(0.05)
 
 
 def nacti_projekty():
@@ -52,49 +55,8 @@ def nacti_kroky():
         return json.load(f)
 
 
-def normalize_text(text):
-    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
-    return text.replace(" ", "_").replace("__", "_")
-
-
-def extract_kanal(text: str) -> str:
-    t = text.lower()
-    if "shop" in t:
-        return "SHOP"
-    if "il" in t:
-        return "IL"
-    return "UNKNOWN"
-
-
-def extract_segment(text: str) -> str:
-    t = text.lower()
-    if "b2c" in t:
-        return "B2C"
-    if "b2b" in t:
-        return "B2B"
-    return "UNKNOWN"
-
-
-def extract_service(text: str) -> str:
-    t = text.lower()
-    if "hlas" in t or "voice" in t:
-        return "HLAS"
-    if "fwa" in t and "bisi" in t:
-        return "FWA_BISI"
-    if "fwa" in t and re.search(r"\bbi\b", t):
-        return "FWA_BI"
-    for key in ["dsl", "fiber", "cable"]:
-        if key in t:
-            return key.upper()
-    if "fwa" in t:
-        return "FWA"
-    return "UNKNOWN"
-
-
 def build_test_name(poradi: int, veta: str) -> str:
-    kanal = extract_kanal(veta)
-    segment = extract_segment(veta)
-    service = extract_service(veta)
+    segment, kanal, service = parse_veta(veta)
 
     # Neupravujeme text věty – zůstává kompletní a nezměněná
     prefix = f"{poradi:03d}_{kanal}_{segment}_{service}"
@@ -102,39 +64,23 @@ def build_test_name(poradi: int, veta: str) -> str:
 
 
 def detect_action(text: str, kroky_data: dict) -> str | None:
-    t = text.lower()
-    for akce in kroky_data.keys():
-        if akce.lower() in t:
-            return akce
-    return None
+    # Index se staví jednou pro daná data kroků, dotaz pak nezávisí na počtu akcí
+    return get_action_index(kroky_data).best(text)
 
 
-def generuj_testcase(veta, kroky_data, akce, priority, complexity):
-    poradi = projekty_data[AKTUALNI_PROJEKT]["next_id"]
-    projekty_data[AKTUALNI_PROJEKT]["next_id"] += 1
-
-    test_name = build_test_name(poradi, veta)
-    segment = extract_segment(veta)
-    kanal = extract_kanal(veta)
-
-    # DŮLEŽITÉ: Použij deepcopy pro kroky
-    kroky_pro_akci = copy.deepcopy(kroky_data.get(akce, []))
-
-    tc = {
-        "order_no": poradi,
-        "test_name": test_name,
-        "akce": akce,
-        "segment": segment,
-        "kanal": kanal,
-        "priority": priority,
-        "complexity": complexity,
-        "veta": veta,
-        "kroky": kroky_pro_akci,  # Tady používáme hlubokou kopii
-    }
-
-    projekty_data[AKTUALNI_PROJEKT]["scenarios"].append(tc)
+def generuj_testcases(polozky, kroky_data, projekt=None):
+    """Dávka test casů přes core.generate_testcases (uid, pořadí, odkazy na kroky); uloží se jednou"""
+    vytvorene = generate_testcases(
+        projekt or AKTUALNI_PROJEKT, polozky, kroky_data, projekty_data, persist=False,
+        test_name=lambda poradi, tc: build_test_name(poradi, tc["veta"]),
+    )
     uloz_projekty()
-    return tc
+    return vytvorene
+
+
+def generuj_testcase(veta, kroky_data, akce, priority, complexity):
+    polozka = {"veta": veta, "akce": akce, "priority": priority, "complexity": complexity}
+    return generuj_testcases([polozka], kroky_data)[0]
 
 
 def debug_kroky():
@@ -143,7 +89,7 @@ def debug_kroky():
     
     print("\n=== DEBUG KROKY ===")
     for akce in kroky_data.keys():
-        kroky = kroky_data[akce]
+        kroky = get_steps_from_action(akce, kroky_data)
         print(f"Akce: {akce}")
         print(f"  Počet kroků: {len(kroky)}")
         if kroky:
@@ -154,8 +100,8 @@ def debug_kroky():
     # Test deepcopy
     if kroky_data:
         test_akce = list(kroky_data.keys())[0]
-        original = kroky_data[test_akce]
-        kopie = copy.deepcopy(kroky_data[test_akce])
+        original = get_steps_from_action(test_akce, kroky_data)
+        kopie = copy.deepcopy(original)
         
         print(f"Test deepcopy pro '{test_akce}':")
         print(f"  Original ID: {id(original)}")
@@ -180,7 +126,7 @@ def vyber_projekt():
             safe_print(f"🔹 Načten projekt: {AKTUALNI_PROJEKT}")
             return
     else:
-        subject = input("Zadej Subject (Enter = default UAT2\\Antosova\\): ").strip() or "UAT2\\Antosova\\"
+        subject = input("Zadej Subject (Enter = default UAT2\\Antosova\\): ").strip() or DEFAULT_SUBJECT
         projekty_data[volba] = {"next_id": 1, "subject": subject, "scenarios": []}
         uloz_projekty()
         AKTUALNI_PROJEKT = volba
@@ -221,7 +167,7 @@ def uprav_projekt():
     elif vyber == "2":
         novy_subject = input(f"Zadej nový Subject (aktuální: {projekt.get('subject','None')}): ").strip()
         if not novy_subject:
-            novy_subject = "UAT2\\Antosova\\"
+            novy_subject = DEFAULT_SUBJECT
         projekt["subject"] = novy_subject
         safe_print(f"✅ Subject změněn na: {novy_subject}")
 
@@ -305,56 +251,33 @@ def smaz_scenar():
                 # 🧩 Přepočet pořadí po smazání
                 for i, t in enumerate(sc, start=1):
                     t["order_no"] = i
+                reset_next_id(projekty_data[AKTUALNI_PROJEKT])
                 uloz_projekty()
                 safe_print("✅ Scénář smazán a pořadí přepočítáno.")
 
 
 # --- Export s přečíslováním ---
+def hpqc_rows(projekt):
+    """Řádky exportu projektu; pořadí podle skutečného pořadí v seznamu (ne order_no)"""
+    return iter_hpqc_rows(
+        projekt,
+        projekty_data[projekt],
+        get_scenario_steps,
+        test_name=lambda new_order, tc: build_test_name(new_order, tc.get("veta", tc["test_name"]))
+    )
+
+
 def exportuj_excel():
     EXPORTS_DIR.mkdir(exist_ok=True)
     safe_name = AKTUALNI_PROJEKT.replace(" ", "_")
     output_path = EXPORTS_DIR / f"testcases_{safe_name}.xlsx"
-    subject = projekty_data[AKTUALNI_PROJEKT].get("subject", "UAT2\\Antosova\\")
-    rows = []
-
-    # Přepočítáme pořadí podle skutečného pořadí v seznamu (ne order_no)
     scenarios = projekty_data[AKTUALNI_PROJEKT]["scenarios"]
-    for new_order, tc in enumerate(scenarios, start=1):
-
-        veta = tc.get("veta", tc["test_name"])  # Fallback pro starší data
-        new_test_name = build_test_name(new_order, veta)
-        
-        # Debug info
-        safe_print(f"Scénář {new_order}: Akce='{tc['akce']}', Počet kroků={len(tc['kroky'])}")
-        
-        for i, krok in enumerate(tc["kroky"], start=1):
-            desc = krok.get("description", "")
-            expected = krok.get("expected", "TODO: doplnit očekávání")
-            rows.append({
-                "_order_no": new_order,
-                "Project": AKTUALNI_PROJEKT,
-                "System/Application": SYSTEM_APPLICATION,
-                "Subject": subject,
-                "Description": f"Segment: {tc['segment']}\nKanal: {tc['kanal']}\nAkce: {tc['akce']}",
-                "Type": TYPE,
-                "Test Phase": TEST_PHASE,
-                "Test: Test Phase": TEST_TEST_PHASE,
-                "Test Priority": tc["priority"],
-                "Test Complexity": tc["complexity"],
-                "Test Name": new_test_name,
-                "Step Name (Design Steps)": str(i),
-                "Description (Design Steps)": desc,
-                "Expected (Design Steps)": expected
-            })
-
-    if not rows:
+    if not scenarios:
         safe_print("⚠️ Žádné scénáře k exportu.")
         return
 
-    df = pd.DataFrame(rows)
-    df = df.sort_values(by="_order_no").drop(columns=["_order_no"])
-    df.to_excel(output_path, index=False)
-    safe_print(f"✅ Exportováno do: {output_path}")
+    export_rows(hpqc_rows(AKTUALNI_PROJEKT), "xlsx", output_path)
+    safe_print(f"✅ Exportováno do: {output_path} ({len(scenarios)} scénářů)")
 
     # 🔹 Automatický commit & push na GitHub s rebase ochranou
     try:
@@ -427,12 +350,210 @@ def menu():
             safe_print("⚠️ Neplatná volba.")
 
 
-if __name__ == "__main__":
+
+
+# --- Dávkový režim (CLI) ---
+def _normalizuj(hodnota, mapa, default):
+    """"1" i "1-High" → "1-High"; prázdná hodnota → default, neznámá → None"""
+    if hodnota in (None, ""):
+        return default
+    hodnota = str(hodnota).strip()
+    if hodnota in mapa:
+        return mapa[hodnota]
+    return hodnota if hodnota in mapa.values() else None
+
+
+def nacti_polozky(text):
+    """Položky ze vstupu - JSON pole nebo NDJSON (objekt na řádek); vrací [(řádek, položka)]"""
+    if text.lstrip().startswith("["):
+        data = json.loads(text)
+        return [(idx, polozka) for idx, polozka in enumerate(data, start=1)]
+    return [(idx, json.loads(radek)) for idx, radek in enumerate(text.splitlines(), start=1) if radek.strip()]
+
+
+def priprav_polozky(zaznamy, kroky_data):
+    """Ověří a doplní položky (akce, priorita, komplexita); vrací (položky, chyby)"""
+    polozky, chyby = [], []
+    for radek, zaznam in zaznamy:
+        if not isinstance(zaznam, dict):
+            chyby.append({"line": radek, "error": "položka musí být objekt"})
+            continue
+        veta = zaznam.get("veta")
+        if not isinstance(veta, str) or not veta.strip():
+            chyby.append({"line": radek, "error": "chybí 'veta'"})
+            continue
+
+        akce = zaznam.get("akce") or detect_action(veta, kroky_data)
+        if not akce:
+            chyby.append({"line": radek, "error": f"akci nelze z věty určit: {veta}"})
+            continue
+        if akce not in kroky_data:
+            chyby.append({"line": radek, "error": f"neznámá akce: {akce}"})
+            continue
+
+        priority = _normalizuj(zaznam.get("priority"), PRIORITY_MAP, "2-Medium")
+        complexity = _normalizuj(zaznam.get("complexity"), COMPLEXITY_MAP, "4-Medium")
+        if priority is None or complexity is None:
+            chyby.append({"line": radek, "error": "neznámá priorita nebo komplexita"})
+            continue
+
+        polozky.append({
+            **{k: zaznam[k] for k in ("segment", "kanal", "technologie") if zaznam.get(k)},
+            "veta": veta,
+            "akce": akce,
+            "priority": priority,
+            "complexity": complexity,
+        })
+    return polozky, chyby
+
+
+def _vypis(data, ndjson=False):
+    """JSON dokument, nebo NDJSON - seznam po záznamech, objekt jako jeden řádek"""
+    if not ndjson:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    zaznamy = data if isinstance(data, list) else [data]
+    sys.stdout.write("".join(json.dumps(z, ensure_ascii=False) + "\n" for z in zaznamy))
+
+
+def _chyba(zprava, args):
+    _vypis({"error": zprava}, args.ndjson)
+    return 1
+
+
+def cmd_list(args):
+    if args.project:
+        if args.project not in projekty_data:
+            return _chyba(f"projekt neexistuje: {args.project}", args)
+        _vypis([
+            {k: tc.get(k) for k in ("order_no", "test_name", "akce", "priority", "complexity", "veta")}
+            for tc in projekty_data[args.project]["scenarios"]
+        ], args.ndjson)
+        return 0
+    _vypis([
+        {"name": nazev, "subject": p.get("subject"), "scenarios": len(p["scenarios"]), "next_id": p.get("next_id")}
+        for nazev, p in projekty_data.items()
+    ], args.ndjson)
+    return 0
+
+
+def cmd_add(args):
+    try:
+        if args.input == "-":
+            text = sys.stdin.read()
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                text = f.read()
+        zaznamy = nacti_polozky(text)
+    except (OSError, ValueError) as e:
+        return _chyba(f"vstup nejde načíst: {e}", args)
+
+    kroky_data = nacti_kroky()
+    polozky, chyby = priprav_polozky(zaznamy, kroky_data)
+    # Všechno, nebo nic - při chybě se projekt nemění
+    if chyby:
+        _vypis(chyby, args.ndjson)
+        return 1
+
+    if args.project not in projekty_data:
+        projekty_data[args.project] = {"next_id": 1, "subject": args.subject or DEFAULT_SUBJECT, "scenarios": []}
+    vytvorene = generuj_testcases(polozky, kroky_data, args.project) if polozky else []
+    _vypis(vytvorene, args.ndjson)
+    return 0
+
+
+def cmd_renumber(args):
+    if args.project not in projekty_data:
+        return _chyba(f"projekt neexistuje: {args.project}", args)
+    projekt = projekty_data[args.project]
+    for i, tc in enumerate(projekt["scenarios"], start=1):
+        tc["order_no"] = i
+        if args.names:
+            tc["test_name"] = build_test_name(i, tc.get("veta", tc["test_name"]))
+    reset_next_id(projekt)
+    uloz_projekty()
+    _vypis({"project": args.project, "scenarios": len(projekt["scenarios"]), "next_id": projekt["next_id"]}, args.ndjson)
+    return 0
+
+
+def cmd_export(args):
+    if args.project not in projekty_data:
+        return _chyba(f"projekt neexistuje: {args.project}", args)
+    if args.path:
+        cesta = Path(args.path)
+    else:
+        EXPORTS_DIR.mkdir(exist_ok=True)
+        cesta = EXPORTS_DIR / safe_file_name(args.project, args.format)
+    try:
+        export_rows(hpqc_rows(args.project), args.format, cesta)
+    except ImportError as e:  # parquet bez pyarrow
+        return _chyba(str(e), args)
+    _vypis({
+        "project": args.project,
+        "format": args.format,
+        "path": str(cesta),
+        "scenarios": len(projekty_data[args.project]["scenarios"]),
+    }, args.ndjson)
+    return 0
+
+
+def cmd_validate(args):
+    # Stejné kontroly jako záložka Diagnostika, jen nad projekty.json z main.py
+    ctx = HealthContext(repo_dir=BASE_DIR, data_dir=DATA_DIR, projects_path=PROJEKTY_PATH, kroky_path=KROKY_PATH)
+    report = run_health_checks(args.checks, ctx=ctx)
+    _vypis(report["checks"] if args.ndjson else report, args.ndjson)
+    return 1 if report["status"] == "error" else 0
+
+
+def interaktivni():
     safe_print("✅ Program spuštěn, připraven k práci...")
-    projekty_data = nacti_projekty()
-    
-    # Spust debug
-    debug_kroky()
-    
     vyber_projekt()
-    menu()
\ No newline at end of file
+    menu()
+    return 0
+
+
+def main(argv=None):
+    global projekty_data
+    parser = argparse.ArgumentParser(
+        prog="python main.py",
+        description="Generátor test casů - bez příkazu interaktivní menu, s příkazem dávkový režim (JSON výstup)",
+    )
+    vystup = argparse.ArgumentParser(add_help=False)
+    vystup.add_argument("--ndjson", action="store_true", help="výstup jako NDJSON (záznam na řádek)")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("list", parents=[vystup], help="projekty, s --project scénáře projektu")
+    p.add_argument("--project")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("add", parents=[vystup], help="přidat scénáře z JSON pole nebo NDJSON (všechno, nebo nic)")
+    p.add_argument("--project", required=True)
+    p.add_argument("--input", default="-", help="soubor, nebo '-' pro stdin")
+    p.add_argument("--subject", help="Subject nového projektu")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("renumber", parents=[vystup], help="přečíslovat scénáře podle pořadí v seznamu")
+    p.add_argument("--project", required=True)
+    p.add_argument("--names", action="store_true", help="přegenerovat i názvy testů")
+    p.set_defaults(func=cmd_renumber)
+
+    p = sub.add_parser("export", parents=[vystup], help="export projektu (bez git commitu)")
+    p.add_argument("--project", required=True)
+    p.add_argument("--format", choices=list(EXPORT_FORMATS), default="xlsx")
+    p.add_argument("--path", help=f"cílový soubor (výchozí {EXPORTS_DIR.name}/testcases_<projekt>.<přípona>)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("validate", parents=[vystup], help="kontroly dat; návratový kód 1 při chybě")
+    p.add_argument("--checks", nargs="*", choices=list(CHECKS), help="jen vybrané kontroly")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("interactive", help="interaktivní menu (výchozí)")
+    p.set_defaults(func=lambda args: interaktivni())
+
+    args = parser.parse_args(argv)
+    projekty_data = nacti_projekty()
+    return getattr(args, "func", lambda args: interaktivni())(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# core a main.py čtou TESTCASE_DATA_DIR při importu - testy nesmí sahat na skutečná data v repozitáři
+os.environ["TESTCASE_DATA_DIR"] = tempfile.mkdtemp(prefix="testcases-tests-")
+for path in (REPO_DIR, REPO_DIR / "gui_app"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
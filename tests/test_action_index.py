@@ -0,0 +1,38 @@
+from action_index import ActionIndex
+
+KROKY = {
+    name: {"description": "", "steps": [{"description": "krok", "expected": "OK"}]}
+    for name in [
+        "Dokup VAS - FIX", "Aktivace - HLAS", "Terminace - HLAS", "Terminace - FIX",
+        "Aktivace - FIX", "Portin - FIX", "Zmena tarifu - FIX", "Vymena HW - FIX",
+    ]
+}
+
+
+def test_service_type_alone_is_not_a_match():
+    index = ActionIndex(KROKY)
+
+    ranked = index.rank("Zřízení FIBER B2C SHOP")
+
+    assert ranked and all(akce.endswith("- FIX") for akce, _ in ranked[:3])
+    assert index.best("Zřízení FIBER B2C SHOP") is None
+
+
+def test_word_match_is_returned():
+    index = ActionIndex(KROKY)
+
+    assert index.best("Aktivace FIBER B2C SHOP") == "Aktivace - FIX"
+    assert index.best("Terminace HLAS B2B IL") == "Terminace - HLAS"
+    assert index.best("Přenos čísla DSL B2C") == "Portin - FIX"
+    assert index.best("Změna tarifu CABLE") == "Zmena tarifu - FIX"
+
+
+def test_clear_margin_is_enough_without_word_match():
+    # Jediná HLAS akce vede nad FIX akcemi jasně i bez shody ve slovech
+    index = ActionIndex({k: v for k, v in KROKY.items() if k != "Terminace - HLAS"})
+
+    assert index.best("Zřízení HLAS B2C") == "Aktivace - HLAS"
+
+
+def test_unrelated_sentence_has_no_match():
+    assert ActionIndex(KROKY).best("něco úplně jiného") is None
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from bulk_import import PREVIEW_COLUMNS, build_preview, sentences_from_file, sentences_from_text, validate_preview
+
+
+def akce(*steps):
+    return {"description": "", "steps": [{"description": s, "expected": "OK"} for s in steps]}
+
+
+KROKY = {
+    "Aktivace - FIX": akce("Otevři SR", "Založ objednávku", "Zkontroluj COM"),
+    "Terminace - FIX": akce("Ukonči smlouvu"),
+    "Portin - FIX": akce("Přenes číslo", "Zkontroluj SR"),
+    "Terminace - HLAS": akce("Ukonči hlas"),
+}
+
+
+def test_sentences_from_text_skips_bullets_and_blank_lines():
+    df = sentences_from_text("- Aktivace FIBER B2C SHOP\n\n* Terminace HLAS B2B IL\n   \n• Portin DSL")
+    assert df["veta"].tolist() == ["Aktivace FIBER B2C SHOP", "Terminace HLAS B2B IL", "Portin DSL"]
+
+
+def test_sentences_from_csv_with_semicolon_and_optional_columns():
+    data = "Věta;Akce;Priorita\nAktivace FIBER B2C SHOP;;1\nUkončení DSL;Terminace - FIX;3-Low\n;;\n".encode("utf-8-sig")
+
+    df = sentences_from_file("import.csv", data)
+
+    assert df["veta"].tolist() == ["Aktivace FIBER B2C SHOP", "Ukončení DSL"]
+    assert df["priority"].tolist() == ["1", "3-Low"]
+
+
+def test_preview_classifies_and_fills_defaults():
+    sentences = pd.DataFrame({
+        "veta": ["Aktivace FIBER B2C SHOP", "Terminace HLAS B2B IL", "Ukončení DSL"],
+        "akce": [None, None, "Terminace - FIX"],
+        "priority": ["1", None, "nesmysl"],
+    })
+
+    preview = build_preview(sentences, KROKY)
+
+    assert list(preview.columns) == PREVIEW_COLUMNS
+    assert preview["akce"].tolist() == ["Aktivace - FIX", "Terminace - HLAS", "Terminace - FIX"]
+    assert preview[["segment", "kanal", "technologie"]].values.tolist()[:2] == [
+        ["B2C", "SHOP", "FIBER"], ["B2B", "IL", "HLAS"]]
+    assert preview["kroky"].tolist() == [3, 1, 1]
+    assert preview["priority"].tolist() == ["1-High", "2-Medium", "2-Medium"]
+    assert validate_preview(preview, KROKY) == []
+
+
+def test_ambiguous_sentence_is_left_for_the_user():
+    # Jen typ služby (FIBER -> fix) nestačí - akci musí vybrat uživatel
+    preview = build_preview(pd.DataFrame({"veta": ["Zřízení FIBER B2C SHOP"]}), KROKY)
+
+    assert preview["akce"].tolist() == [None]
+    assert preview["kroky"].tolist() == [0]
+    assert validate_preview(preview, KROKY) == [(1, "Vyber akci (kroky.json).")]
+
+
+def test_empty_input_gives_empty_preview():
+    preview = build_preview(pd.DataFrame({"veta": []}), KROKY)
+    assert preview.empty and list(preview.columns) == PREVIEW_COLUMNS
@@ -0,0 +1,83 @@
+import json
+import re
+
+import pytest
+
+from conftest import REPO_DIR
+from core import KANAL_MAP, SEGMENT_MAP, TECHNOLOGIE_MAP, _key_pattern, fold_text, parse_veta, parse_vety
+
+
+@pytest.mark.parametrize("veta, expected", [
+    ("Aktivace B2C SHOP DSL", ("B2C", "SHOP", "DSL")),
+    ("aktivace b2b přes IL", ("B2B", "IL", "X")),
+    ("Jdi na detail služby a pošli email", ("NA", "NA", "X")),      # il uvnitř slov
+    ("Souhlas s podmínkami", ("NA", "NA", "X")),                      # hlas uvnitř slova
+    ("Automobil na parkovišti", ("NA", "NA", "X")),                   # mobil uvnitř slova
+    ("Vytvoř mobilní tarif přes shopu", ("NA", "SHOP", "HLAS")),      # česká koncovka u delších slov
+    ("Změna tarifu na optiku", ("NA", "NA", "HLAS")),               # koncovka jen za celým klíčem
+    ("B2Cx a ILS", ("NA", "NA", "X")),                                # krátké zkratky jen celé
+])
+def test_whole_token_matching(veta, expected):
+    assert parse_veta(veta) == expected
+
+
+@pytest.mark.parametrize("veta, technologie", [
+    ("Aktivace FWA BISI B2C", "FWA_BISI"),
+    ("Aktivace FWA BI B2C", "FWA_BI"),
+    ("Aktivace FWA-BI B2C", "FWA_BI"),
+    ("Aktivace fwa_bisi", "FWA_BISI"),
+    ("Aktivace FWA B2C", "FWA"),
+    ("fwa bi a potom fwa bisi", "FWA_BISI"),   # delší klíč vyhrává bez ohledu na pořadí
+    ("Aktivace FWA outdoor", "FWA_BISI"),
+    ("Next tarif a VDSL", "HLAS"),
+])
+def test_longest_key_wins(veta, technologie):
+    assert parse_veta(veta)[2] == technologie
+
+
+def test_batch_matches_single():
+    vety = ["Aktivace B2C SHOP DSL", "Terminace HLAS B2B IL", ""]
+    assert parse_vety(vety) == [parse_veta(v) for v in vety]
+
+
+# ---------- Shoda se starým klasifikátorem ----------
+def substring_keys(veta):
+    """Původní klasifikace podřetězcem (bez klíče 'fwa') - vrací použité klíče"""
+    low = veta.lower()
+    technologie_keys = sorted((k for k in TECHNOLOGIE_MAP if k != "fwa"), key=len, reverse=True)
+    return {
+        "segment": next((k for k in SEGMENT_MAP if k in low), None),
+        "kanal": next((k for k in KANAL_MAP if k in low), None),
+        "technologie": next((k for k in technologie_keys if k in low), None),
+    }
+
+
+def shipped_sentences():
+    texts = []
+    for akce, obsah in json.loads((REPO_DIR / "kroky.json").read_text(encoding="utf-8")).items():
+        texts.append(akce)
+        if isinstance(obsah, dict):
+            texts.append(obsah.get("description", ""))
+            texts.extend(krok.get("description", "") for krok in obsah.get("steps", []))
+    for name in ("projects.json", "projekty.json"):
+        for project in json.loads((REPO_DIR / name).read_text(encoding="utf-8")).values():
+            texts.extend(tc.get("veta", "") for tc in project.get("scenarios", []))
+    return texts
+
+
+def test_shipped_data_matches_substring_classifier_except_inside_words():
+    maps = {"segment": SEGMENT_MAP, "kanal": KANAL_MAP, "technologie": TECHNOLOGIE_MAP}
+    defaults = {"segment": "NA", "kanal": "NA", "technologie": "X"}
+    texts = shipped_sentences()
+    assert texts
+
+    for veta in texts:
+        folded = fold_text(veta)
+        new = dict(zip(maps, parse_veta(veta)))
+        for dim, key in substring_keys(veta).items():
+            old = maps[dim][key] if key else defaults[dim]
+            if old == new[dim]:
+                continue
+            # Rozdíl smí vzniknout jen tím, že starý klíč byl uvnitř jiného slova, nebo novým klíčem 'fwa'
+            inside_word = key is not None and not re.search(_key_pattern(key), folded)
+            assert inside_word or new[dim] == "FWA", (veta, dim, old, new[dim])
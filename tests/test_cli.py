@@ -0,0 +1,88 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_DIR
+
+KROKY = {
+    "Aktivace - HLAS": {
+        "description": "Aktivace hlasové služby",
+        "steps": [{"description": "Založ objednávku", "expected": "Objednávka založena"}],
+    },
+    "Terminace - FIX": {
+        "description": "Ukončení fixní služby",
+        "steps": [{"description": "Ukonči smlouvu", "expected": "Smlouva ukončena"}],
+    },
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "kroky.json").write_text(json.dumps(KROKY, ensure_ascii=False), encoding="utf-8")
+    return tmp_path
+
+
+def run_cli(data_dir, *args, stdin=None):
+    env = dict(os.environ, TESTCASE_DATA_DIR=str(data_dir))
+    return subprocess.run(
+        [sys.executable, str(REPO_DIR / "main.py"), *args],
+        input=stdin, capture_output=True, text=True, env=env, cwd=data_dir, timeout=60,
+    )
+
+
+def projekty(data_dir):
+    return json.loads((data_dir / "projekty.json").read_text(encoding="utf-8"))
+
+
+def test_add_roundtrip_ndjson(data_dir):
+    items = [
+        {"veta": "Aktivace hlasu pro B2C přes SHOP", "akce": "Aktivace - HLAS", "priority": "1"},
+        {"veta": "Ukončení smlouvy FIX", "akce": "Terminace - FIX", "complexity": "5-Low"},
+    ]
+    result = run_cli(data_dir, "add", "--project", "CI", "--ndjson",
+                     stdin="".join(json.dumps(i, ensure_ascii=False) + "\n" for i in items))
+    assert result.returncode == 0, result.stderr
+
+    created = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [tc["order_no"] for tc in created] == [1, 2]
+    assert created[0]["priority"] == "1-High" and created[1]["complexity"] == "5-Low"
+    assert all(tc["uid"] and tc["kroky_ref"] for tc in created)
+
+    saved = projekty(data_dir)["CI"]
+    assert saved["next_id"] == 3
+    assert [tc["uid"] for tc in saved["scenarios"]] == [tc["uid"] for tc in created]
+
+    listed = run_cli(data_dir, "list", "--project", "CI")
+    assert [tc["test_name"] for tc in json.loads(listed.stdout)] == [tc["test_name"] for tc in created]
+    assert created[0]["test_name"].startswith("001_")
+
+
+def test_add_is_all_or_nothing(data_dir):
+    run_cli(data_dir, "add", "--project", "CI", stdin=json.dumps([{"veta": "a", "akce": "Aktivace - HLAS"}]))
+    before = projekty(data_dir)
+
+    batch = [{"veta": "b", "akce": "Aktivace - HLAS"}, {"veta": "c", "akce": "neexistuje"}, {"akce": "Aktivace - HLAS"}]
+    result = run_cli(data_dir, "add", "--project", "CI", stdin=json.dumps(batch))
+
+    assert result.returncode == 1
+    assert [e["line"] for e in json.loads(result.stdout)] == [2, 3]
+    assert projekty(data_dir) == before
+
+
+def test_export_and_validate(data_dir):
+    run_cli(data_dir, "add", "--project", "CI", stdin=json.dumps([{"veta": "a", "akce": "Aktivace - HLAS"}]))
+
+    result = run_cli(data_dir, "export", "--project", "CI", "--format", "csv", "--path", "out.csv")
+    assert result.returncode == 0, result.stderr
+    with open(data_dir / "out.csv", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f, delimiter=";"))
+    assert len(rows) == 2  # hlavička + 1 krok
+    assert rows[1][-2:] == ["Založ objednávku", "Objednávka založena"]
+
+    result = run_cli(data_dir, "validate", "--checks", "json", "scenarios", "orphaned_actions")
+    assert result.returncode == 0, result.stdout
+    assert json.loads(result.stdout)["status"] == "ok"
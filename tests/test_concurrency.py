@@ -0,0 +1,204 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from concurrency import FileLock, ensure_scenario_ids, merge_projects
+
+
+# ---------- FileLock ----------
+def age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_lock_is_exclusive(tmp_path):
+    path = tmp_path / "x.lock"
+    with FileLock(path):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+    assert not path.exists()
+
+
+def test_held_lock_is_refreshed_and_not_stolen(tmp_path):
+    path = tmp_path / "x.lock"
+    with FileLock(path, stale_after=0.3):
+        time.sleep(1.0)  # dlouhé uložení
+        assert time.time() - path.stat().st_mtime < 0.3
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.2, stale_after=0.3).acquire()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="kontrola PID jen na POSIX")
+def test_stale_lock_of_running_process_is_kept(tmp_path):
+    path = tmp_path / "x.lock"
+    running = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        path.write_text(str(running.pid), encoding="ascii")
+        age(path, 120)
+
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+    finally:
+        running.kill()
+        running.wait()
+
+
+def test_leftover_lock_with_own_pid_is_removed(tmp_path):
+    # Předchozí běh kontejneru měl stejný PID (typicky 1) a zámek nestihl smazat
+    path = tmp_path / "x.lock"
+    path.write_text(str(os.getpid()), encoding="ascii")
+    age(path, 120)
+
+    with FileLock(path, timeout=1):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+    assert not path.exists()
+
+
+def test_stale_lock_of_dead_process_is_removed(tmp_path):
+    path = tmp_path / "x.lock"
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    path.write_text(str(dead.pid), encoding="ascii")
+    age(path, 120)
+
+    with FileLock(path, timeout=1):
+        assert path.read_text(encoding="ascii") == str(os.getpid())
+
+
+def test_lock_serializes_threads(tmp_path):
+    path = tmp_path / "x.lock"
+    counter = {"value": 0}
+
+    def work():
+        for _ in range(20):
+            with FileLock(path, poll=0.001):
+                value = counter["value"]
+                time.sleep(0.0005)
+                counter["value"] = value + 1
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter["value"] == 80
+
+
+# ---------- uid scénářů ----------
+def legacy(n, veta="stejná věta"):
+    return {"order_no": n, "test_name": f"{n:03d}_x", "veta": veta, "akce": "A"}
+
+
+def test_identical_legacy_scenarios_get_distinct_stable_uids():
+    def load():
+        return {"P": {"scenarios": [legacy(1), legacy(1), legacy(1), legacy(2)]}}
+
+    first, second = ensure_scenario_ids(load()), ensure_scenario_ids(load())
+    uids = [tc["uid"] for tc in first["P"]["scenarios"]]
+
+    assert len(set(uids)) == 4
+    assert uids == [tc["uid"] for tc in second["P"]["scenarios"]]
+
+
+def test_duplicated_explicit_uid_is_made_unique():
+    data = {"P": {"scenarios": [{**legacy(1), "uid": "abc"}, {**legacy(2), "uid": "abc"}]}}
+    uids = [tc["uid"] for tc in ensure_scenario_ids(data)["P"]["scenarios"]]
+    assert uids[0] == "abc" and uids[1] != "abc"
+
+
+# ---------- 3cestné slučování ----------
+def scenario(uid, n, veta="v"):
+    return {"uid": uid, "order_no": n, "test_name": f"{n:03d}_{veta}", "veta": veta, "akce": "A"}
+
+
+def project(*scenarios, version=1, subject="S"):
+    return {"subject": subject, "version": version, "next_id": len(scenarios) + 1, "scenarios": list(scenarios)}
+
+
+def test_untouched_project_is_saved_without_merge():
+    base = {"P": project(scenario("a", 1))}
+    mine = {"P": project(scenario("a", 1, "změna"))}
+
+    merged, conflicts = merge_projects(base, mine, base)
+
+    assert conflicts == []
+    assert merged["P"]["scenarios"][0]["veta"] == "změna"
+    assert merged["P"]["version"] == 2
+
+
+def test_concurrent_additions_are_both_kept_and_renumbered():
+    base = {"P": project(scenario("a", 1))}
+    mine = {"P": project(scenario("a", 1), scenario("m", 2, "moje"))}
+    theirs = {"P": project(scenario("a", 1), scenario("t", 2, "cizi"), version=2)}
+
+    merged, conflicts = merge_projects(base, mine, theirs)
+
+    assert conflicts == []
+    assert [(tc["uid"], tc["order_no"], tc["test_name"]) for tc in merged["P"]["scenarios"]] == [
+        ("a", 1, "001_v"), ("t", 2, "002_cizi"), ("m", 3, "003_moje"),
+    ]
+    assert merged["P"]["next_id"] == 4
+    assert merged["P"]["version"] == 3
+
+
+def test_edits_of_different_scenarios_and_fields_merge():
+    base = {"P": project(scenario("a", 1), scenario("b", 2))}
+    mine = {"P": project(scenario("a", 1, "moje"), scenario("b", 2))}
+    theirs = {"P": project(scenario("a", 1), scenario("b", 2, "cizi"), version=2, subject="Nový")}
+
+    merged, conflicts = merge_projects(base, mine, theirs)
+
+    assert conflicts == []
+    assert [tc["veta"] for tc in merged["P"]["scenarios"]] == ["moje", "cizi"]
+    assert merged["P"]["subject"] == "Nový"
+
+
+def test_same_scenario_edited_on_both_sides_keeps_theirs():
+    base = {"P": project(scenario("a", 1))}
+    mine = {"P": project(scenario("a", 1, "moje"))}
+    theirs = {"P": project(scenario("a", 1, "cizi"), version=2)}
+
+    merged, conflicts = merge_projects(base, mine, theirs)
+
+    assert len(conflicts) == 1
+    assert merged["P"]["scenarios"][0]["veta"] == "cizi"
+
+
+def test_deleted_scenario_stays_deleted_unless_edited():
+    base = {"P": project(scenario("a", 1), scenario("b", 2))}
+    mine = {"P": project(scenario("a", 1), scenario("b", 2, "moje"))}
+    theirs = {"P": project(scenario("b", 2), version=2)}
+
+    merged, conflicts = merge_projects(base, mine, theirs)
+
+    assert [tc["uid"] for tc in merged["P"]["scenarios"]] == ["b"]
+    assert merged["P"]["scenarios"][0]["veta"] == "moje"
+
+
+def test_project_deleted_elsewhere_is_not_resurrected():
+    base = {"P": project(scenario("a", 1))}
+    mine = {"P": project(scenario("a", 1, "moje"))}
+
+    merged, conflicts = merge_projects(base, mine, {})
+
+    assert merged == {}
+    assert len(conflicts) == 1
+
+
+def test_identical_legacy_copies_survive_merge():
+    def load():
+        return ensure_scenario_ids({"P": {"subject": "S", "next_id": 3, "scenarios": [legacy(1), legacy(1)]}})
+
+    base, mine, theirs = load(), load(), load()
+    mine["P"]["scenarios"][0]["veta"] = "moje"
+    theirs["P"]["version"] = 1
+    theirs["P"]["subject"] = "Nový"
+
+    merged, _ = merge_projects(base, mine, theirs)
+
+    assert [tc["veta"] for tc in merged["P"]["scenarios"]] == ["moje", "stejná věta"]
@@ -0,0 +1,89 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import core
+import coverage
+from conftest import REPO_DIR
+
+
+def scenario(n, akce="A"):
+    return {"uid": f"u{n}", "order_no": n, "test_name": f"{n:03d}_SHOP_B2C_DSL_x", "veta": "x", "akce": akce,
+            "segment": "B2C", "kanal": "SHOP", "technologie": "DSL", "priority": "1-High", "complexity": "5-Low"}
+
+
+@pytest.fixture
+def projects():
+    data = {f"P{i}": {"next_id": 3, "subject": "S", "scenarios": [scenario(1), scenario(2)]} for i in range(10)}
+    core.save_json(core.PROJECTS_PATH, data)
+    core.COVERAGE_PATH.unlink(missing_ok=True)
+    core._coverage_index = None
+    yield data
+    core._coverage_index = None
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    calls = []
+    signature = coverage._signature
+    monkeypatch.setattr(coverage, "_signature", lambda project: calls.append(project) or signature(project))
+    return calls
+
+
+def test_save_recomputes_only_changed_projects(projects, hashed):
+    assert core.get_coverage()["scenarios"] == 20
+    hashed.clear()
+
+    base = core.load_json_cached(core.PROJECTS_PATH)
+    mine = core.thaw(base)
+    mine["P2"]["scenarios"].append(scenario(3, akce="B"))
+    del mine["P5"]
+    core.save_projects(base, mine)
+
+    assert len(hashed) == 1
+    totals = core.get_coverage()
+    assert totals["scenarios"] == 19
+    assert totals["cells"] == {"B2C|SHOP|DSL|A": 18, "B2C|SHOP|DSL|B": 1}
+    assert core.get_coverage("P2")["scenarios"] == 3
+    assert len(hashed) == 1
+
+
+def test_version_survives_restart(projects, hashed):
+    core.get_coverage()
+    core._coverage_index = None
+    hashed.clear()
+
+    assert core.get_coverage()["scenarios"] == 20
+    assert hashed == []
+
+
+def test_incremental_matches_full_rebuild(projects):
+    base = core.load_json_cached(core.PROJECTS_PATH)
+    core.get_coverage()
+    mine = core.thaw(base)
+    mine["P0"]["scenarios"][0]["akce"] = "C"
+    mine["P9"] = {"next_id": 2, "subject": "S", "scenarios": [scenario(1, akce="D")]}
+    merged, _ = core.save_projects(base, mine)
+
+    full = coverage.CoverageIndex(core.DATA_DIR / "full.json", technologie=core.scenario_technologie)
+    full.sync(merged)
+    assert core.get_coverage() == full.totals()
+
+
+def test_cli_uses_data_dir_and_save_projects(tmp_path):
+    (tmp_path / "projects.json").write_text(json.dumps(
+        {"P": {"next_id": 2, "subject": "S", "scenarios": [{**scenario(1), "technologie": ""}]}}
+    ), encoding="utf-8")
+    env = {"TESTCASE_DATA_DIR": str(tmp_path), "PATH": ""}
+
+    for command in ("backfill", "rebuild"):
+        result = subprocess.run([sys.executable, str(REPO_DIR / "gui_app" / "coverage.py"), command],
+                                capture_output=True, text=True, env=env, cwd=tmp_path, timeout=60)
+        assert result.returncode == 0, result.stderr
+
+    saved = json.loads((tmp_path / "projects.json").read_text(encoding="utf-8"))["P"]
+    assert saved["scenarios"][0]["technologie"] == "DSL"
+    assert saved["version"] == 1  # uloženo přes save_projects (compare-and-swap)
+    assert json.loads((tmp_path / "coverage.json").read_text(encoding="utf-8"))["totals"]["scenarios"] == 1
@@ -0,0 +1,156 @@
+import copy
+import io
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+import pytest
+
+import core
+from export import HPQC_COLUMNS, export_rows, iter_hpqc_rows
+from export_cache import ExportCache
+from main import build_test_name
+
+
+def project():
+    return {"subject": "UAT2\\Test\\", "scenarios": [
+        {"order_no": 1, "test_name": "001_SHOP_B2C_DSL_Aktivace", "veta": "Aktivace", "segment": "B2C", "kanal": "SHOP",
+         "akce": "Aktivace - FIX", "priority": "1-High", "complexity": "3-Medium",
+         "kroky": [{"description": "Otevři SR", "expected": "Otevřeno"}, {"description": "Bez očekávání"}, "Textový krok"]},
+        {"order_no": 2, "test_name": "002_IL_B2B_HLAS_Terminace", "veta": "Terminace", "segment": "B2B", "kanal": "IL",
+         "akce": "Terminace - HLAS", "priority": "2-Medium", "complexity": "4-Medium", "kroky": []},
+        {"order_no": 5, "test_name": "005_IL_B2B_X_Portin", "veta": "Portin", "segment": "B2B", "kanal": "IL",
+         "akce": "Portin - FIX", "priority": "3-Low", "complexity": "5-Low",
+         "kroky": [{"description": "Přenes číslo", "expected": "OK"}]},
+    ]}
+
+
+# ---------- Původní exporty (před sjednocením) ----------
+def old_export_to_excel_rows(project_name, project_data):
+    rows = []
+    for tc in project_data["scenarios"]:
+        for i, krok in enumerate(tc.get("kroky", []), start=1):
+            desc, exp = "", ""
+            if isinstance(krok, dict):
+                desc = krok.get("description", "")
+                exp = krok.get("expected", "")
+            elif isinstance(krok, str):
+                desc = krok
+            rows.append({
+                "Project": project_name,
+                "Subject": project_data.get("subject", "UAT2\\Antosova\\"),
+                "System/Application": "Siebel_CZ",
+                "Description": f"Segment: {tc['segment']}\nKanál: {tc['kanal']}\nAkce: {tc['akce']}",
+                "Type": "Manual",
+                "Test Phase": "4-User Acceptance",
+                "Test: Test Phase": "4-User Acceptance",
+                "Test Priority": tc["priority"],
+                "Test Complexity": tc["complexity"],
+                "Test Name": tc["test_name"],
+                "Step Name (Design Steps)": str(i),
+                "Description (Design Steps)": desc,
+                "Expected (Design Steps)": exp,
+            })
+    return rows
+
+
+def old_exportuj_excel_rows(project_name, project_data, build_test_name):
+    # Původní main.py: Kanal bez diakritiky a výchozí očekávání "TODO" - obojí sjednoceno s GUI
+    rows = []
+    for new_order, tc in enumerate(project_data["scenarios"], start=1):
+        for i, krok in enumerate(tc["kroky"], start=1):
+            rows.append({
+                "Project": project_name,
+                "Subject": project_data.get("subject", "UAT2\\Antosova\\"),
+                "System/Application": "Siebel_CZ",
+                "Description": f"Segment: {tc['segment']}\nKanál: {tc['kanal']}\nAkce: {tc['akce']}",
+                "Type": "Manual",
+                "Test Phase": "4-User Acceptance",
+                "Test: Test Phase": "4-User Acceptance",
+                "Test Priority": tc["priority"],
+                "Test Complexity": tc["complexity"],
+                "Test Name": build_test_name(new_order, tc.get("veta", tc["test_name"])),
+                "Step Name (Design Steps)": str(i),
+                "Description (Design Steps)": krok.get("description", ""),
+                "Expected (Design Steps)": krok.get("expected", ""),
+            })
+    return rows
+
+
+def test_rows_match_old_gui_export():
+    data = project()
+    rows = [dict(zip(HPQC_COLUMNS, row)) for row in iter_hpqc_rows("P", data, lambda tc: tc.get("kroky", []))]
+    assert rows == old_export_to_excel_rows("P", data)
+
+
+def test_rows_match_old_cli_export():
+    data = project()
+    data["scenarios"][0]["kroky"].pop()  # starý main.py textové kroky neuměl
+    rows = iter_hpqc_rows("P", data, lambda tc: tc["kroky"],
+                          test_name=lambda order, tc: build_test_name(order, tc.get("veta", tc["test_name"])))
+    assert [dict(zip(HPQC_COLUMNS, row)) for row in rows] == old_exportuj_excel_rows("P", data, build_test_name)
+
+
+def test_xlsx_matches_pandas_export():
+    data = project()
+    expected = io.BytesIO()
+    pd.DataFrame(old_export_to_excel_rows("P", data)).to_excel(expected, index=False)
+    expected.seek(0)
+
+    output = core.export_project("P", {"P": data}, "xlsx")
+
+    pd.testing.assert_frame_equal(pd.read_excel(output, dtype=str), pd.read_excel(expected, dtype=str))
+
+
+def test_csv_and_parquet_have_the_same_rows():
+    data = project()
+    rows = list(iter_hpqc_rows("P", data, lambda tc: tc.get("kroky", [])))
+
+    csv_frame = pd.read_csv(export_rows(iter(rows), "csv"), sep=";", dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    assert [tuple(r) for r in csv_frame.itertuples(index=False)] == rows
+
+    pytest.importorskip("pyarrow")
+    parquet_frame = pd.read_parquet(export_rows(iter(rows), "parquet"))
+    assert list(parquet_frame.columns) == HPQC_COLUMNS
+    assert [tuple(r) for r in parquet_frame.itertuples(index=False)] == rows
+
+
+def test_xml_has_one_test_per_scenario_with_steps():
+    data = project()
+    root = ET.parse(export_rows(iter_hpqc_rows("P", data, lambda tc: tc.get("kroky", [])), "hpqc_xml")).getroot()
+
+    tests = root.findall("Test")
+    names = [t.find("Field[@Name='Test Name']").text for t in tests]
+    # Scénář bez kroků (002) nemá řádky, a tedy ani <Test>
+    assert names == ["001_SHOP_B2C_DSL_Aktivace", "005_IL_B2B_X_Portin"]
+    assert [len(t.findall("DesignSteps/DesignStep")) for t in tests] == [3, 1]
+
+
+# ---------- Cache exportů ----------
+def test_cache_hit_and_invalidation_on_scenario_change(tmp_path, monkeypatch):
+    cache = ExportCache(tmp_path / "cache")
+    monkeypatch.setattr(core, "_export_cache", cache)
+    projects = {"P": project()}
+
+    first = core.export_project_cached("P", projects, "csv").getvalue()
+    second = core.export_project_cached("P", projects, "csv").getvalue()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first == second
+
+    changed = copy.deepcopy(projects)
+    changed["P"]["scenarios"][0]["priority"] = "3-Low"
+    third = core.export_project_cached("P", changed, "csv").getvalue()
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert b"3-Low" in third and third != first
+    assert cache.stats()["files"] == 1  # starý export téhož projektu je smazaný
+
+
+def test_cache_keeps_formats_apart_and_evicts_oldest(tmp_path):
+    cache = ExportCache(tmp_path, max_bytes=250)
+    data = project()
+    for fmt in ("csv", "xlsx"):
+        cache.put("P", fmt, ExportCache.key("P", data, fmt), fmt.encode() * 40)
+
+    assert cache.get("P", "xlsx", ExportCache.key("P", data, "xlsx")) == b"xlsx" * 40
+    assert cache.get("P", "csv", ExportCache.key("P", data, "csv")) is None  # vyhozený kvůli limitu
+    assert ExportCache.key("P", data, "csv") != ExportCache.key("Q", data, "csv")
@@ -0,0 +1,70 @@
+import subprocess
+import threading
+import time
+
+from git_status import GitStatusProvider
+from git_sync import GitSyncWorker
+
+
+# ---------- GitSyncWorker ----------
+def test_flush_does_not_return_before_queued_request(tmp_path, monkeypatch):
+    worker = GitSyncWorker(tmp_path, debounce=0)
+    first_started, finish_first, finish_second = threading.Event(), threading.Event(), threading.Event()
+    done = []
+
+    def fake_sync(batch):
+        if not done:
+            first_started.set()
+            finish_first.wait(5)
+        else:
+            finish_second.wait(5)
+        done.extend(item["message"] for item in batch)
+
+    monkeypatch.setattr(worker, "_sync", fake_sync)
+    put = worker._queue.put
+
+    def slow_put(item):
+        # Worker dokončí první dávku přesně mezi clear() a put() druhého požadavku
+        finish_first.set()
+        time.sleep(0.3)
+        put(item)
+
+    try:
+        worker.request_sync([tmp_path / "kroky.json"], "první", immediate=True)
+        assert first_started.wait(5)
+        monkeypatch.setattr(worker._queue, "put", slow_put)
+        worker.request_sync([tmp_path / "kroky.json"], "druhá", immediate=True)
+        assert not worker.flush(timeout=0.2)
+        finish_second.set()
+        assert worker.flush(timeout=5)
+        assert done == ["první", "druhá"]
+        assert worker.state()["pending"] == 0
+    finally:
+        monkeypatch.setattr(worker._queue, "put", put)
+        worker.stop()
+
+
+# ---------- GitStatusProvider ----------
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def test_untracked_data_files_count_as_changes(tmp_path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "step_sets.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "poznamky.txt").write_text("", encoding="utf-8")
+
+    provider = GitStatusProvider(tmp_path, data_paths=[tmp_path / "data" / "step_sets.json"])
+    provider._refresh()
+    assert provider._status["changed"] == 1
+
+    provider = GitStatusProvider(tmp_path)
+    provider._refresh()
+    assert provider._status["changed"] == 0
+
+
+def test_parse_ignores_untracked_outside_data_paths():
+    output = "# branch.head main\n? kroky.json\n? tmp.txt\n1 .M N... 100644 100644 100644 a b projects.json\n"
+    assert GitStatusProvider._parse(output, {"kroky.json"})["changed"] == 2
+    assert GitStatusProvider._parse(output)["changed"] == 1
@@ -0,0 +1,134 @@
+import json
+import subprocess
+from collections import namedtuple
+
+import pytest
+
+import health
+from health import CHECKS, HealthContext, run_health_checks
+
+KROKY = {"Aktivace - FIX": {"description": "", "steps": [{"description": "Otevři SR", "expected": "OK"}]}}
+
+
+def scenario(order_no, **changes):
+    tc = {"uid": f"u{order_no}", "order_no": order_no, "test_name": f"{order_no:03d}_test", "akce": "Aktivace - FIX",
+          "segment": "B2C", "kanal": "SHOP", "priority": "1-High", "complexity": "5-Low", "veta": "Aktivace",
+          "kroky_ref": "sada1"}
+    tc.update(changes)
+    return tc
+
+
+def git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    write(repo, "kroky.json", KROKY)
+    write(repo, "step_sets.json", {"steps": {}, "sets": {"sada1": []}})
+    write(repo, "projects.json", {"P": {"next_id": 3, "subject": "S", "scenarios": [scenario(1), scenario(2)]}})
+    return repo
+
+
+def write(repo, name, data):
+    (repo / name).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def context(repo):
+    return HealthContext(repo_dir=repo, data_dir=repo, projects_path=repo / "projects.json",
+                         kroky_path=repo / "kroky.json", step_sets_path=repo / "step_sets.json")
+
+
+def check(repo, name):
+    return CHECKS[name][1](context(repo))
+
+
+@pytest.mark.parametrize("name", ["json", "scenarios", "actions", "orphaned_actions", "order_numbers"])
+def test_data_checks_pass_on_valid_data(data_dir, name):
+    assert check(data_dir, name)["status"] == "ok"
+
+
+def test_invalid_json_is_an_error(data_dir):
+    (data_dir / "kroky.json").write_text("{nedopsané", encoding="utf-8")
+    result = check(data_dir, "json")
+    assert result["status"] == "error"
+    assert any(d.startswith("kroky.json:") for d in result["details"])
+
+
+def test_dangling_kroky_ref(data_dir):
+    write(data_dir, "projects.json", {"P": {"scenarios": [scenario(1, kroky_ref="chybi")]}})
+    result = check(data_dir, "scenarios")
+    assert result["status"] == "error"
+    assert result["details"] == ["P / 001_test: sada kroků 'chybi' ve step_sets.json neexistuje"]
+
+
+def test_scenario_schema_problems(data_dir):
+    broken = scenario(1, priority="0-Urgent")
+    del broken["kroky_ref"], broken["veta"]
+    write(data_dir, "projects.json", {"P": {"scenarios": [broken]}})
+
+    details = check(data_dir, "scenarios")["details"]
+    assert "P / 001_test: chybí nebo má špatný typ 'veta'" in details
+    assert "P / 001_test: neznámá priorita '0-Urgent'" in details
+    assert "P / 001_test: nemá kroky ani odkaz kroky_ref" in details
+
+
+def test_action_without_steps(data_dir):
+    write(data_dir, "kroky.json", {**KROKY, "Prázdná": {"description": "", "steps": []}})
+    result = check(data_dir, "actions")
+    assert result["status"] == "error" and result["details"] == ["Prázdná: nemá žádné kroky"]
+
+
+def test_orphaned_action(data_dir):
+    write(data_dir, "projects.json", {"P": {"scenarios": [scenario(1, akce="Smazaná"), scenario(2, akce="Smazaná")]}})
+    result = check(data_dir, "orphaned_actions")
+    assert result["status"] == "warning" and result["details"] == ["P: 'Smazaná' (2×)"]
+
+
+def test_duplicate_order_numbers_and_stale_counter(data_dir):
+    write(data_dir, "projects.json", {"P": {"next_id": 2, "scenarios": [scenario(1), scenario(2), scenario(2)]}})
+    result = check(data_dir, "order_numbers")
+    assert result["status"] == "error"
+    assert result["details"] == ["P: duplicitní čísla 2", "P: next_id 2 není za posledním číslem 2"]
+
+
+def test_git_remote(data_dir, tmp_path):
+    assert check(data_dir, "git_remote")["status"] == "warning"  # bez remote
+
+    git(tmp_path, "init", "-q", "--bare", "remote.git")
+    git(data_dir, "remote", "add", "origin", str(tmp_path / "remote.git"))
+    assert check(data_dir, "git_remote")["status"] == "ok"
+
+    git(data_dir, "remote", "set-url", "origin", str(tmp_path / "neexistuje.git"))
+    assert check(data_dir, "git_remote")["status"] == "error"
+
+
+def test_git_worktree_includes_step_sets(data_dir):
+    result = check(data_dir, "git_worktree")
+    assert result["status"] == "warning"
+    assert any("step_sets.json" in line for line in result["details"])
+
+    git(data_dir, "add", ".")
+    git(data_dir, "-c", "user.email=t@example.com", "-c", "user.name=T", "commit", "-q", "-m", "data")
+    assert check(data_dir, "git_worktree")["status"] == "ok"
+
+
+def test_disk_space(data_dir, monkeypatch):
+    usage = namedtuple("usage", "total used free")
+    monkeypatch.setattr(health.shutil, "disk_usage", lambda path: usage(100 * 2**30, 50 * 2**30, 50 * 2**30))
+    assert check(data_dir, "disk_space")["status"] == "ok"
+    monkeypatch.setattr(health.shutil, "disk_usage", lambda path: usage(100 * 2**30, 0, 50 * 2**20))
+    assert check(data_dir, "disk_space")["status"] == "error"
+
+
+def test_report_has_every_check_and_worst_status(data_dir):
+    write(data_dir, "projects.json", {"P": {"scenarios": [scenario(1), scenario(1)]}})
+
+    report = run_health_checks(ctx=context(data_dir))
+
+    assert [c["name"] for c in report["checks"]] == list(CHECKS)
+    assert report["status"] == "error"
+    assert {c["name"]: c["status"] for c in report["checks"]}["order_numbers"] == "error"
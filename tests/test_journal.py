@@ -0,0 +1,129 @@
+import json
+import threading
+
+import journal
+from journal import JournalProjectStore
+
+
+def scenario(n):
+    return {"uid": f"u{n}", "order_no": n, "test_name": f"{n:03d}_test", "veta": f"veta {n}", "akce": "A"}
+
+
+def project(*numbers):
+    return {"P": {"next_id": max(numbers, default=0) + 1, "subject": "S", "scenarios": [scenario(n) for n in numbers]}}
+
+
+def order_numbers(data):
+    return [tc["order_no"] for tc in data["P"]["scenarios"]]
+
+
+def test_saves_are_replayed_over_snapshot(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1))
+    store.save(project(1, 2, 3))
+
+    assert not path.exists()  # zatím jen žurnál
+    assert JournalProjectStore(path).load() == project(1, 2, 3)
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1, 2, 3))
+    store.compact()
+
+    assert json.loads(path.read_text(encoding="utf-8")) == project(1, 2, 3)
+    assert store.journal_path.read_text(encoding="utf-8") == ""
+    assert JournalProjectStore(path).load() == project(1, 2, 3)
+
+
+def test_compaction_keeps_mutations_written_meanwhile(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1, 2))
+    state, seq = store._state, store._seq  # stav zachycený kompakcí na pozadí
+    state = json.loads(json.dumps(state))
+    store.save(project(1, 2, 3))
+
+    store._write_compacted(state, seq)
+
+    assert JournalProjectStore(path).load() == project(1, 2, 3)
+
+
+def test_background_compaction_runs_past_threshold(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path, compact_threshold=1)
+    store.save(project(1))
+    store._compaction.join(timeout=10)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == project(1)
+    assert JournalProjectStore(path).load() == project(1)
+
+
+def test_load_during_compaction_never_replays_folded_entries(tmp_path, monkeypatch):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1))
+    store.compact()  # meta už má seq z dřívější kompakce
+    store.save(project(1, 2, 3))  # přidání scénářů = řádkové mutace, jejich přehrání by je zdvojilo
+    other = JournalProjectStore(path)  # jiný proces nad stejnými soubory
+    seen = []
+
+    write_atomic = journal._write_atomic
+
+    def slow_write(target, data, indent=2):
+        write_atomic(target, data, indent)
+        if target == path:
+            # Mezi zápisem snapshotu a seq se pokusí číst jiný proces
+            reader = threading.Thread(target=lambda: seen.append(order_numbers(other.load())))
+            reader.start()
+            reader.join(timeout=0.3)
+            seen.append("blocked" if reader.is_alive() else "read")
+            readers.append(reader)
+
+    readers = []
+    monkeypatch.setattr(journal, "_write_atomic", slow_write)
+    store.compact()
+    readers[0].join(timeout=10)
+
+    assert seen == ["blocked", [1, 2, 3]]
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1))
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "op": "set_pro')
+
+    assert JournalProjectStore(path).load() == project(1)
+
+
+def test_save_after_truncated_line_is_not_lost(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1))
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "op": "set_pro')
+
+    store = JournalProjectStore(path)
+    store.save(project(1, 2))
+
+    assert JournalProjectStore(path).load() == project(1, 2)
+    lines = store.journal_path.read_text(encoding="utf-8").splitlines()
+    assert all(json.loads(line) for line in lines)
+
+
+def test_complete_last_entry_without_newline_is_kept(tmp_path):
+    path = tmp_path / "projects.json"
+    store = JournalProjectStore(path)
+    store.save(project(1))
+    store.save(project(1, 2))
+    store.journal_path.write_bytes(store.journal_path.read_bytes().rstrip(b"\n"))
+
+    store = JournalProjectStore(path)
+    assert store.load() == project(1, 2)
+    store.save(project(1, 2, 3))
+
+    assert JournalProjectStore(path).load() == project(1, 2, 3)
@@ -0,0 +1,53 @@
+import random
+from itertools import combinations
+
+from matrix import DIMENSION_VALUES, expand, pairwise, parse_exclusions
+
+VALUES = {**DIMENSION_VALUES, "akce": ["A", "B", "C"]}
+
+
+def pairs(rows):
+    return {
+        ((d1, row[d1]), (d2, row[d2]))
+        for row in rows
+        for d1, d2 in combinations([d for d in VALUES if d in row], 2)
+    }
+
+
+def test_pairwise_backtracks_over_earlier_choices():
+    rules = parse_exclusions("kanal=SHOP, segment=B2C\nakce=A, technologie=FWA_BI\nkanal=IL, segment=B2C")
+
+    rows = pairwise(VALUES, rules)
+
+    assert (("technologie", "FIBER"), ("akce", "C")) in pairs(rows)
+    assert pairs(expand(VALUES, rules)) <= pairs(rows)
+
+
+def test_pairwise_covers_every_pair_of_expand_with_random_rules():
+    rng = random.Random(14)
+    values = {
+        "segment": ["B2B", "B2C", "SOHO"],
+        "kanal": ["SHOP", "IL", "TLS"],
+        "technologie": ["FIBER", "FWA_BI", "DSL"],
+        "akce": ["A", "B", "C"],
+    }
+    for _ in range(300):
+        rules = []
+        for _ in range(rng.randint(1, 5)):
+            dims = rng.sample(list(values), rng.randint(2, 3))
+            rules.append({dim: {rng.choice(values[dim])} for dim in dims})
+
+        rows = pairwise(values, rules)
+        full = list(expand(values, rules))
+
+        assert all(row in full for row in rows)
+        covered = {((d1, r[d1]), (d2, r[d2])) for r in rows for d1, d2 in combinations(values, 2)}
+        expected = {((d1, r[d1]), (d2, r[d2])) for r in full for d1, d2 in combinations(values, 2)}
+        assert expected <= covered, rules
+
+
+def test_pairwise_is_smaller_than_full_product():
+    values = {dim: [f"{dim}{i}" for i in range(4)] for dim in VALUES}
+    rows = pairwise(values)
+    assert len(rows) < len(list(expand(values)))
+    assert pairs(expand(values)) <= pairs(rows)
@@ -0,0 +1,46 @@
+import json
+import tracemalloc
+
+import pytest
+
+from memprofile import MemoryProfiler, deep_sizeof
+
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler(max_reruns=2)
+    yield profiler
+    profiler.disable()
+
+
+def test_disabled_profiler_records_nothing(profiler):
+    profiler.begin_rerun()
+    profiler.end_rerun("s1", {"x": [1, 2, 3]})
+
+    assert not profiler.enabled
+    assert profiler.reruns() == [] and profiler.sessions() == []
+    assert profiler.traced_memory() == (0, 0)
+
+
+def test_rerun_growth_and_session_footprint(profiler):
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc už běží")
+    profiler.enable()
+    kept = []
+
+    for session in ("s1", "s2", "s3"):
+        profiler.begin_rerun()
+        kept.append(bytearray(200_000))
+        profiler.end_rerun(session, {"data": kept[-1], "n": 1})
+
+    reruns = profiler.reruns()
+    assert [r["session"] for r in reruns] == ["s2", "s3"]  # kruhový buffer
+    assert all(r["growth_bytes"] >= 200_000 for r in reruns)
+    assert {s["session"] for s in profiler.sessions()} == {"s1", "s2", "s3"}
+    assert json.loads(profiler.report())["enabled"] is True
+
+
+def test_deep_sizeof_counts_contents_once():
+    shared = "x" * 10_000
+    assert deep_sizeof([shared, shared]) < 2 * deep_sizeof(shared)
+    assert deep_sizeof({"a": [shared]}) > deep_sizeof(shared)
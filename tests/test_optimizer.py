@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from optimizer import COMPLEXITY_COST, PRIORITY_FACTOR, optimize, reduced_project, requirements, scenario_cost
+
+
+def random_scenarios(rng, count):
+    return [{
+        "segment": rng.choice(["B2C", "B2B"]),
+        "kanal": rng.choice(["SHOP", "IL"]),
+        "technologie": rng.choice(["DSL", "FIBER", "HLAS"]),
+        "akce": rng.choice(["Aktivace", "Terminace", "Portin"]),
+        "priority": rng.choice(list(PRIORITY_FACTOR)),
+        "complexity": rng.choice(list(COMPLEXITY_COST)),
+    } for _ in range(count)]
+
+
+def naive_greedy(scenarios, mode, budget=None):
+    """Přímočaré vážené hladové pokrytí - stejná pravidla bez haldy"""
+    covers = [requirements(tc, mode) for tc in scenarios]
+    costs = [scenario_cost(tc) for tc in scenarios]
+    uncovered = set().union(*covers)
+    selected, remaining = [], budget
+    candidates = set(range(len(scenarios)))
+    while uncovered:
+        options = [
+            (costs[i] / len(covers[i] & uncovered), i) for i in candidates
+            if covers[i] & uncovered and (remaining is None or costs[i] <= remaining + 1e-9)
+        ]
+        if not options:
+            break
+        _, best = min(options)
+        selected.append(best)
+        candidates.discard(best)
+        uncovered -= covers[best]
+        if remaining is not None:
+            remaining -= costs[best]
+    return sorted(selected)
+
+
+@pytest.mark.parametrize("mode", ["combinations", "pairwise"])
+@pytest.mark.parametrize("seed", range(10))
+def test_selection_covers_everything_and_matches_greedy(mode, seed):
+    scenarios = random_scenarios(random.Random(seed), 60)
+
+    selected, summary = optimize(scenarios, mode)
+
+    covered = set().union(*(requirements(scenarios[i], mode) for i in selected))
+    assert covered == set().union(*(requirements(tc, mode) for tc in scenarios))
+    assert summary["covered"] == summary["requirements"] == len(covered)
+    assert selected == naive_greedy(scenarios, mode)
+    assert summary["cost_selected"] <= summary["cost_total"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_budget_is_respected(seed):
+    rng = random.Random(seed)
+    scenarios = random_scenarios(rng, 60)
+    _, full = optimize(scenarios, "pairwise")
+    budget = round(full["cost_selected"] * rng.uniform(0.2, 0.8), 2)
+
+    selected, summary = optimize(scenarios, "pairwise", budget)
+
+    assert sum(scenario_cost(scenarios[i]) for i in selected) <= budget + 1e-9
+    assert summary["covered"] < summary["requirements"]
+    assert selected == naive_greedy(scenarios, "pairwise", budget)
+
+
+def test_ties_break_by_position():
+    tc = {"segment": "B2C", "kanal": "SHOP", "technologie": "DSL", "akce": "Aktivace",
+          "priority": "2-Medium", "complexity": "4-Medium"}
+    scenarios = [dict(tc), dict(tc), {**tc, "akce": "Terminace"}, {**tc, "akce": "Terminace"}]
+
+    assert optimize(scenarios)[0] == [0, 2]
+    assert optimize(list(scenarios))[0] == [0, 2]
+
+
+def test_cheaper_scenario_wins_for_same_coverage():
+    tc = {"segment": "B2C", "kanal": "SHOP", "technologie": "DSL", "akce": "Aktivace"}
+    scenarios = [{**tc, "priority": "3-Low", "complexity": "1-Giant"}, {**tc, "priority": "1-High", "complexity": "5-Low"}]
+
+    selected, summary = optimize(scenarios)
+
+    assert selected == [1]
+    assert summary["cost_selected"] == 0.5
+    assert reduced_project({"subject": "S", "scenarios": scenarios}, selected)["scenarios"] == [scenarios[1]]
@@ -0,0 +1,75 @@
+import copy
+
+import pytest
+
+from core import PROJECTS_PATH, _reserve_order_numbers, generate_testcase, generate_testcases, load_json, save_projects
+
+
+def project(order_numbers, next_id=None):
+    data = {"subject": "S", "scenarios": [{"order_no": n} for n in order_numbers]}
+    if next_id is not None:
+        data["next_id"] = next_id
+    return data
+
+
+@pytest.mark.parametrize("order_numbers, next_id, expected", [
+    ([1, 2, 3], 4, 4),        # platný čítač
+    ([1, 2, 3, 4, 5], 11, 6),  # nafouknutý čítač (smazané scénáře)
+    ([1, 2, 3], 2, 4),        # zaostávající čítač
+    ([1, 2, 3], None, 4),     # starší projects.json bez čítače
+    ([1, 2, 3], "4", 4),      # ručně upravený JSON
+    ([], 7, 1),
+    ([], None, 1),
+])
+def test_reserve_continues_after_last_scenario(order_numbers, next_id, expected):
+    data = project(order_numbers, next_id)
+
+    assert list(_reserve_order_numbers(data, 2)) == [expected, expected + 1]
+    assert data["next_id"] == expected + 2
+
+
+def test_consecutive_batches_do_not_overlap():
+    data = project([1, 2])
+    first = _reserve_order_numbers(data, 3)
+    data["scenarios"].extend({"order_no": n} for n in first)
+    second = _reserve_order_numbers(data, 2)
+
+    assert list(first) == [3, 4, 5]
+    assert list(second) == [6, 7]
+
+
+def test_generate_testcases_numbers_and_ids():
+    projects = {"P": {"next_id": 11, "subject": "S", "scenarios": [
+        {"uid": f"u{n}", "order_no": n, "test_name": f"{n:03d}_x", "veta": "x", "akce": "A"} for n in range(1, 6)
+    ]}}
+    kroky = {"A": {"description": "", "steps": [{"description": "krok", "expected": "ok"}]}}
+    items = [{"veta": "Aktivace B2C SHOP DSL", "akce": "A", "priority": "1-High", "complexity": "5-Low"}] * 2
+
+    created = generate_testcases("P", items, kroky, projects, persist=False)
+
+    assert [tc["order_no"] for tc in created] == [6, 7]
+    assert created[0]["test_name"] == "006_SHOP_B2C_DSL_Aktivace B2C SHOP DSL"
+    assert len({tc["uid"] for tc in projects["P"]["scenarios"]}) == 7
+    assert created[0]["kroky_ref"] == created[1]["kroky_ref"]
+    assert projects["P"]["next_id"] == 8
+
+
+def test_persisted_testcases_survive_a_later_session_save():
+    projects = load_json(PROJECTS_PATH)
+    projects["Persist"] = {"next_id": 1, "subject": "S", "scenarios": []}
+    save_projects(load_json(PROJECTS_PATH), projects)
+    kroky = {"A": {"description": "", "steps": [{"description": "krok", "expected": "ok"}]}}
+
+    session_base = load_json(PROJECTS_PATH)
+    session = copy.deepcopy(session_base)
+
+    library = load_json(PROJECTS_PATH)
+    tc = generate_testcase("Persist", "Aktivace B2C SHOP DSL", "A", "1-High", "5-Low", kroky, library)
+    assert library["Persist"]["version"] == session_base["Persist"].get("version", 0) + 1
+
+    session["Persist"]["subject"] = "Nový"
+    saved, conflicts = save_projects(session_base, session)
+
+    assert not conflicts
+    assert saved["Persist"]["subject"] == "Nový"
+    assert [s["uid"] for s in load_json(PROJECTS_PATH)["Persist"]["scenarios"]] == [tc["uid"]]
@@ -0,0 +1,71 @@
+import pytest
+
+import core
+import search
+
+
+def scenario(n, veta):
+    return {"uid": f"u{n}", "order_no": n, "test_name": f"{n:03d}_test", "veta": veta, "akce": "Aktivace"}
+
+
+@pytest.fixture
+def projects():
+    data = {f"P{i}": {"next_id": 2, "subject": "S", "scenarios": [scenario(1, f"alfa {i}")]} for i in range(20)}
+    core.save_json(core.PROJECTS_PATH, data)
+    core.save_json(core.KROKY_PATH, {"Aktivace": {"description": "", "steps": []}})
+    core.SEARCH_DB_PATH.unlink(missing_ok=True)
+    core._search_index = None
+    yield data
+    core._search_index = None
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Jména zdrojů, pro které index počítal otisk"""
+    calls = []
+    signature = search._signature
+    monkeypatch.setattr(search, "_signature", lambda obj: calls.append(obj) or signature(obj))
+    return calls
+
+
+def test_save_reindexes_only_changed_projects(projects, hashed):
+    assert core.search_all("alfa")[0] == 20  # jeden scénář za každý projekt
+    hashed.clear()
+
+    base = core.load_json_cached(core.PROJECTS_PATH)
+    mine = core.thaw(base)
+    mine["P3"]["scenarios"][0]["veta"] = "omega"
+    del mine["P7"]
+    core.save_projects(base, mine)
+
+    assert len(hashed) == 1  # jen P3, smazaný P7 se jen odebere
+    total, results = core.search_all("omega")
+    assert total == 1 and results[0]["project"] == "P3"
+    assert core.search_all("alfa")[0] == 18
+    assert len(hashed) == 1  # dotaz po uložení už nic nepřepočítával
+
+
+def test_save_without_known_changes_defers_to_next_search(projects, hashed):
+    core.search_all("alfa")
+    data = core.thaw(core.load_json_cached(core.PROJECTS_PATH))
+    data["P0"]["scenarios"][0]["veta"] = "omega"
+    hashed.clear()
+
+    core.save_json(core.PROJECTS_PATH, data)
+    assert hashed == []
+
+    assert core.search_all("omega")[0] == 1
+    assert len(hashed) == len(data)
+
+
+def test_index_out_of_sync_is_not_patched_incrementally(projects):
+    index = core.get_search_index()
+    index.sync_projects({"P0": projects["P0"]}, version=("jiná verze",))
+
+    data = core.thaw(core.load_json_cached(core.PROJECTS_PATH))
+    data["P1"]["scenarios"][0]["veta"] = "omega"
+    core.save_json(core.PROJECTS_PATH, data, changed=["P1"])
+
+    # Index neodpovídal verzi před uložením - srovná se celý při dotazu
+    assert core.search_all("alfa")[0] == 19
+    assert core.search_all("omega")[0] == 1
@@ -0,0 +1,101 @@
+import copy
+import json
+
+import pytest
+
+from core import load_json_cached, save_json, snapshot_version, thaw
+from sessions import (
+    buffer_stats, collect_stale_buffers, edit_buffer_key, new_overlay, overlay_is_stale,
+    overlay_remove, overlay_set, overlay_size, overlay_steps,
+)
+
+BASE = [{"description": "a", "expected": "1"}, {"description": "b", "expected": "2"}, {"description": "c", "expected": "3"}]
+
+
+# ---------- Overlay ----------
+def test_overlay_applies_edits_removals_and_additions():
+    overlay = new_overlay(BASE)
+    new_step = {"description": "d", "expected": "4"}
+
+    overlay_set(BASE, overlay, ("b", 0), {"description": "A", "expected": "1"})
+    overlay_remove(overlay, ("b", 1))
+    overlay["added"].append(new_step)
+    overlay_set(BASE, overlay, ("n", 0), {"description": "D", "expected": "4"})
+
+    assert overlay_steps(BASE, overlay) == [
+        {"description": "A", "expected": "1"}, BASE[2], {"description": "D", "expected": "4"}]
+    assert overlay_size(overlay) == 3
+    assert BASE[0] == {"description": "a", "expected": "1"}  # sdílený snapshot zůstal beze změny
+
+
+def test_reverting_an_edit_drops_it_from_the_overlay():
+    overlay = new_overlay(BASE)
+    overlay_set(BASE, overlay, ("b", 2), {"description": "x", "expected": "3"})
+    overlay_set(BASE, overlay, ("b", 2), dict(BASE[2]))
+
+    assert overlay_size(overlay) == 0
+    assert overlay_steps(BASE, overlay) == BASE
+
+
+def test_overlay_is_stale_after_someone_saves_the_action():
+    overlay = new_overlay(BASE)
+    assert not overlay_is_stale(list(BASE), overlay)
+    assert overlay_is_stale(BASE + [{"description": "z", "expected": "9"}], overlay)
+
+
+# ---------- Úklid session ----------
+def test_gc_keeps_only_the_active_buffer_and_current_results():
+    steps_data = {"A": BASE, "B": BASE}
+    state = {
+        "edit_akce": "A",
+        edit_buffer_key("A"): new_overlay(BASE),
+        edit_buffer_key("B"): new_overlay(BASE),
+        edit_buffer_key("Smazaná"): new_overlay(BASE),
+        "dup_result": {"version": 1, "groups": []},
+        "smazat_akci": "Smazaná",
+        42: "neřetězcový klíč",
+    }
+
+    removed = collect_stale_buffers(state, steps_data, {"kroky": 2})
+
+    assert sorted(removed) == sorted([edit_buffer_key("B"), edit_buffer_key("Smazaná"), "dup_result"])
+    assert edit_buffer_key("A") in state and 42 in state
+    assert state["smazat_akci"] is None
+
+
+def test_gc_keeps_results_of_the_current_snapshot_and_drops_deleted_action_edit():
+    state = {"edit_akce": "Smazaná", edit_buffer_key("Smazaná"): new_overlay(BASE), "dup_result": {"version": 3}}
+
+    removed = collect_stale_buffers(state, {"A": BASE}, {"kroky": 3})
+
+    assert removed == [edit_buffer_key("Smazaná")]
+    assert state["edit_akce"] is None
+    assert "dup_result" in state
+
+
+def test_buffer_stats():
+    overlay = new_overlay(BASE)
+    overlay_remove(overlay, ("b", 0))
+    state = {"edit_akce": "A", edit_buffer_key("A"): overlay, "dup_result": {"version": 1}}
+
+    assert buffer_stats(state) == {"keys": 3, "edit_buffers": 1, "overlay_changes": 1, "snapshot_bound": 1}
+
+
+# ---------- Sdílené snapshoty ----------
+def test_snapshot_is_shared_read_only_and_versioned(tmp_path):
+    path = tmp_path / "kroky.json"
+    path.write_text(json.dumps({"A": BASE}), encoding="utf-8")
+
+    first = load_json_cached(path)
+    version = snapshot_version(path)
+    assert load_json_cached(path) is first
+    with pytest.raises(TypeError):
+        first["A"].append({})
+
+    edited = thaw(first)
+    edited["A"].append({"description": "d", "expected": "4"})
+    assert copy.deepcopy(first) == {"A": BASE}
+    save_json(path, edited)
+
+    assert load_json_cached(path) == edited
+    assert snapshot_version(path) > version
@@ -0,0 +1,56 @@
+from similarity import STEP_THRESHOLD, canonical_step_map, canonicalize_steps, find_duplicate_steps
+
+TERMINACE = ("Po kontrole ucastnicke smlouvy se vrat do SR a z terminacniho SR proved proklik "
+             "na vytvorit objednavku a z roletky {} vyber ukonceni smlouvy")
+
+
+def step(description, expected="OK"):
+    return {"description": description, "expected": expected}
+
+
+def test_near_duplicates_are_grouped_and_canonical_is_most_used():
+    common = step("V COM konzoli zkontroluj rozpad tasku a kladny prubeh objednavky")
+    variant = step("V COM konzoli zkontroluj rozpad tasku a kladny prubeh objednavky.", "OK!")
+    kroky = {"A": [common], "B": {"description": "", "steps": [common]}, "C": [variant]}
+
+    groups = find_duplicate_steps(kroky)
+
+    assert len(groups) == 1
+    assert groups[0]["canonical"] == common
+    assert [v["step"] for v in groups[0]["variants"]] == [variant]
+    assert groups[0]["variants"][0]["actions"] == ["C"]
+
+
+def test_different_technology_is_never_grouped():
+    kroky = {
+        "Terminace - HLAS": [step(TERMINACE.format("Mobil/TV"))],
+        "Terminace - FIX": [step(TERMINACE.format("FIX"))],
+    }
+    assert find_duplicate_steps(kroky, threshold=0.5) == []
+
+
+def test_opposite_verb_or_negation_is_never_grouped():
+    kroky = {
+        "A": [step("Aktivuj balicek Security dle pozadavku zakaznika a pokracuj v objednavce")],
+        "B": [step("Deaktivuj balicek Security dle pozadavku zakaznika a pokracuj v objednavce")],
+        "C": [step("V Siebel zkontroluj ze je objednavka dokoncena a u sluzby je aktivni balicek")],
+        "D": [step("V Siebel zkontroluj ze je objednavka dokoncena a u sluzby neni aktivni balicek")],
+    }
+    assert find_duplicate_steps(kroky, threshold=0.5) == []
+
+
+def test_threshold_filters_loose_matches():
+    kroky = {
+        "A": [step("Jdi na detail pozadovane sluzby a klikni na objednat novy balicek")],
+        "B": [step("Jdi na detail pozadovane sluzby a klikni na zmenit stavajici zarizeni")],
+    }
+    assert find_duplicate_steps(kroky, threshold=STEP_THRESHOLD) == []
+    assert len(find_duplicate_steps(kroky, threshold=0.5)) == 1
+
+
+def test_canonicalize_replaces_variants_and_drops_duplicates():
+    common = step("Odesli objednavku do COM a zkontroluj jeji stav")
+    variant = step("Odesli objednavku do COM a zkontroluj jeji stav.")
+    groups = find_duplicate_steps({"A": [common], "B": [common], "C": [variant]})
+
+    assert canonicalize_steps([variant, common], canonical_step_map(groups)) == [common]
@@ -0,0 +1,76 @@
+import os
+
+import core
+from step_sets import StepSetStore, migrate_projects
+
+KROKY = [{"description": "Otevři SR", "expected": "SR otevřen"}, {"description": "Založ objednávku", "expected": "OK"}]
+
+
+def test_put_and_get_round_trip(tmp_path):
+    store = StepSetStore(tmp_path / "step_sets.json")
+
+    ref = store.put(KROKY)
+
+    assert store.put([dict(k) for k in KROKY]) == ref
+    assert StepSetStore(tmp_path / "step_sets.json").get(ref) == KROKY
+    assert store.get("neexistuje") == []
+
+
+def test_shared_steps_are_stored_once(tmp_path):
+    store = StepSetStore(tmp_path / "step_sets.json")
+
+    first = store.put(KROKY)
+    second = store.put(KROKY[:1])
+
+    assert first != second
+    assert store.stats() == {"sets": 2, "steps": 2}
+
+
+def test_concurrent_writer_does_not_lose_sets(tmp_path):
+    # Každá instance má vlastní cache jako samostatný proces (CLI vs. aplikace)
+    path = tmp_path / "step_sets.json"
+    app = StepSetStore(path)
+    app.put(KROKY[:1])
+    cached = path.stat()
+
+    ref_cli = StepSetStore(path).put(KROKY)
+    # Zápis ve stejném tiku hodin - podle mtime aplikace změnu nepozná
+    os.utime(path, ns=(cached.st_atime_ns, cached.st_mtime_ns))
+    ref_app = app.put(KROKY[1:])
+
+    fresh = StepSetStore(path)
+    assert fresh.get(ref_cli) == KROKY
+    assert fresh.get(ref_app) == KROKY[1:]
+    assert not path.with_name("step_sets.json.lock").exists()
+
+
+def test_migrate_projects_replaces_copies_with_refs(tmp_path):
+    store = StepSetStore(tmp_path / "step_sets.json")
+    projects = {"P": {"scenarios": [{"veta": "a", "kroky": KROKY}, {"veta": "b", "kroky": KROKY}, {"veta": "c"}]}}
+
+    assert migrate_projects(projects, store) == 2
+
+    scenarios = projects["P"]["scenarios"]
+    assert "kroky" not in scenarios[0]
+    assert scenarios[0]["kroky_ref"] == scenarios[1]["kroky_ref"]
+    assert store.get(scenarios[0]["kroky_ref"]) == KROKY
+    assert "kroky_ref" not in scenarios[2]
+
+
+def test_saving_scenarios_with_refs_syncs_step_sets(monkeypatch):
+    requested = []
+
+    class Worker:
+        def request_sync(self, paths, message, immediate=False):
+            requested.append(list(paths))
+
+    monkeypatch.setattr(core, "_in_repo", lambda path: True)
+    monkeypatch.setattr(core, "get_sync_worker", lambda: Worker())
+    base = core.load_json(core.PROJECTS_PATH)
+
+    core.save_projects(base, {**base, "Bez kroků": {"subject": "S", "scenarios": [{"uid": "a", "veta": "x"}]}})
+    assert requested == []
+
+    base = core.load_json(core.PROJECTS_PATH)
+    core.save_projects(base, {**base, "Sady": {"subject": "S", "scenarios": [{"uid": "b", "kroky_ref": "r"}]}})
+    assert requested == [[core.STEP_SETS_PATH]]
@@ -0,0 +1,117 @@
+import copy
+import json
+import random
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_DIR
+from storage import SQLiteProjectStore, apply_mutation, diff_projects
+
+
+def scenario(rng, n):
+    tc = {"uid": f"u{rng.random():.12f}", "order_no": n, "test_name": f"{n:03d}_test", "veta": f"veta {n}",
+          "akce": rng.choice(["Aktivace - FIX", "Terminace - HLAS"]), "priority": "2-Medium"}
+    if rng.random() < 0.5:
+        tc["kroky"] = [{"description": f"krok {i}", "expected": "OK"} for i in range(rng.randint(0, 3))]
+        if rng.random() < 0.2:
+            tc["kroky"].append({"description": "x", "expected": "y", "poznamka": "mimo sloupce"})
+    else:
+        tc["kroky_ref"] = f"ref{rng.randint(0, 9)}"
+    return tc
+
+
+def random_projects(rng):
+    return {
+        f"P{p}": {"next_id": 1, "subject": f"S{p}", "scenarios": [scenario(rng, n) for n in range(1, rng.randint(1, 6))]}
+        for p in range(rng.randint(1, 4))
+    }
+
+
+def mutate(rng, projects):
+    """Jedna náhodná úprava, jakou dělá aplikace"""
+    projects = copy.deepcopy(projects)
+    name = rng.choice(list(projects)) if projects else None
+    scenarios = projects[name]["scenarios"] if name else []
+    kind = rng.choice(["add", "delete", "edit", "renumber", "meta", "add_project", "delete_project", "rename"])
+
+    if kind == "add" and name:
+        scenarios.append(scenario(rng, len(scenarios) + 1))
+    elif kind == "delete" and scenarios:
+        scenarios.pop(rng.randrange(len(scenarios)))
+        for n, tc in enumerate(scenarios, start=1):
+            tc["order_no"], tc["test_name"] = n, f"{n:03d}_test"
+    elif kind == "edit" and scenarios:
+        scenarios[rng.randrange(len(scenarios))]["veta"] = f"upraveno {rng.random()}"
+    elif kind == "renumber" and scenarios:
+        for tc in scenarios:
+            tc["order_no"] += 100
+    elif kind == "meta" and name:
+        projects[name]["subject"] = f"S{rng.random()}"
+    elif kind == "add_project":
+        projects[f"N{rng.random()}"] = {"next_id": 1, "subject": "S", "scenarios": [scenario(rng, 1)]}
+    elif kind == "delete_project" and name:
+        del projects[name]
+    elif kind == "rename" and name:
+        projects[f"R{rng.random()}"] = projects.pop(name)
+    return projects
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_diff_and_apply_round_trip(seed):
+    rng = random.Random(seed)
+    old = random_projects(rng)
+    new = old
+    for _ in range(rng.randint(1, 4)):
+        new = mutate(rng, new)
+
+    replayed = copy.deepcopy(old)
+    for op in diff_projects(old, new):
+        apply_mutation(replayed, op)
+
+    assert replayed == new
+
+
+def test_append_and_renumber_are_row_level():
+    rng = random.Random(1)
+    old = {"P": {"next_id": 1, "subject": "S", "scenarios": [scenario(rng, n) for n in (1, 2)]}}
+    new = copy.deepcopy(old)
+    new["P"]["scenarios"].append(scenario(rng, 3))
+    assert [op["op"] for op in diff_projects(old, new)] == ["add_scenario"]
+
+    renumbered = copy.deepcopy(old)
+    for tc in renumbered["P"]["scenarios"]:
+        tc["order_no"] += 10
+    assert [op["op"] for op in diff_projects(old, renumbered)] == ["renumber"]
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    rng = random.Random(7)
+    db_path = tmp_path / "projects.db"
+    current = random_projects(rng)
+    SQLiteProjectStore(db_path).save(current)
+
+    store = SQLiteProjectStore(db_path)
+    for _ in range(40):
+        current = mutate(rng, current)
+        store.save(current)
+        assert SQLiteProjectStore(db_path).load() == current
+
+
+def test_import_export_cli(tmp_path):
+    rng = random.Random(3)
+    projects = random_projects(rng)
+    source = tmp_path / "projects.json"
+    source.write_text(json.dumps(projects, ensure_ascii=False), encoding="utf-8")
+    db_path = tmp_path / "projects.db"
+    exported = tmp_path / "export.json"
+
+    for command, json_path in (("import", source), ("export", exported)):
+        result = subprocess.run(
+            [sys.executable, str(REPO_DIR / "gui_app" / "storage.py"), command, "--json", str(json_path), "--db", str(db_path)],
+            capture_output=True, text=True, encoding="utf-8",
+        )
+        assert result.returncode == 0, result.stderr
+
+    assert json.loads(exported.read_text(encoding="utf-8")) == projects
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from timing import Tracer
+
+
+def test_nested_spans_record_their_own_durations():
+    tracer = Tracer()
+    with tracer.span("outer"):
+        time.sleep(0.01)
+        with tracer.span("inner"):
+            time.sleep(0.02)
+
+    rows = {row["span"]: row for row in tracer.summary()}
+    assert rows["inner"]["count"] == rows["outer"]["count"] == 1
+    assert rows["outer"]["max_ms"] >= rows["inner"]["max_ms"] + 5
+    assert rows["inner"]["max_ms"] >= 15
+
+
+def test_timed_decorator_and_exceptions_are_recorded():
+    tracer = Tracer()
+
+    @tracer.timed("fn")
+    def fail():
+        raise ValueError("x")
+
+    for _ in range(3):
+        try:
+            fail()
+        except ValueError:
+            pass
+    assert tracer.summary()[0]["count"] == 3
+
+
+def test_rerun_sums_spans_and_sections():
+    tracer = Tracer()
+    tracer.begin_rerun()
+    tracer.section("sidebar")
+    with tracer.span("load"):
+        time.sleep(0.005)
+    with tracer.span("load"):
+        time.sleep(0.005)
+    tracer.section("tab")
+    tracer.end_rerun()
+
+    rerun = tracer.slowest_reruns()[0]
+    assert rerun["status"] == "done"
+    assert set(rerun["spans"]) == {"sidebar", "load", "tab"}
+    assert rerun["spans"]["load"] >= 10
+    assert rerun["total_ms"] >= rerun["spans"]["sidebar"]
+
+
+def test_interrupted_rerun_is_closed_by_the_next_one():
+    tracer = Tracer()
+    tracer.begin_rerun()
+    tracer.section("editor")
+    # st.rerun() ukončí skript výjimkou - end_rerun se nezavolá
+    tracer.begin_rerun()
+    tracer.end_rerun()
+
+    statuses = sorted(r["status"] for r in tracer.slowest_reruns())
+    assert statuses == ["done", "interrupted"]
+    interrupted = next(r for r in tracer.slowest_reruns() if r["status"] == "interrupted")
+    assert "editor" in interrupted["spans"]
+
+
+def test_background_thread_spans_are_not_charged_to_the_rerun():
+    tracer = Tracer()
+    def sync():
+        with tracer.span("git"):
+            pass
+
+    tracer.begin_rerun()
+    worker = threading.Thread(target=sync)
+    worker.start()
+    worker.join()
+    tracer.end_rerun()
+
+    assert tracer.slowest_reruns()[0]["spans"] == {}
+    assert [row["span"] for row in tracer.summary()] == ["git"]
+
+
+def test_buffers_are_bounded_and_disabled_tracer_records_nothing():
+    tracer = Tracer(max_reruns=3, max_samples=10)
+    for _ in range(5):
+        tracer.begin_rerun()
+        for _ in range(4):
+            with tracer.span("x"):
+                pass
+        tracer.end_rerun()
+    assert len(tracer.slowest_reruns(limit=10)) == 3
+    assert tracer.summary()[0]["count"] == 10
+
+    off = Tracer(enabled=False)
+    off.begin_rerun()
+    with off.span("x"):
+        pass
+    off.end_rerun()
+    assert off.summary() == [] and off.slowest_reruns() == []